@@ -21,13 +21,13 @@ class ACPFTestProjectFixture(testprojectfixture.TestProjectFixture):
     cpf_cmake_dir = 'Sources/CPFCMake'
     cpf_buildscripts_dir = 'Sources/CPFBuildScripts'
     ci_buildconfigurations_dir = 'Sources/CIBuildConfigurations'
-    project = ''
+    project = 'ACPFTestProject'
+    repository = 'https://github.com/Knitschi/ACPFTestProject.git'
 
     @classmethod
     def setUpClass(cls, instantiating_test_module=__name__.split('.')[-1]):
         cls.instantiating_module = instantiating_test_module
-        cls.project = 'ACPFTestProject'
-        cls.cpf_root_dir = testprojectfixture.prepareTestProject('https://github.com/Knitschi/ACPFTestProject.git', cls.project, cls.cpf_cmake_dir, cls.cpf_buildscripts_dir, cls.instantiating_module)
+        cls.cpf_root_dir = testprojectfixture.prepareTestProject(cls.repository, cls.project, cls.cpf_cmake_dir, cls.cpf_buildscripts_dir, cls.instantiating_module)
 
 
     def setUp(self):
@@ -112,8 +112,7 @@ class ACPFTestProjectFixture(testprojectfixture.TestProjectFixture):
         dll = binaryOutputDir / self.get_package_shared_lib_path(package, 'LIB', version)
         unexpectedFiles.append(dll)
 
-        self.assert_files_exist(expectedFiles)
-        self.assert_files_do_not_exist(unexpectedFiles)
+        self.assert_filesystem_objects(files=expectedFiles, absent_files=unexpectedFiles)
 
 
 
@@ -0,0 +1,142 @@
+"""
+This module contains functions that list the content of package archives without extracting them.
+
+All zip and tar archives that python can read are read with the python standard library.
+For all other formats, like 7z, the verbose listing of "cmake -E tar tvf" is parsed.
+Hardlinks are listed as files with the size of their targets.
+"""
+
+import os
+import re
+import stat
+import tarfile
+import zipfile
+
+from Sources.CPFBuildscripts.python import miscosaccess
+from . import filetreeutils
+
+
+class ArchiveEntry:
+    """
+    An object in an archive. The type is one of filetreeutils.FILE, SYMLINK or DIRECTORY.
+    The link_target is only set for symlinks.
+    """
+    def __init__(self, path, type, size=0, link_target=None):
+        self.path = path.rstrip('/')
+        self.type = type
+        self.size = size
+        self.link_target = link_target
+
+    def __repr__(self):
+        if self.link_target is not None:
+            return '{0} ({1} -> {2})'.format(self.path, self.type, self.link_target)
+        return '{0} ({1})'.format(self.path, self.type)
+
+
+def list_archive(archive):
+    """
+    Returns a list of ArchiveEntry objects for all objects in the archive.
+    """
+    archive = str(archive)
+    if zipfile.is_zipfile(archive):
+        return _list_zip_archive(archive)
+    elif tarfile.is_tarfile(archive):
+        return _list_tar_archive(archive)
+    return _list_archive_with_cmake(archive)
+
+
+def _list_zip_archive(archive):
+    entries = []
+    with zipfile.ZipFile(archive) as zip_file:
+        for info in zip_file.infolist():
+            # Unix permissions are stored in the upper bits of the external attributes.
+            mode = info.external_attr >> 16
+            if stat.S_ISLNK(mode):
+                link_target = zip_file.read(info).decode('utf-8')
+                entries.append(ArchiveEntry(info.filename, filetreeutils.SYMLINK, info.file_size, link_target))
+            elif info.is_dir():
+                entries.append(ArchiveEntry(info.filename, filetreeutils.DIRECTORY))
+            else:
+                entries.append(ArchiveEntry(info.filename, filetreeutils.FILE, info.file_size))
+    return entries
+
+
+def _list_tar_archive(archive):
+    entries = []
+    file_sizes = {}
+    # The stream mode reads the archive once from front to back.
+    with tarfile.open(archive, 'r|*') as tar_file:
+        for info in tar_file:
+            if info.issym():
+                entries.append(ArchiveEntry(info.name, filetreeutils.SYMLINK, info.size, info.linkname))
+            elif info.islnk():
+                entries.append(ArchiveEntry(info.name, filetreeutils.FILE, file_sizes.get(info.linkname.rstrip('/'), 0)))
+            elif info.isdir():
+                entries.append(ArchiveEntry(info.name, filetreeutils.DIRECTORY))
+            else:
+                entries.append(ArchiveEntry(info.name, filetreeutils.FILE, info.size))
+            file_sizes[entries[-1].path] = entries[-1].size
+    return entries
+
+
+# The verbose listing of libarchive has the form
+# lrwxrwxrwx  0 user   group       0 Oct 17 17:51 path -> target
+# hrw-r--r--  0 user   group       0 Oct 17 17:51 path link to target
+# The order of the three date fields differs between platforms, so they are not parsed.
+_cmake_listing_regex = re.compile(r'^([-dlhbcps][-rwxsStT]{9})\s+\d+\s+\S+\s+\S+\s+(\d+)\s+\S+\s+\S+\s+\S+ (.*)$')
+
+
+def _list_archive_with_cmake(archive):
+    osa = miscosaccess.MiscOsAccess()
+    # The C locale gives us a listing that does not depend on the language of the system.
+    environment = os.environ.copy()
+    environment['LC_ALL'] = 'C'
+    lines = osa.execute_command_output(
+        'cmake -E tar tvf "{0}"'.format(os.path.basename(archive)),
+        cwd=os.path.dirname(archive),
+        print_output=miscosaccess.OutputMode.ON_ERROR,
+        print_command=False,
+        env=environment
+    )
+
+    return parse_cmake_listing(lines)
+
+
+def parse_cmake_listing(lines):
+    """
+    Returns a list of ArchiveEntry objects for the lines of the verbose listing of "cmake -E tar tvf".
+    Lines that do not describe an archive object are ignored.
+    """
+    entries = []
+    file_sizes = {}
+    for line in lines:
+        match = _cmake_listing_regex.match(line)
+        if not match:
+            continue
+        mode, size, path = match.groups()
+        if mode.startswith('l'):
+            path, separator, link_target = path.partition(' -> ')
+            entries.append(ArchiveEntry(path, filetreeutils.SYMLINK, int(size), link_target))
+        elif mode.startswith('d'):
+            entries.append(ArchiveEntry(path, filetreeutils.DIRECTORY))
+        elif mode.startswith('h'):
+            path, link_target = _split_hardlink(path, file_sizes)
+            entries.append(ArchiveEntry(path, filetreeutils.FILE, file_sizes.get(link_target, int(size))))
+        else:
+            entries.append(ArchiveEntry(path, filetreeutils.FILE, int(size)))
+        file_sizes[entries[-1].path] = entries[-1].size
+    return entries
+
+
+def _split_hardlink(text, known_paths):
+    """
+    Splits the "path link to target" text of a hardlink. If the paths contain " link to " themselves,
+    the split is used whose target was listed before, because archives store the targets of
+    hardlinks before the links.
+    """
+    parts = text.split(' link to ')
+    for index in range(1, len(parts)):
+        link_target = ' link to '.join(parts[index:]).rstrip('/')
+        if link_target in known_paths:
+            return ' link to '.join(parts[:index]), link_target
+    return parts[0], ' link to '.join(parts[1:])
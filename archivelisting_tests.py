@@ -0,0 +1,105 @@
+"""
+This module contains the tests of the archivelisting module.
+"""
+
+import os
+import tarfile
+import zipfile
+
+from . import archivelisting
+from . import filetreeutils
+from .tempdirfixture import TempDirFixture
+
+
+class ArchiveListingCase(TempDirFixture):
+    """
+    Tests the listing of archive contents in the archivelisting module.
+    """
+
+    def setUp(self):
+        super(ArchiveListingCase, self).setUp()
+        self.write_file('MyLib-1.0.0/lib/libMyLib.so.1.0.0', 'dummy')
+        os.symlink('libMyLib.so.1.0.0', self.get_path('MyLib-1.0.0', 'lib', 'libMyLib.so'))
+
+    def get_listing(self, entries):
+        return sorted((entry.path, entry.type, entry.size, entry.link_target) for entry in entries)
+
+    def get_expected_listing(self):
+        return [
+            ('MyLib-1.0.0', filetreeutils.DIRECTORY, 0, None),
+            ('MyLib-1.0.0/lib/libMyLib.so', filetreeutils.SYMLINK, 0, 'libMyLib.so.1.0.0'),
+            ('MyLib-1.0.0/lib/libMyLib.so.1.0.0', filetreeutils.FILE, 5, None),
+        ]
+
+    def write_tar_archive(self, archive, mode):
+        with tarfile.open(self.get_path(archive), mode) as tar_file:
+            tar_file.add(self.get_path('MyLib-1.0.0'), 'MyLib-1.0.0', recursive=False)
+            tar_file.add(self.get_path('MyLib-1.0.0', 'lib', 'libMyLib.so.1.0.0'), 'MyLib-1.0.0/lib/libMyLib.so.1.0.0')
+            tar_file.add(self.get_path('MyLib-1.0.0', 'lib', 'libMyLib.so'), 'MyLib-1.0.0/lib/libMyLib.so')
+        return self.get_path(archive)
+
+    def test_parse_cmake_listing(self):
+        lines = [
+            'drwxr-xr-x  0 user   group       0 Oct 17  2026 MyLib-1.0.0/',
+            '-rw-r--r--  0 user   group       5 17 Oct 17:51 MyLib-1.0.0/lib/libMyLib.so.1.0.0',
+            'lrwxrwxrwx  0 user   group       0 Oct 17 17:51 MyLib-1.0.0/lib/libMyLib.so -> libMyLib.so.1.0.0',
+            'x MyLib-1.0.0/lib/libMyLib.so',
+            '',
+        ]
+        listing = self.get_listing(archivelisting.parse_cmake_listing(lines))
+        self.assertEqual(listing, self.get_expected_listing())
+
+    def test_parse_cmake_listing_keeps_spaces_in_paths(self):
+        lines = ['-rw-r--r--  0 user   group      12 Oct 17  2026 My Lib/read me.txt']
+        listing = self.get_listing(archivelisting.parse_cmake_listing(lines))
+        self.assertEqual(listing, [('My Lib/read me.txt', filetreeutils.FILE, 12, None)])
+
+    def test_parse_cmake_listing_with_hardlinks(self):
+        lines = [
+            '-rw-r--r--  0 user   group       5 17 Oct 17:51 bin/a link to b',
+            '-rw-r--r--  0 user   group       3 17 Oct 17:51 bin/c',
+            'hrw-r--r--  0 user   group       0 17 Oct 17:51 bin/d link to bin/a link to b',
+            'hrw-r--r--  0 user   group       0 17 Oct 17:51 bin/e link to bin/c',
+        ]
+        listing = self.get_listing(archivelisting.parse_cmake_listing(lines))
+        self.assertEqual(listing, [
+            ('bin/a link to b', filetreeutils.FILE, 5, None),
+            ('bin/c', filetreeutils.FILE, 3, None),
+            ('bin/d', filetreeutils.FILE, 5, None),
+            ('bin/e', filetreeutils.FILE, 3, None),
+        ])
+
+    def test_list_zip_archive(self):
+        archive = self.get_path('MyLib.zip')
+        with zipfile.ZipFile(archive, 'w') as zip_file:
+            zip_file.writestr('MyLib-1.0.0/', '')
+            zip_file.writestr('MyLib-1.0.0/lib/libMyLib.so.1.0.0', 'dummy')
+            link_info = zipfile.ZipInfo('MyLib-1.0.0/lib/libMyLib.so')
+            link_info.external_attr = 0o120777 << 16
+            zip_file.writestr(link_info, 'libMyLib.so.1.0.0')
+
+        listing = self.get_listing(archivelisting.list_archive(archive))
+        # Zip archives store the link target as the content of the symlink.
+        expected_listing = [entry if entry[1] != filetreeutils.SYMLINK else entry[:2] + (17,) + entry[3:] for entry in self.get_expected_listing()]
+        self.assertEqual(listing, expected_listing)
+
+    def test_list_tar_archive(self):
+        archive = self.write_tar_archive('MyLib.tar.gz', 'w:gz')
+        listing = self.get_listing(archivelisting.list_archive(archive))
+        self.assertEqual(listing, self.get_expected_listing())
+
+    def test_list_compressed_tar_archives(self):
+        for archive, mode in [('MyLib.tar.bz2', 'w:bz2'), ('MyLib.tar.xz', 'w:xz'), ('MyLib.tbz2', 'w:bz2')]:
+            self.write_tar_archive(archive, mode)
+            listing = self.get_listing(archivelisting.list_archive(self.get_path(archive)))
+            self.assertEqual(listing, self.get_expected_listing(), archive)
+
+    def test_list_tar_archive_with_hardlinks(self):
+        os.link(self.get_path('MyLib-1.0.0', 'lib', 'libMyLib.so.1.0.0'), self.get_path('MyLib-1.0.0', 'lib', 'libMyLib.so.1'))
+        archive = self.get_path('MyLib.tar')
+        with tarfile.open(archive, 'w') as tar_file:
+            tar_file.add(self.get_path('MyLib-1.0.0'), 'MyLib-1.0.0')
+
+        listing = self.get_listing(archivelisting.list_archive(archive))
+        self.assertIn(('MyLib-1.0.0/lib/libMyLib.so.1', filetreeutils.FILE, 5, None), listing)
+        self.assertIn(('MyLib-1.0.0/lib/libMyLib.so.1.0.0', filetreeutils.FILE, 5, None), listing)
@@ -17,13 +17,13 @@ class BCPFTestProjectFixture(testprojectfixture.TestProjectFixture):
     cpf_cmake_dir = 'Sources/CPFCMake'
     cpf_buildscripts_dir = 'Sources/CPFBuildScripts'
     ci_buildconfigurations_dir = 'Sources/CIBuildConfigurations'
-    project = ''
+    project = 'BCPFTestProject'
+    repository = 'https://github.com/Knitschi/BCPFTestProject.git'
 
     @classmethod
     def setUpClass(cls, instantiating_test_module=__name__.split('.')[-1]):
         cls.instantiating_module = instantiating_test_module
-        cls.project = 'BCPFTestProject'
-        cls.cpf_root_dir = testprojectfixture.prepareTestProject('https://github.com/Knitschi/BCPFTestProject.git', cls.project, cls.cpf_cmake_dir, cls.cpf_buildscripts_dir, cls.instantiating_module)
+        cls.cpf_root_dir = testprojectfixture.prepareTestProject(cls.repository, cls.project, cls.cpf_cmake_dir, cls.cpf_buildscripts_dir, cls.instantiating_module)
 
 
     def setUp(self):
@@ -0,0 +1,174 @@
+"""
+This module contains functions that query the dependency graph of a build directory.
+
+They are used to check that source files are inputs of a target without touching
+the files and rebuilding the target. For Ninja the graph is queried from ninja itself.
+For the other generators the codemodel of the CMake file API is read, which contains
+the sources of the targets but not the dependencies of custom commands.
+"""
+
+import os
+import json
+
+from Sources.CPFBuildscripts.python import miscosaccess
+
+
+def get_ninja_target_inputs(build_dir, ninja, target):
+    """
+    Returns the set of the normalized absolute paths of all files that the target depends on directly or indirectly.
+    Order-only dependencies are not contained, because they do not cause rebuilds.
+    """
+    osa = miscosaccess.MiscOsAccess()
+    try:
+        # The inputs tool is available since ninja 1.11.
+        output = osa.execute_command_output(
+            '"{0}" -t inputs {1}'.format(ninja, target),
+            cwd=build_dir,
+            print_output=miscosaccess.OutputMode.NEVER,
+            print_command=False
+        )
+        return set(_normalize_path(build_dir, line.strip()) for line in output if line.strip())
+    except miscosaccess.CalledProcessError:
+        return _get_ninja_target_inputs_with_query(build_dir, ninja, target)
+
+
+def get_ninja_deps_log_inputs(build_dir, ninja, outputs):
+    """
+    Returns the set of the normalized absolute paths of the files that the deps log of ninja contains
+    for the given outputs. These are the dependencies that the compilers reported in their depfiles,
+    like included headers, which are not part of the build manifest. The deps log only contains the
+    outputs that were built at least once.
+    """
+    osa = miscosaccess.MiscOsAccess()
+    output = osa.execute_command_output(
+        '"{0}" -t deps'.format(ninja),
+        cwd=build_dir,
+        print_output=miscosaccess.OutputMode.ON_ERROR,
+        print_command=False
+    )
+    return set(_normalize_path(build_dir, dependency) for dependency in parse_ninja_deps_output(output, build_dir, outputs))
+
+
+def parse_ninja_deps_output(lines, build_dir, outputs):
+    """
+    Returns the dependencies of the given normalized absolute output paths in the output of "ninja -t deps".
+    """
+    # The records have the form
+    # CMakeFiles/MyLib.dir/function.cpp.o: #deps 2, deps mtime 1234 (VALID)
+    #     ../Sources/MyLib/function.cpp
+    #     ../Sources/MyLib/function.h
+    dependencies = []
+    is_selected_record = False
+    for line in lines:
+        if not line.strip():
+            is_selected_record = False
+        elif line.startswith(' '):
+            if is_selected_record:
+                dependencies.append(line.strip())
+        else:
+            output, separator, record_info = line.partition(': #deps')
+            is_selected_record = bool(separator) and _normalize_path(build_dir, output) in outputs
+    return dependencies
+
+
+def _get_ninja_target_inputs_with_query(build_dir, ninja, target):
+    """
+    Walks the graph with the query tool of older ninja versions. Each call queries all nodes of one level of the graph.
+    """
+    osa = miscosaccess.MiscOsAccess()
+    inputs = set()
+    visited_nodes = set([target])
+    nodes = [target]
+    while nodes:
+        output = osa.execute_command_output(
+            '"{0}" -t query {1}'.format(ninja, ' '.join('"{0}"'.format(node) for node in nodes)),
+            cwd=build_dir,
+            print_output=miscosaccess.OutputMode.ON_ERROR,
+            print_command=False
+        )
+        nodes = []
+        is_input_section = False
+        for line in output:
+            if not line.startswith(' '):
+                is_input_section = False    # The line with the name of the queried node.
+            elif line.startswith('  ') and not line.startswith('    '):
+                is_input_section = line.strip().startswith('input:')
+            elif is_input_section:
+                node = line.strip()
+                if node.startswith('||'):
+                    continue
+                if node.startswith('|'):
+                    node = node[1:].strip()
+                if not node in visited_nodes:
+                    visited_nodes.add(node)
+                    nodes.append(node)
+                    inputs.add(_normalize_path(build_dir, node))
+
+    return inputs
+
+
+def write_codemodel_query(build_dir):
+    """
+    Requests the codemodel from the CMake file API. The query must exist before the generate step.
+    """
+    query_dir = os.path.join(str(build_dir), '.cmake', 'api', 'v1', 'query')
+    os.makedirs(query_dir, exist_ok=True)
+    open(os.path.join(query_dir, 'codemodel-v2'), 'a').close()
+
+
+def get_codemodel_target_sources(build_dir, target, config):
+    """
+    Returns the set of the normalized absolute paths of the sources of the target and the targets it depends on.
+    config is the name of the configuration for multi-config generators.
+    Returns None if the build directory contains no codemodel or the target is unknown.
+    """
+    reply_dir = os.path.join(str(build_dir), '.cmake', 'api', 'v1', 'reply')
+    if not os.path.isdir(reply_dir):
+        return None
+    index_files = sorted(name for name in os.listdir(reply_dir) if name.startswith('index-') and name.endswith('.json'))
+    if not index_files:
+        return None
+
+    index = _read_json(os.path.join(reply_dir, index_files[-1]))
+    codemodel_reply = index.get('reply', {}).get('codemodel-v2')
+    if not codemodel_reply:
+        return None
+    codemodel = _read_json(os.path.join(reply_dir, codemodel_reply['jsonFile']))
+    source_dir = codemodel['paths']['source']
+
+    configurations = codemodel['configurations']
+    configuration = next((c for c in configurations if c['name'] == config), configurations[0])
+    target_files = { target_entry['id'] : target_entry['jsonFile'] for target_entry in configuration['targets'] }
+    target_ids = { target_entry['name'] : target_entry['id'] for target_entry in configuration['targets'] }
+    if not target in target_ids:
+        return None
+
+    sources = set()
+    visited_ids = set([target_ids[target]])
+    ids = [target_ids[target]]
+    while ids:
+        target_data = _read_json(os.path.join(reply_dir, target_files[ids.pop()]))
+        for source in target_data.get('sources', []):
+            sources.add(_normalize_path(source_dir, source['path']))
+        for dependency in target_data.get('dependencies', []):
+            if not dependency['id'] in visited_ids:
+                visited_ids.add(dependency['id'])
+                ids.append(dependency['id'])
+
+    return sources
+
+
+def normalize_path(path):
+    """
+    Brings absolute paths into the form of the paths that are returned by this module.
+    """
+    return os.path.normcase(os.path.normpath(str(path)))
+
+
+def _normalize_path(base_dir, path):
+    return normalize_path(os.path.join(str(base_dir), path))
+
+
+def _read_json(file):
+    with open(file) as f:
+        return json.load(f)
@@ -0,0 +1,91 @@
+"""
+This module contains the tests of the buildgraph module.
+"""
+
+import os
+import json
+import unittest
+
+from . import buildgraph
+from .tempdirfixture import TempDirFixture
+
+
+class NinjaDepsOutputCase(unittest.TestCase):
+    """
+    Tests the parsing of the "ninja -t deps" output.
+    """
+
+    def test_dependencies_of_selected_outputs_are_returned(self):
+        build_dir = '/build'
+        output = [
+            'CMakeFiles/MyLib.dir/function.cpp.o: #deps 2, deps mtime 1234 (VALID)',
+            '    ../Sources/MyLib/function.cpp',
+            '    ../Sources/MyLib/function.h',
+            '',
+            'CMakeFiles/Other.dir/other.cpp.o: #deps 1, deps mtime 1234 (STALE)',
+            '    ../Sources/Other/other.h',
+            '',
+        ]
+        outputs = set([buildgraph.normalize_path('/build/CMakeFiles/MyLib.dir/function.cpp.o')])
+
+        dependencies = buildgraph.parse_ninja_deps_output(output, build_dir, outputs)
+
+        self.assertEqual(dependencies, ['../Sources/MyLib/function.cpp', '../Sources/MyLib/function.h'])
+
+
+class CodemodelCase(TempDirFixture):
+    """
+    Tests the reading of the CMake file API codemodel.
+    """
+
+    def setUp(self):
+        super(CodemodelCase, self).setUp()
+        self.build_dir = self.get_path('build')
+        self.source_dir = self.get_path('source')
+
+    def write_reply_file(self, name, content):
+        self.write_file('build/.cmake/api/v1/reply/' + name, json.dumps(content))
+
+    def write_codemodel(self):
+        self.write_reply_file('index-2026-10-17T00-00-00-0000.json', { 'reply' : { 'codemodel-v2' : { 'jsonFile' : 'codemodel-v2-1.json' } } })
+        self.write_reply_file('codemodel-v2-1.json', {
+            'paths' : { 'source' : self.source_dir, 'build' : self.build_dir },
+            'configurations' : [
+                {
+                    'name' : 'Debug',
+                    'targets' : [
+                        { 'name' : 'MyApp', 'id' : 'app-debug', 'jsonFile' : 'target-app-debug.json' },
+                        { 'name' : 'MyLib', 'id' : 'lib-debug', 'jsonFile' : 'target-lib-debug.json' },
+                    ]
+                },
+                {
+                    'name' : 'Release',
+                    'targets' : [
+                        { 'name' : 'MyApp', 'id' : 'app-release', 'jsonFile' : 'target-app-release.json' },
+                    ]
+                },
+            ]
+        })
+        self.write_reply_file('target-app-debug.json', { 'sources' : [{ 'path' : 'MyApp/main.cpp' }], 'dependencies' : [{ 'id' : 'lib-debug' }] })
+        self.write_reply_file('target-lib-debug.json', { 'sources' : [{ 'path' : 'MyLib/function.cpp' }, { 'path' : 'MyLib/function.h' }] })
+        self.write_reply_file('target-app-release.json', { 'sources' : [{ 'path' : 'MyApp/release.cpp' }] })
+
+    def get_expected_sources(self, rel_paths):
+        return set(buildgraph.normalize_path(os.path.join(self.source_dir, rel_path)) for rel_path in rel_paths)
+
+    def test_sources_of_dependencies_are_included(self):
+        self.write_codemodel()
+        self.assertEqual(
+            buildgraph.get_codemodel_target_sources(self.build_dir, 'MyApp', 'Debug'),
+            self.get_expected_sources(['MyApp/main.cpp', 'MyLib/function.cpp', 'MyLib/function.h']))
+
+    def test_configuration_is_selected(self):
+        self.write_codemodel()
+        self.assertEqual(buildgraph.get_codemodel_target_sources(self.build_dir, 'MyApp', 'Release'), self.get_expected_sources(['MyApp/release.cpp']))
+        # Single-config generators have only one configuration.
+        self.assertEqual(buildgraph.get_codemodel_target_sources(self.build_dir, 'MyLib', 'MinSizeRel'), self.get_expected_sources(['MyLib/function.cpp', 'MyLib/function.h']))
+
+    def test_missing_codemodel_or_target(self):
+        self.assertIsNone(buildgraph.get_codemodel_target_sources(self.build_dir, 'MyApp', 'Debug'))
+        self.write_codemodel()
+        self.assertIsNone(buildgraph.get_codemodel_target_sources(self.build_dir, 'Unknown', 'Debug'))
@@ -5,12 +5,126 @@ This module contains automated tests that operate on the CCPFTestProject project
 import unittest
 import sys
 from . import testprojectfixture
+from . import packagemanifest
+from . import filetreeutils
 from pathlib import PureWindowsPath, PurePosixPath, PurePath
 import pprint
 
 from Sources.CPFBuildscripts.python import miscosaccess
 
 
+# The expected content of the packages in the CCPFTestProject.
+# The syntax of the entries is described in the packagemanifest module.
+# The placeholders of a package are:
+#   {package}           The name of the package.
+#   {version}           The version of the package.
+#   {component_dir}     The component sub-directory with a trailing slash or nothing for single component packages.
+#   {production_lib}    The name of the production library, which has a 'lib' prefix in executable packages.
+#   {export_prefix}     The lower case name of the production library that is used for the export macro headers.
+#   {plugin_dir}        The directory of a plugin relative to the runtime directory.
+# The flags of a package are its type, 'exe' for executables, 'binary' for everything but interface
+# libraries, 'single_component' and the name of the package.
+FILE = filetreeutils.FILE
+SYMLINK = filetreeutils.SYMLINK
+
+_SOURCE_DIR = 'src/{package}/{component_dir}'
+_INCLUDE_DIR = 'include/{package}/{component_dir}'
+_CMAKE_DIR = '{static_lib_dir}cmake/{package}/'
+
+# These headers are public headers of interface libraries and only installed in the include directory.
+_PUBLIC_HEADER_SOURCES = [
+    (_SOURCE_DIR + 'cpfPackageVersion_{package}.h', FILE, ''),
+    (_SOURCE_DIR + 'function.h', FILE, ''),
+]
+
+_CPP_SOURCES = [
+    (_SOURCE_DIR + 'function.cpp', FILE, 'binary'),     # The interface library has no cpp file and export macro header.
+    (_SOURCE_DIR + '{export_prefix}_export.h', FILE, 'binary'),
+    (_SOURCE_DIR + '{export_prefix}_fixtures_export.h', FILE, ''),
+    (_SOURCE_DIR + 'Tests/fixture.cpp', FILE, ''),
+    (_SOURCE_DIR + 'Tests/fixture.h', FILE, ''),
+    (_SOURCE_DIR + 'Tests/tests_main.cpp', FILE, ''),
+    (_SOURCE_DIR + 'Tests/generatedHeader.h', FILE, 'APackage'),
+    (_SOURCE_DIR + 'main.cpp', FILE, 'exe'),
+]
+
+_OTHER_SOURCES = [
+    (_SOURCE_DIR + 'CMakeLists.txt', FILE, ''),
+    (_SOURCE_DIR + 'cpfPackageVersion_{package}.cmake', FILE, 'single_component'),
+    # The version.rc files are only generated for the visual studio configs.
+    # Interface libraries have no binaries and static libraries have no version information compiled into them.
+    (_SOURCE_DIR + '{package}_version.rc', FILE, 'vs exe'),
+    (_SOURCE_DIR + '{production_lib}_version.rc', FILE, 'vs binary shared'),
+    (_SOURCE_DIR + '{production_lib}_fixtures_version.rc', FILE, 'vs shared'),
+    (_SOURCE_DIR + '{production_lib}_tests_version.rc', FILE, 'vs'),
+]
+
+_RUNTIME_FILES = [
+    ('{runtime_dir}{package}{config_postfix}{exe_version}{exe_ext}', FILE, 'exe'),
+    # I could not find a way to suppress the generation of the name-link
+    # for executables. So this is always expected.
+    ('{runtime_dir}{package}{config_postfix}', SYMLINK, 'exe linux'),
+    # Interface libraries have no runtime files.
+    ('{shared_lib_dir}{production_lib}{config_postfix}{shared_ext}{version_ext}', FILE, 'binary shared'),
+]
+
+_DEVELOPER_FILES = [
+    # The static libraries. With msvc we also get them for the dlls.
+    ('{static_lib_dir}{production_lib}{config_postfix}{static_ext}', FILE, 'binary !shared'),
+    ('{static_lib_dir}{production_lib}{config_postfix}{static_ext}', FILE, 'binary shared vs'),
+    # The test executable is included to allow running the tests in the target environment.
+    ('{runtime_dir}{production_lib}_tests{config_postfix}{exe_version}{exe_ext}', FILE, ''),
+    ('{runtime_dir}{production_lib}_tests{config_postfix}', SYMLINK, 'linux'),
+    # Fixture library files
+    ('{shared_lib_dir}{production_lib}_fixtures{config_postfix}{shared_ext}{version_ext}', FILE, 'shared'),
+    ('{static_lib_dir}{production_lib}_fixtures{config_postfix}{static_ext}', FILE, 'shared vs'),
+    ('{static_lib_dir}{production_lib}_fixtures{config_postfix}{static_ext}', FILE, '!shared'),
+    # CMake package files
+    (_CMAKE_DIR + '{package}Config.cmake', FILE, ''),
+    (_CMAKE_DIR + '{package}ConfigVersion.cmake', FILE, ''),
+    (_CMAKE_DIR + '{package}-{config}.cmake', FILE, ''),
+    (_CMAKE_DIR + '{package}.cmake', FILE, ''),
+    # Public header files. Interface libs do not need an export macro header.
+    (_INCLUDE_DIR + 'function.h', FILE, ''),
+    (_INCLUDE_DIR + 'Tests/fixture.h', FILE, ''),
+    (_INCLUDE_DIR + 'cpfPackageVersion_{package}.h', FILE, ''),
+    (_INCLUDE_DIR + '{export_prefix}_fixtures_export.h', FILE, ''),
+    (_INCLUDE_DIR + '{export_prefix}_export.h', FILE, 'binary'),
+    (_INCLUDE_DIR + 'Tests/generatedHeader.h', FILE, 'APackage'),
+    # Linker pdb files
+    ('{shared_lib_dir}{production_lib}{config_postfix}.pdb', FILE, 'vs debug shared binary'),
+    ('{shared_lib_dir}{production_lib}_fixtures{config_postfix}.pdb', FILE, 'vs debug shared'),
+    ('{runtime_dir}{package}{config_postfix}.pdb', FILE, 'vs debug exe'),
+    ('{runtime_dir}{production_lib}_tests{config_postfix}.pdb', FILE, 'vs debug'),
+    # Compiler pdb files
+    ('{static_lib_dir}{package}{config_postfix}-compiler.pdb', FILE, 'vs debug exe'),
+    ('{static_lib_dir}{production_lib}{config_postfix}-compiler.pdb', FILE, 'vs debug binary'),
+    ('{static_lib_dir}{production_lib}_fixtures{config_postfix}-compiler.pdb', FILE, 'vs debug'),
+    ('{static_lib_dir}{production_lib}_tests{config_postfix}-compiler.pdb', FILE, 'vs debug'),
+    # Abi dumps are only generated for libraries. Interface libs have no binaries so no dumps are created.
+    ('other/ABI_{production_lib}{config_postfix}.{version}.dump', FILE, 'linux debug binary !exe'),
+    ('other/ABI_{production_lib}_fixtures{config_postfix}.{version}.dump', FILE, 'linux debug binary !exe'),
+]
+
+_PACKAGE_CONTENT_MANIFEST = packagemanifest.PackageManifest({
+    'CT_RUNTIME' : _RUNTIME_FILES,
+    'CT_RUNTIME_PORTABLE' : _RUNTIME_FILES,
+    # The h and cpp files are required for debugging with pdb files.
+    'CT_DEVELOPER' : _RUNTIME_FILES + _DEVELOPER_FILES
+        + packagemanifest.add_condition(_PUBLIC_HEADER_SOURCES, 'vs debug binary')
+        + packagemanifest.add_condition(_CPP_SOURCES, 'vs debug'),
+    'CT_SOURCES' : _PUBLIC_HEADER_SOURCES + _CPP_SOURCES + _OTHER_SOURCES,
+    # The files of shared external libraries in the runtime portable packages of their dependents.
+    'RUNTIME_DEPENDENCY' : [
+        ('{shared_lib_dir}{package}{config_postfix}{shared_ext}{version_ext}', FILE, 'shared'),
+    ],
+    # The files of plugins in the runtime portable packages of their dependents.
+    'PLUGIN' : [
+        ('{runtime_dir}{plugin_dir}/{package}{config_postfix}{shared_ext}{version_ext}', FILE, ''),
+    ],
+})
+
+
 class CCPFTestProjectFixture(testprojectfixture.TestProjectFixture):
     """
     A fixture for tests that require a project with multiple
@@ -21,345 +135,84 @@ class CCPFTestProjectFixture(testprojectfixture.TestProjectFixture):
     cpf_cmake_dir = 'Sources/CPFCMake'
     cpf_buildscripts_dir = 'Sources/CPFBuildScripts'
     ci_buildconfigurations_dir = 'Sources/CIBuildConfigurations'
-    project = ''
+    project = 'CCPFTestProject'
+    repository = 'https://github.com/Knitschi/CCPFTestProject.git'
 
     @classmethod
     def setUpClass(cls, instantiating_test_module=__name__.split('.')[-1]):
         cls.instantiating_module = instantiating_test_module
-        cls.project = 'CCPFTestProject'
-        cls.cpf_root_dir = testprojectfixture.prepareTestProject('https://github.com/Knitschi/CCPFTestProject.git', cls.project, cls.cpf_cmake_dir, cls.cpf_buildscripts_dir, cls.instantiating_module)
+        cls.cpf_root_dir = testprojectfixture.prepareTestProject(cls.repository, cls.project, cls.cpf_cmake_dir, cls.cpf_buildscripts_dir, cls.instantiating_module)
 
 
     def setUp(self):
         super(CCPFTestProjectFixture, self).setUp(self.project, self.cpf_root_dir, self.cpf_cmake_dir, self.cpf_buildscripts_dir, self.ci_buildconfigurations_dir, self.instantiating_module)        
 
-    def unpack_archive_package(self, package, packageGenerator, contentType, excludedTargets ):
+    def get_archive_package(self, package, packageGenerator, contentType, excludedTargets ):
+        """
+        Returns the path to the package archive and the name of the package directory in the archive.
+        """
         packageFileShort = self.get_distribution_package_short_name(package, packageGenerator, contentType, excludedTargets)
         packageFileDir = self.get_distribution_package_install_directory()
-
-        self.osa.execute_command_output(
-            "cmake -E tar xzf " + packageFileShort,
-            cwd=packageFileDir,
-            print_output=miscosaccess.OutputMode.ON_ERROR
-            )
-
         packageFileWE = self.get_distribution_package_name_we(package, testprojectfixture.COMPILER_CONFIG, contentType, excludedTargets)
-        return  packageFileDir / packageFileWE 
+        return [packageFileDir / packageFileShort, packageFileWE]
 
 
     def get_expected_package_content(self, package, componentSubdir, contentType, packageType, packageDependencies=[], packagePluginDependencies={}):
         """
-        Returns absolute pathes to files and symlinks that are expected in the package archive.
+        Returns pathes to files and symlinks that are expected in the package archive.
         """
-        # runtime package component
-        if contentType == 'CT_RUNTIME':
-            return self.get_runtime_package_content(package, packageType)
+        pluginPackages = [target for targets in packagePluginDependencies.values() for target in targets]
+        versions = self.get_package_versions([package] + packageDependencies + pluginPackages)
+
+        manifest = self.get_compiled_package_manifest(_PACKAGE_CONTENT_MANIFEST)
+        [packageFiles, symlinks] = manifest.get_content(contentType, self.get_package_flags(package, componentSubdir, packageType), self.get_package_values(package, componentSubdir, packageType, versions[package]))
 
         # runtime dependencies component
         if contentType == 'CT_RUNTIME_PORTABLE':
-            return self.get_runtime_portable_package_content(package, packageType, packageDependencies, packagePluginDependencies)
-
-        # developer component
-        if contentType == 'CT_DEVELOPER':
-            return self.get_developer_package_content(package, componentSubdir, packageType)
-
-        # sources component
-        if contentType == 'CT_SOURCES':
-            return self.get_sources_package_content(package, componentSubdir, packageType)
-        
-        raise Exception("Missing case!")
-
-        return []
-
-
-    def get_runtime_package_content(self, package, packageType):
-        """
-        Returns the package files from the runtime install component.
-        """
-        # Interface libraries have no runtime files.
-        isNotInterfaceLib = self.is_not_interface_lib(packageType)
-        if not isNotInterfaceLib:
-            return [[],[]]
-
-        packageFiles = []
-        symlinks = []
-
-        isExePackage = self.is_exe_package(packageType)
-        version = self.get_package_version(package)
-
-        # Executable
-        if isExePackage:
-            
-            # package executable
-            packageFiles.append( self.get_package_executable_path(package, version) ) 
-
-            # Symlink for executable
-            # I could not find a way to suppress the generation of the name-link
-            # for executables. So this is always expected.
-            if self.is_linux():
-                symlinks.append( self.get_package_exe_symlink_path(package, version) )
-
-        # Production library
-        if self.is_shared_libraries_config():
-            packageFiles.append( self.get_package_shared_lib_path(package, packageType, version) )
-
-                # Shared libary symlinks
-                #if self.is_linux():
-                #    symlinks.extend( self.get_package_shared_lib_symlink_paths(package, packageType, version) )
-
-        return [packageFiles, symlinks]
-
-
-    def get_runtime_portable_package_content(self, package, packageType, packageDependencies, packagePluginDependencies):
-        """
-        Returns the package files from the runtime-portable install component.
-        """
-        [packageFiles, symlinks] = self.get_runtime_package_content(package, packageType)
-
-        # Shared external libraries
-        if self.is_shared_libraries_config():
             for dependency in packageDependencies:
+                dependencyValues = self.get_package_values(dependency, '', 'LIB', versions[dependency])
+                packageFiles.extend(manifest.get_content('RUNTIME_DEPENDENCY', self.get_package_flags(dependency, '', 'LIB'), dependencyValues)[0])
 
-                version = self.get_package_version(dependency)
-                packageFiles.append( self.get_package_shared_lib_path(dependency, 'LIB', version) )
-
-        # plugins
-        for dir, targets in packagePluginDependencies.items():
-            fullPluginDir = self.get_runtime_dir() / dir
-            for target in targets:
-                version = self.get_package_version(target)
-                libShortName = self.get_shared_lib_short_name(target, 'LIB', version, '')
-                packageFiles.append( fullPluginDir / libShortName )
-
+            for dir, targets in packagePluginDependencies.items():
+                for target in targets:
+                    pluginValues = self.get_package_values(target, '', 'LIB', versions[target])
+                    pluginValues['plugin_dir'] = dir
+                    packageFiles.extend(manifest.get_content('PLUGIN', self.get_package_flags(target, '', 'LIB'), pluginValues)[0])
 
         return [packageFiles, symlinks]
 
 
-    def get_developer_package_content(self, package, componentSubdir, packageType):
+    def get_package_flags(self, package, componentSubdir, packageType):
         """
-        Returns the package files from the developer install component.
+        Returns the flags of the package that are used in the conditions of _PACKAGE_CONTENT_MANIFEST.
         """
-        config = testprojectfixture.COMPILER_CONFIG.lower()
-        version = self.get_package_version(package)
-        isExePackage = self.is_exe_package(packageType)
-        isNotInterfaceLib = self.is_not_interface_lib(packageType)
-        isInterfaceLib = not isNotInterfaceLib
-
-        # The developer package also contains the main binaries.
-        [packageFiles, symlinks] = self.get_runtime_package_content(package, packageType)
-
-        # We have to add the static libraries for the developer package.
-        if isNotInterfaceLib:   # Interface libraries have no binary files.
-            # Main binary file
-            if isExePackage:
-                # Implementation libs for exe packages
-                if self.is_shared_libraries_config():
-                    if self.is_visual_studio_config():
-                        # We get an additional libs for the implementation dlls with msvc
-                        packageFiles.append(self.get_package_static_lib_path(package, packageType))
-                else:
-                    # The static implementation lib
-                    packageFiles.append(self.get_package_static_lib_path(package, packageType))
-            else:
-                if self.is_shared_libraries_config():
-                    if self.is_visual_studio_config():
-                        # We get additional libs for dlls with msvc
-                        packageFiles.append(self.get_package_static_lib_path(package, packageType))
-                else:
-                    # Add the static main library.
-                    packageFiles.append(self.get_package_static_lib_path(package, packageType))
-
-        # Test executable
-        # This is included to allow running the tests in the target environment.
-        productionLibName = package
-        if isExePackage:
-            productionLibName = 'lib' + package
-        packageFiles.append(self.get_package_executable_path(productionLibName, version, target_postfix='_tests'))
-        
-        # test exe  symlinks
-        if self.is_linux():
-            symlinks.append( self.get_package_exe_symlink_path(productionLibName, version, target_postfix='_tests') )
-
-        # Fixture library files
-        if self.is_shared_libraries_config():
-            packageFiles.append(self.get_package_shared_lib_path(package, packageType, version, target_postfix='_fixtures'))
-            # We get additional libs for dlls with msvc
-            if self.is_visual_studio_config():
-                packageFiles.append(self.get_package_static_lib_path(package, packageType, target_postfix='_fixtures'))
-        else:
-            packageFiles.append(self.get_package_static_lib_path(package, packageType, target_postfix='_fixtures'))
-
-        # CMake package files
-        cmakeFilesPath = self.get_static_lib_dir() / 'cmake' / package
-        packageFiles.extend([
-            cmakeFilesPath / (package + 'Config.cmake'),
-            cmakeFilesPath / (package + 'ConfigVersion.cmake'),
-            cmakeFilesPath / (package + '-{0}.cmake'.format(config)),
-            cmakeFilesPath / (package + '.cmake'),
-        ])
-
-        # Public header files
-        includePath = PurePosixPath('include') / package / componentSubdir
-        packageFiles.extend([
-            includePath / 'function.h',
-            includePath / 'Tests/fixture.h',
-            includePath / 'cpfPackageVersion_{0}.h'.format(package),
-            includePath / (productionLibName.lower() + '_fixtures_export.h')
-        ])
-
-        if isNotInterfaceLib:   # Interface libs do not need an export macro header.
-            packageFiles.append( includePath / (productionLibName.lower() + '_export.h'))
-
-        if package == 'APackage':
-            packageFiles.append( includePath / 'Tests/generatedHeader.h' )
-
-        # Pdb files and sources
-        libBaseName = self.get_package_lib_basename(package, packageType)
-        fixtureLibBaseName = self.get_package_lib_basename(package + '_fixtures', packageType)
-
-        if self.is_visual_studio_config():
-            if self.is_debug_compiler_config():
-
-                exeBaseName = self.get_target_binary_base_name( package , testprojectfixture.COMPILER_CONFIG)
-                testExeBaseName = self.get_package_lib_basename(package + '_tests', packageType)
-                runtimeOutputDir = self.get_runtime_dir()
-                staticLibOutputDir = self.get_static_lib_dir()
-
-                # linker pdb files
-                if self.is_shared_libraries_config():
-                    sharedLibOutputDir = self.get_shared_lib_dir()
-                    if isNotInterfaceLib:
-                        packageFiles.append(sharedLibOutputDir / '{0}.pdb'.format(libBaseName))
-                    packageFiles.append(sharedLibOutputDir / '{0}.pdb'.format(fixtureLibBaseName))
-
-                if isExePackage:
-                    packageFiles.append( runtimeOutputDir / '{0}.pdb'.format(exeBaseName))
-                    packageFiles.append( staticLibOutputDir / '{0}-compiler.pdb'.format(exeBaseName))
-                
-                packageFiles.append(runtimeOutputDir / '{0}.pdb'.format(testExeBaseName))
-
-                # compiler pdb for libraries
-                if isNotInterfaceLib:
-                    packageFiles.append(staticLibOutputDir / '{0}-compiler.pdb'.format(libBaseName))
-
-                packageFiles.extend([
-                    staticLibOutputDir / '{0}-compiler.pdb'.format(fixtureLibBaseName),
-                    staticLibOutputDir / '{0}-compiler.pdb'.format(testExeBaseName)
-                ])
-
-                # Source files are required for debugging with pdb files.
-                allSources = self.get_package_source_files(package, componentSubdir, packageType)
-                cppSources = []
-                # The component will only install the h and cpp files.
-                cppExtensions = ['.cpp', '.h']
-                for source in allSources:
-                    if source.suffix in cppExtensions:
-                        cppSources.append(source)
-
-                # The interface library does not install any source files because
-                # they are all public headers and availabe in the include directory.
-                sourcePath = PurePosixPath('src') / package
-                if isInterfaceLib:
-                    cppSources.remove(sourcePath / 'function.h')
-                    cppSources.remove(sourcePath / 'cpfPackageVersion_{0}.h'.format(package))
-
-                packageFiles.extend(cppSources)
-
-
-        # ABI dump files
-        if self.is_linux() and not isExePackage: # dump files are only generated for libraries
-
-            # Abi dumps (interface libs have no binaries so no dumps are created)
-            otherPath = PurePosixPath('other')
-            if self.is_debug_compiler_config() and isNotInterfaceLib:
-                packageFiles.extend([
-                    otherPath / 'ABI_{0}.{1}.dump'.format(libBaseName, version),
-                    otherPath / 'ABI_{0}.{1}.dump'.format(fixtureLibBaseName, version),
-                ])
-
-        return [packageFiles, symlinks]
+        flags = self.get_package_type_flags(packageType)
+        flags.append(package)
+        if not componentSubdir:
+            flags.append('single_component')
+        return flags
 
 
-    def get_sources_package_content(self, package, componentSubdir, packageType):
+    def get_package_values(self, package, componentSubdir, packageType, version):
         """
-        Returns the package files from the sources install component.
+        Returns the values of the package placeholders in _PACKAGE_CONTENT_MANIFEST.
         """
-        packageFiles = []
-        symlinks = []
-
-        packageFiles = self.get_package_source_files(package, componentSubdir, packageType)
-
-        return [packageFiles, symlinks]
-
-
-    def get_package_source_files(self, package, componentSubdir, packageType):
-
-        isInterfaceLib = not self.is_not_interface_lib(packageType)
-        isExePackage = self.is_exe_package(packageType)
-        isSharedLibPackage = self.is_shared_libraries_config()
-
         productionLib = package
-        if isExePackage:
-            productionLib = 'lib' + package
-
-        sourceFiles = []
-
-        sourcePath = PurePosixPath('src') / package / componentSubdir
-        sourceFiles.extend([
-            sourcePath / 'CMakeLists.txt',
-            sourcePath / 'cpfPackageVersion_{0}.h'.format(package),
-            sourcePath / 'function.cpp',
-            sourcePath / 'function.h',
-            sourcePath / 'Tests/fixture.cpp',
-            sourcePath / 'Tests/fixture.h',
-            sourcePath / 'Tests/tests_main.cpp',
-            sourcePath / (productionLib.lower() + '_export.h'),
-            sourcePath / (productionLib.lower() + '_fixtures_export.h')
-        ])
-
-        
-        if not componentSubdir: # is single component package.
-            sourceFiles.append(sourcePath / 'cpfPackageVersion_{0}.cmake'.format(package))
-
-        # The version.rc file is only generated for the visual studio configs.
-        if self.is_visual_studio_config():
-            
-            # for exe
-            if isExePackage:
-                sourceFiles.append( sourcePath / (package + '_version.rc') )
-            
-            # for lib
-            if not isInterfaceLib and isSharedLibPackage:  # Interface have no binaries so nothing can be compiled into them. Static libs do not have version information compiled into them.
-                sourceFiles.append(sourcePath / (productionLib + '_version.rc'))
-
-            # for fixture lib
-            if isSharedLibPackage:
-                sourceFiles.append(sourcePath / (productionLib + '_fixtures_version.rc'))
-
-            # for test exe
-            sourceFiles.append(sourcePath / (productionLib + '_tests_version.rc'))
-
-
-        # The interface library has no cpp file and export macro header
-        if isInterfaceLib:
-            sourceFiles.remove( sourcePath / 'function.cpp')
-            sourceFiles.remove( sourcePath / (package.lower() + '_export.h'))
-
-        # The generated header is only in APackage
-        if package == 'APackage':
-            sourceFiles.append( sourcePath / 'Tests/generatedHeader.h' )
-
         if self.is_exe_package(packageType):
-            sourceFiles.extend([
-                sourcePath / 'main.cpp',
-            ])
+            productionLib = 'lib' + package
 
-        return sourceFiles
+        return {
+            'package' : package,
+            'version' : version,
+            'component_dir' : componentSubdir + '/' if componentSubdir else '',
+            'production_lib' : productionLib,
+            'export_prefix' : productionLib.lower(),
+        }
 
 
     def assert_APackage_content(self, contentType, excludedTargets=[]):
         package = 'APackage'
-        unpackedPackageDir = self.unpack_archive_package(package, '7Z', contentType, excludedTargets)
+        [packageArchive, packageDir] = self.get_archive_package(package, '7Z', contentType, excludedTargets)
         [package_files, package_symlinks] = self.get_expected_package_content(package, package, contentType, 'CONSOLE_APP', ['BPackage'], { 'plugins' : ['DPackage'] })
 
         if contentType == "CT_SOURCES":
@@ -380,21 +233,21 @@ class CCPFTestProjectFixture(testprojectfixture.TestProjectFixture):
                     'src/APackage/documentation/DoxygenStylesheet.css',
                 ])
 
-        self.assert_filetree_is_equal( unpackedPackageDir , package_files, package_symlinks)
+        self.assert_archive_content_is_equal( packageArchive, packageDir, package_files, package_symlinks)
 
 
     def assert_BPackage_content(self, contentType, excludedTargets=[]):
         package = 'BPackage'
-        unpackedPackageDir = self.unpack_archive_package(package, '7Z', contentType, excludedTargets )
+        [packageArchive, packageDir] = self.get_archive_package(package, '7Z', contentType, excludedTargets )
         [package_files, package_symlinks] = self.get_expected_package_content(package, "", contentType, 'LIB')
-        self.assert_filetree_is_equal( unpackedPackageDir , package_files, package_symlinks)
+        self.assert_archive_content_is_equal( packageArchive, packageDir, package_files, package_symlinks)
 
 
     def assert_EPackage_content(self, contentType, excludedTargets=[]):
         package = 'EPackage'
-        unpackedPackageDir = self.unpack_archive_package(package, '7Z', contentType, excludedTargets )
+        [packageArchive, packageDir] = self.get_archive_package(package, '7Z', contentType, excludedTargets )
         [package_files, package_symlinks] = self.get_expected_package_content(package, "", contentType, 'INTERFACE_LIB')
-        self.assert_filetree_is_equal( unpackedPackageDir , package_files, package_symlinks)
+        self.assert_archive_content_is_equal( packageArchive, packageDir, package_files, package_symlinks)
 
 
     #####################################################################################################
@@ -430,6 +283,9 @@ class CCPFTestProjectFixture(testprojectfixture.TestProjectFixture):
         self.generate_project()
         self.build_target('install_all')
 
+        # Determine all versions at once. They are cached for the assertions.
+        self.get_package_versions(['APackage', 'BPackage', 'DPackage', 'EPackage'])
+
         # Verify the contents of the various packages.
 
         # runtime packages
@@ -0,0 +1,104 @@
+"""
+This module contains functions that read the cache variables of a CMake build directory.
+
+The CMakeCache.txt file is parsed directly instead of running "cmake -LA -N", which saves
+a process start per query. The parsed entries are kept in memory and the file is only
+read again when its modification time or size changes.
+"""
+
+import os
+import threading
+
+
+class CacheEntry:
+    """
+    A variable in the CMakeCache.txt file.
+    """
+    def __init__(self, name, type, value):
+        self.name = name
+        self.type = type
+        self.value = value
+
+    def __repr__(self):
+        return '{0}:{1}={2}'.format(self.name, self.type, self.value)
+
+
+# These entries are not listed by "cmake -LA".
+_HIDDEN_TYPES = ['INTERNAL', 'STATIC', 'UNINITIALIZED']
+
+# Maps the cache files to tuples of their stat information and their parsed entries.
+_parsed_cache_files = {}
+_parsed_cache_files_lock = threading.Lock()
+
+
+def get_cache_entries(build_dir):
+    """
+    Returns a dictionary with the names and CacheEntry objects of the variables that are
+    listed by "cmake -LA -N" in the given build directory.
+    """
+    cache_file = os.path.join(str(build_dir), 'CMakeCache.txt')
+    try:
+        file_stat = os.stat(cache_file)
+    except FileNotFoundError:
+        raise Exception('Error! The build directory "{0}" does not contain a CMakeCache.txt file.'.format(build_dir))
+    stat_key = (file_stat.st_mtime_ns, file_stat.st_size)
+
+    with _parsed_cache_files_lock:
+        parsed_cache_file = _parsed_cache_files.get(cache_file)
+        if parsed_cache_file and parsed_cache_file[0] == stat_key:
+            return parsed_cache_file[1]
+
+    entries = parse_cache_file(cache_file)
+    with _parsed_cache_files_lock:
+        _parsed_cache_files[cache_file] = (stat_key, entries)
+    return entries
+
+
+def get_cache_variable_values(build_dir, variables):
+    """
+    Returns a dictionary with the values of the given variables.
+    Variables that are not in the cache are not contained in the dictionary.
+    """
+    entries = get_cache_entries(build_dir)
+    return { variable : entries[variable].value for variable in variables if variable in entries }
+
+
+def parse_cache_file(cache_file):
+    """
+    Returns a dictionary with the names and CacheEntry objects of the non-internal variables in the given CMakeCache.txt file.
+    """
+    entries = {}
+    with open(str(cache_file), errors='replace') as f:
+        for line in f:
+            entry = _parse_cache_line(line.rstrip('\r\n'))
+            if entry and not entry.type in _HIDDEN_TYPES:
+                entries[entry.name] = entry
+    return entries
+
+
+def _parse_cache_line(line):
+    """
+    Parses lines of the form NAME:TYPE=VALUE or "NAME":TYPE=VALUE.
+    Returns None for comments, empty lines and lines that can not be parsed.
+    """
+    if not line or line.startswith('#') or line.startswith('//'):
+        return None
+
+    if line.startswith('"'):
+        name_end = line.find('"', 1)
+        if name_end == -1:
+            return None
+        name = line[1:name_end]
+        rest = line[name_end + 1:]
+        if not rest.startswith(':'):
+            return None
+        type_and_value = rest[1:]
+    else:
+        name, separator, type_and_value = line.partition(':')
+        if not separator:
+            return None
+
+    type, separator, value = type_and_value.partition('=')
+    if not separator:
+        return None
+    return CacheEntry(name, type, value)
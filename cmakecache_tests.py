@@ -0,0 +1,43 @@
+"""
+This module contains the tests of the cmakecache module.
+"""
+
+from . import cmakecache
+from .tempdirfixture import TempDirFixture
+
+
+class CMakeCacheCase(TempDirFixture):
+    """
+    Tests the parsing of CMakeCache.txt files.
+    """
+
+    def test_only_entries_listed_by_cmake_are_returned(self):
+        cache_file = self.write_file('CMakeCache.txt',
+            '# This is the CMakeCache file.\n'
+            '//Build type\n'
+            'CMAKE_BUILD_TYPE:STRING=Debug\n'
+            '"NAME:WITH:COLONS":PATH=C:/a=b\n'
+            'EMPTY:STRING=\n'
+            'CMAKE_COMMAND:INTERNAL=/usr/bin/cmake\n'
+            'CMAKE_HOME_DIRECTORY:STATIC=/src\n'
+            'FROM_COMMAND_LINE:UNINITIALIZED=ON\n'
+            'no separator line\n'
+        )
+
+        entries = cmakecache.parse_cache_file(cache_file)
+
+        self.assertEqual(sorted(entries), ['CMAKE_BUILD_TYPE', 'EMPTY', 'NAME:WITH:COLONS'])
+        self.assertEqual(entries['CMAKE_BUILD_TYPE'].type, 'STRING')
+        self.assertEqual(entries['NAME:WITH:COLONS'].value, 'C:/a=b')
+        self.assertEqual(entries['EMPTY'].value, '')
+
+    def test_changed_cache_file_is_read_again(self):
+        self.write_file('CMakeCache.txt', 'A:STRING=1\n')
+        self.assertEqual(cmakecache.get_cache_variable_values(self.temp_dir, ['A', 'B']), { 'A' : '1' })
+
+        self.write_file('CMakeCache.txt', 'A:STRING=12\nB:BOOL=ON\n')
+        self.assertEqual(cmakecache.get_cache_variable_values(self.temp_dir, ['A', 'B']), { 'A' : '12', 'B' : 'ON' })
+
+    def test_missing_cache_file_raises(self):
+        with self.assertRaises(Exception):
+            cmakecache.get_cache_entries(self.temp_dir)
@@ -0,0 +1,76 @@
+"""
+This module contains a simple inter-process file lock.
+
+The tests of different modules run in parallel processes that share the
+directories below the BASE_TEST_DIR. The lock is used to serialize the
+access to files and directories that are shared between these processes.
+"""
+
+import os
+import time
+
+try:
+    import fcntl
+except ImportError:
+    import msvcrt
+
+
+class FileLock:
+    """
+    A blocking lock that is held by locking the given lock-file.
+    It can be used as context manager.
+    """
+    def __init__(self, lock_file):
+        self.lock_file = str(lock_file)
+        self.file = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+
+    def acquire(self):
+        os.makedirs(os.path.dirname(self.lock_file), exist_ok=True)
+        self.file = open(self.lock_file, 'a+')
+        if os.name == 'nt':
+            # msvcrt.locking() only retries for 10 seconds so we have to loop.
+            while True:
+                try:
+                    self.file.seek(0)
+                    msvcrt.locking(self.file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    time.sleep(0.1)
+        else:
+            fcntl.flock(self.file.fileno(), fcntl.LOCK_EX)
+
+    def try_acquire(self):
+        """
+        Acquires the lock if it is not held by anyone else and returns True, or returns False without waiting.
+        """
+        os.makedirs(os.path.dirname(self.lock_file), exist_ok=True)
+        self.file = open(self.lock_file, 'a+')
+        try:
+            if os.name == 'nt':
+                self.file.seek(0)
+                msvcrt.locking(self.file.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                fcntl.flock(self.file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            self.file.close()
+            self.file = None
+            return False
+        return True
+
+    def release(self):
+        if self.file is None:
+            return
+        if os.name == 'nt':
+            self.file.seek(0)
+            msvcrt.locking(self.file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(self.file.fileno(), fcntl.LOCK_UN)
+        self.file.close()
+        self.file = None
@@ -0,0 +1,399 @@
+"""
+This module contains functions that operate on whole directory trees.
+"""
+
+import os
+import stat
+import shutil
+import filecmp
+import hashlib
+import tempfile
+from pathlib import PurePosixPath
+
+from Sources.CPFBuildscripts.python import miscosaccess
+
+
+def copy_tree_copy_on_write(source_dir, target_dir):
+    """
+    Copies the source_dir to the not yet existing target_dir while sharing as much
+    of the file data as possible.
+
+    On Linux filesystems that support copy-on-write clones, "cp --reflink=auto" is used.
+    Otherwise the files are copied with python. Git objects are then hardlinked instead
+    of copied because git never changes them in place.
+    Modifying any other file in the copy does not change the source.
+    """
+    osa = miscosaccess.MiscOsAccess()
+    target_parent_dir = os.path.dirname(os.path.abspath(str(target_dir)))
+    os.makedirs(target_parent_dir, exist_ok=True)
+    if osa.system() == 'Linux' and _supports_reflinks(source_dir, target_parent_dir):
+        try:
+            osa.execute_command_output(
+                'cp -a --reflink=auto "{0}" "{1}"'.format(source_dir, target_dir),
+                print_output=miscosaccess.OutputMode.NEVER,
+                print_command=False
+            )
+            return
+        except miscosaccess.CalledProcessError:
+            # Fall back to the python implementation and remove the partial copy.
+            if os.path.exists(str(target_dir)):
+                shutil.rmtree(str(target_dir))
+
+    shutil.copytree(str(source_dir), str(target_dir), symlinks=True, copy_function=_link_or_copy_file)
+
+
+_reflink_support = {}   # Maps the device ids of filesystems to their reflink support.
+
+def _supports_reflinks(source_dir, target_dir):
+    """
+    Returns True if cp can create copy-on-write clones of the files in source_dir in target_dir.
+    The support is only probed once for each filesystem.
+    """
+    device = os.stat(str(source_dir)).st_dev
+    if os.stat(str(target_dir)).st_dev != device:
+        return False
+
+    if not device in _reflink_support:
+        probe_dir = tempfile.mkdtemp(dir=str(target_dir))
+        try:
+            probe_file = os.path.join(probe_dir, 'probe')
+            with open(probe_file, 'w') as f:
+                f.write('probe')
+            miscosaccess.MiscOsAccess().execute_command_output(
+                'cp --reflink=always "{0}" "{0}.clone"'.format(probe_file),
+                print_output=miscosaccess.OutputMode.NEVER,
+                print_command=False
+            )
+            _reflink_support[device] = True
+        except miscosaccess.CalledProcessError:
+            _reflink_support[device] = False
+        finally:
+            shutil.rmtree(probe_dir)
+
+    return _reflink_support[device]
+
+
+class TreeSyncStatistics:
+    """
+    Records the changes that were made by sync_tree().
+    All paths are relative to the target directory.
+    """
+    def __init__(self):
+        self.written_files = []
+        self.deleted_files = []
+        self.chmodded_files = []
+        self.created_dirs = []
+        self.bytes_written = 0
+
+    def get_changed_paths(self):
+        """
+        Returns the paths of all files that were written, deleted or got new permissions.
+        """
+        return self.written_files + self.deleted_files + self.chmodded_files
+
+    def __str__(self):
+        return '{0} files ({1} bytes) written, {2} files deleted, {3} files chmodded, {4} directories created'.format(
+            len(self.written_files),
+            self.bytes_written,
+            len(self.deleted_files),
+            len(self.chmodded_files),
+            len(self.created_dirs)
+        )
+
+
+def sync_tree(source_dir, target_dir, compare_content=True, excluded_top_level_names=[], excluded_names=[]):
+    """
+    Makes the content of target_dir equal to the content of source_dir by only
+    writing, deleting or chmodding the objects that differ.
+
+    Files with equal size and modification time are considered equal. If compare_content
+    is set, files with equal size but different modification times are compared
+    byte by byte before they are overwritten. This is the case for freshly cloned files.
+
+    Objects with one of the excluded_top_level_names are neither copied from the source_dir
+    nor deleted from the target_dir. The same holds for objects with one of the excluded_names
+    on all levels of the tree.
+    Returns a TreeSyncStatistics object.
+    """
+    statistics = TreeSyncStatistics()
+    os.makedirs(str(target_dir), exist_ok=True)
+
+    # We use a stack instead of recursion to handle deep trees.
+    dir_stack = ['']
+    while dir_stack:
+        rel_dir = dir_stack.pop()
+        source_entries = _get_dir_entries(os.path.join(str(source_dir), rel_dir))
+        target_entries = _get_dir_entries(os.path.join(str(target_dir), rel_dir))
+        _remove_excluded_entries(source_entries, rel_dir, excluded_top_level_names, excluded_names)
+        _remove_excluded_entries(target_entries, rel_dir, excluded_top_level_names, excluded_names)
+
+        # Remove the objects that do not exist in the source.
+        for name, entry in target_entries.items():
+            if not name in source_entries:
+                _remove_path(entry, _join_rel_path(rel_dir, name), statistics)
+
+        for name, source_entry in source_entries.items():
+            rel_path = _join_rel_path(rel_dir, name)
+            target_path = os.path.join(str(target_dir), rel_dir, name)
+            target_entry = target_entries.get(name)
+
+            if source_entry.is_symlink():
+                link = os.readlink(source_entry.path)
+                if target_entry and target_entry.is_symlink() and os.readlink(target_entry.path) == link:
+                    continue
+                if target_entry:
+                    _remove_path(target_entry, rel_path, statistics)
+                os.symlink(link, target_path)
+                statistics.written_files.append(rel_path)
+
+            elif source_entry.is_dir():
+                if target_entry and (target_entry.is_symlink() or not target_entry.is_dir()):
+                    _remove_path(target_entry, rel_path, statistics)
+                    target_entry = None
+                if not target_entry:
+                    os.mkdir(target_path)
+                    statistics.created_dirs.append(rel_path)
+                dir_stack.append(rel_path)
+
+            else:
+                source_stat = source_entry.stat(follow_symlinks=False)
+                if target_entry and (target_entry.is_symlink() or not target_entry.is_file()):
+                    _remove_path(target_entry, rel_path, statistics)
+                    target_entry = None
+
+                if not target_entry or not _files_are_equal(source_entry, source_stat, target_entry, compare_content):
+                    if target_entry:
+                        # Removing the file first makes sure that we do not write into files
+                        # that share their data with other files.
+                        os.remove(target_path)
+                    shutil.copy2(source_entry.path, target_path)
+                    statistics.written_files.append(rel_path)
+                    statistics.bytes_written += source_stat.st_size
+
+                elif stat.S_IMODE(source_stat.st_mode) != stat.S_IMODE(target_entry.stat(follow_symlinks=False).st_mode):
+                    os.chmod(target_path, stat.S_IMODE(source_stat.st_mode))
+                    statistics.chmodded_files.append(rel_path)
+
+    return statistics
+
+
+FILE = 'file'
+SYMLINK = 'symlink'
+DIRECTORY = 'directory'
+
+
+def iterate_tree(directory, excluded_top_level_names=[], excluded_names=[], sort=False):
+    """
+    Yields (relative path, type, os.DirEntry) tuples for all objects below the given directory.
+    The type is one of FILE, SYMLINK or DIRECTORY. It is taken from the directory listing, so no
+    extra stat calls are needed on most filesystems. Symlinks to directories are not followed.
+    Directories are yielded before their content. If sort is set, the objects of each directory
+    are yielded in the order of their names.
+    """
+    # We use a stack instead of recursion to handle deep trees.
+    dir_stack = ['']
+    while dir_stack:
+        rel_dir = dir_stack.pop()
+        entries = _get_dir_entries(os.path.join(str(directory), rel_dir))
+        _remove_excluded_entries(entries, rel_dir, excluded_top_level_names, excluded_names)
+
+        names = sorted(entries) if sort else entries
+        for name in names:
+            entry = entries[name]
+            rel_path = _join_rel_path(rel_dir, name)
+            if entry.is_symlink():
+                yield rel_path, SYMLINK, entry
+            elif entry.is_dir(follow_symlinks=False):
+                dir_stack.append(rel_path)
+                yield rel_path, DIRECTORY, entry
+            else:
+                yield rel_path, FILE, entry
+
+
+class DirectoryIndex:
+    """
+    Answers existence and type queries for many paths by listing each parent directory only once.
+    The listings are not updated when the directories change, so an index should only be used
+    for one batch of queries.
+    """
+    def __init__(self):
+        self.listings = {}
+
+    def get_type(self, path):
+        """
+        Returns FILE, SYMLINK or DIRECTORY if the object exists and None otherwise.
+        Symlinks are not followed.
+        """
+        directory, name = os.path.split(os.path.normpath(str(path)))
+        return self._get_listing(directory).get(os.path.normcase(name))
+
+    def exists(self, path):
+        """
+        Does the same as os.path.exists(), which follows symlinks.
+        """
+        object_type = self.get_type(path)
+        if object_type == SYMLINK:
+            return os.path.exists(str(path))
+        return object_type is not None
+
+    def _get_listing(self, directory):
+        if not directory in self.listings:
+            listing = {}
+            for name, entry in _get_dir_entries(directory).items():
+                if entry.is_symlink():
+                    listing[os.path.normcase(name)] = SYMLINK
+                elif entry.is_dir(follow_symlinks=False):
+                    listing[os.path.normcase(name)] = DIRECTORY
+                else:
+                    listing[os.path.normcase(name)] = FILE
+            self.listings[directory] = listing
+        return self.listings[directory]
+
+
+def get_tree_content_hash(directory, excluded_top_level_names=[], excluded_names=[]):
+    """
+    Returns a hash over the relative paths, types, permissions and contents of
+    all objects in the given directory. The modification times are ignored.
+    Objects with one of the excluded_names are ignored on all levels of the tree.
+    """
+    tree_hash = hashlib.sha1()
+    for rel_path, object_type, entry in iterate_tree(directory, excluded_top_level_names, excluded_names, sort=True):
+        if object_type == SYMLINK:
+            tree_hash.update('l {0} {1}\n'.format(rel_path, os.readlink(entry.path)).encode('utf-8'))
+        elif object_type == DIRECTORY:
+            tree_hash.update('d {0}\n'.format(rel_path).encode('utf-8'))
+        else:
+            mode = stat.S_IMODE(entry.stat(follow_symlinks=False).st_mode)
+            tree_hash.update('f {0} {1:o} {2}\n'.format(rel_path, mode, get_file_hash(entry.path)).encode('utf-8'))
+
+    return tree_hash.hexdigest()
+
+
+def get_file_stats(directory, excluded_top_level_names=[], excluded_names=[]):
+    """
+    Returns a dictionary with the relative paths of all files and symlinks in the directory as keys
+    and (size, modification time in ns) tuples as values. Symlinks are not followed.
+    """
+    file_stats = {}
+    for rel_path, object_type, entry in iterate_tree(directory, excluded_top_level_names, excluded_names):
+        if object_type != DIRECTORY:
+            entry_stat = entry.stat(follow_symlinks=False)
+            file_stats[rel_path] = (entry_stat.st_size, entry_stat.st_mtime_ns)
+
+    return file_stats
+
+
+def replace_in_text_files(directory, replacements):
+    """
+    Replaces strings in all text files below the given directory.
+    replacements is a list of (old, new) string pairs. Files that contain zero bytes
+    are treated as binary files and are not changed. The modification times of the
+    changed files are kept, so build-systems do not see them as changed.
+    Returns the number of changed files.
+    """
+    encoded_replacements = [(old.encode('utf-8'), new.encode('utf-8')) for old, new in replacements]
+    changed_files = 0
+    for dirpath, dirnames, filenames in os.walk(str(directory)):
+        for filename in filenames:
+            file = os.path.join(dirpath, filename)
+            if os.path.islink(file):
+                continue
+            with open(file, 'rb') as f:
+                content = f.read()
+            if b'\0' in content:
+                continue
+
+            new_content = content
+            for old, new in encoded_replacements:
+                new_content = new_content.replace(old, new)
+
+            if new_content != content:
+                file_stat = os.stat(file)
+                with open(file, 'wb') as f:
+                    f.write(new_content)
+                os.utime(file, ns=(file_stat.st_atime_ns, file_stat.st_mtime_ns))
+                changed_files += 1
+
+    return changed_files
+
+
+def get_file_hash(file):
+    """
+    Returns the sha1 hash of the content of the given file.
+    """
+    file_hash = hashlib.sha1()
+    with open(file, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            file_hash.update(chunk)
+    return file_hash.hexdigest()
+
+
+def _get_dir_entries(directory):
+    if not os.path.isdir(directory):
+        return {}
+    with os.scandir(directory) as entries:
+        return { entry.name : entry for entry in entries }
+
+
+def _remove_excluded_entries(entries, rel_dir, excluded_top_level_names, excluded_names):
+    if not rel_dir:
+        for name in excluded_top_level_names:
+            entries.pop(name, None)
+    for name in excluded_names:
+        entries.pop(name, None)
+
+
+def _join_rel_path(rel_dir, name):
+    if rel_dir:
+        return rel_dir + '/' + name
+    return name
+
+
+def _remove_path(entry, rel_path, statistics):
+    """
+    Removes the file or directory of the given entry and adds all removed files to the statistics.
+    """
+    if entry.is_dir(follow_symlinks=False):
+        for dirpath, dirnames, filenames in os.walk(entry.path):
+            rel_dirpath = os.path.join(rel_path, os.path.relpath(dirpath, entry.path))
+            # Symlinks to directories are listed as directories but not followed by os.walk().
+            for name in filenames + [name for name in dirnames if os.path.islink(os.path.join(dirpath, name))]:
+                statistics.deleted_files.append(os.path.normpath(os.path.join(rel_dirpath, name)).replace(os.sep, '/'))
+        shutil.rmtree(entry.path)
+    else:
+        os.remove(entry.path)
+        statistics.deleted_files.append(rel_path)
+
+
+def _files_are_equal(source_entry, source_stat, target_entry, compare_content):
+    target_stat = target_entry.stat(follow_symlinks=False)
+    if source_stat.st_size != target_stat.st_size:
+        return False
+    if source_stat.st_mtime_ns == target_stat.st_mtime_ns:
+        return True
+    if compare_content:
+        return filecmp.cmp(source_entry.path, target_entry.path, shallow=False)
+    return False
+
+
+def _link_or_copy_file(source_file, target_file):
+    if _is_immutable_git_object(source_file):
+        try:
+            os.link(source_file, target_file)
+            return target_file
+        except OSError:
+            pass # e.g. the filesystem does not support hardlinks.
+    return shutil.copy2(source_file, target_file)
+
+
+def _is_immutable_git_object(path):
+    """
+    Returns True for loose objects and pack files in the object database of a git repository.
+    """
+    parts = PurePosixPath(str(path).replace('\\', '/')).parts
+    if '.git' not in parts:
+        return False
+    for index in range(parts.index('.git') + 1, len(parts) - 1):
+        if parts[index] == 'objects':
+            return parts[index + 1] != 'info'
+    return False
@@ -0,0 +1,188 @@
+"""
+This module contains the tests of the filetreeutils module.
+"""
+
+import os
+import shutil
+
+from . import filetreeutils
+from .tempdirfixture import TempDirFixture
+
+
+class SyncTreeCase(TempDirFixture):
+    """
+    Tests the sync_tree() function.
+    """
+
+    def setUp(self):
+        super(SyncTreeCase, self).setUp()
+        self.source_dir = self.get_path('source')
+        self.target_dir = self.get_path('target')
+
+        self.write_file('source/CMakeLists.txt', 'project(MyLib)')
+        self.write_file('source/src/lib.cpp', 'int f();')
+        os.symlink('lib.cpp', self.get_path('source', 'src', 'link.cpp'))
+        self.write_file('source/.git/HEAD', 'ref: refs/heads/master')
+
+    def test_first_sync_copies_everything(self):
+        statistics = filetreeutils.sync_tree(self.source_dir, self.target_dir, excluded_top_level_names=['.git'])
+
+        self.assertEqual(sorted(statistics.written_files), ['CMakeLists.txt', 'src/lib.cpp', 'src/link.cpp'])
+        self.assertEqual(statistics.created_dirs, ['src'])
+        self.assertEqual(statistics.bytes_written, len('project(MyLib)') + len('int f();'))
+        self.assertEqual(os.readlink(self.get_path('target', 'src', 'link.cpp')), 'lib.cpp')
+        self.assertFalse(os.path.exists(self.get_path('target', '.git')))
+
+    def test_second_sync_only_writes_the_changes(self):
+        filetreeutils.sync_tree(self.source_dir, self.target_dir)
+        self.write_file('source/src/lib.cpp', 'int g();')
+        os.remove(self.get_path('source', 'CMakeLists.txt'))
+        os.chmod(self.get_path('source', '.git', 'HEAD'), 0o600)
+
+        statistics = filetreeutils.sync_tree(self.source_dir, self.target_dir)
+
+        self.assertEqual(statistics.written_files, ['src/lib.cpp'])
+        self.assertEqual(statistics.deleted_files, ['CMakeLists.txt'])
+        self.assertEqual(statistics.chmodded_files, ['.git/HEAD'])
+        self.assertEqual(statistics.created_dirs, [])
+        self.assertEqual(filetreeutils.get_tree_content_hash(self.source_dir), filetreeutils.get_tree_content_hash(self.target_dir))
+
+    def test_files_with_new_modification_times_are_compared_by_content(self):
+        filetreeutils.sync_tree(self.source_dir, self.target_dir)
+        os.utime(self.get_path('source', 'src', 'lib.cpp'), (0, 0))
+
+        statistics = filetreeutils.sync_tree(self.source_dir, self.target_dir)
+        self.assertEqual(statistics.get_changed_paths(), [])
+
+        statistics = filetreeutils.sync_tree(self.source_dir, self.target_dir, compare_content=False)
+        self.assertEqual(statistics.get_changed_paths(), ['src/lib.cpp'])
+
+    def test_objects_that_changed_their_type_are_replaced(self):
+        filetreeutils.sync_tree(self.source_dir, self.target_dir)
+        shutil.rmtree(self.get_path('source', 'src'))
+        self.write_file('source/src', 'now a file')
+
+        statistics = filetreeutils.sync_tree(self.source_dir, self.target_dir)
+
+        self.assertEqual(sorted(statistics.deleted_files), ['src/lib.cpp', 'src/link.cpp'])
+        self.assertEqual(statistics.written_files, ['src'])
+        self.assertTrue(os.path.isfile(self.get_path('target', 'src')))
+
+    def test_excluded_names_are_neither_copied_nor_deleted(self):
+        self.write_file('source/src/__pycache__/lib.pyc', 'pyc')
+        self.write_file('target/__pycache__/old.pyc', 'pyc')
+
+        statistics = filetreeutils.sync_tree(self.source_dir, self.target_dir, excluded_names=['__pycache__'])
+
+        self.assertEqual(statistics.deleted_files, [])
+        self.assertFalse(os.path.exists(self.get_path('target', 'src', '__pycache__')))
+        self.assertTrue(os.path.exists(self.get_path('target', '__pycache__', 'old.pyc')))
+
+
+class IterateTreeCase(TempDirFixture):
+    """
+    Tests the iterate_tree() function.
+    """
+
+    def setUp(self):
+        super(IterateTreeCase, self).setUp()
+        self.write_file('b.txt', 'b')
+        self.write_file('a/c.txt', 'c')
+        self.write_file('a/__pycache__/c.pyc', 'pyc')
+        self.write_file('.git/HEAD', 'head')
+        os.symlink('a', self.get_path('link'))
+
+    def test_yields_all_objects_with_their_types(self):
+        objects = [(rel_path, object_type) for rel_path, object_type, entry in filetreeutils.iterate_tree(self.temp_dir, sort=True)]
+        self.assertEqual(objects, [
+            ('.git', filetreeutils.DIRECTORY),
+            ('a', filetreeutils.DIRECTORY),
+            ('b.txt', filetreeutils.FILE),
+            ('link', filetreeutils.SYMLINK),
+            ('a/__pycache__', filetreeutils.DIRECTORY),
+            ('a/c.txt', filetreeutils.FILE),
+            ('a/__pycache__/c.pyc', filetreeutils.FILE),
+            ('.git/HEAD', filetreeutils.FILE),
+        ])
+
+    def test_excluded_names(self):
+        rel_paths = [rel_path for rel_path, object_type, entry in filetreeutils.iterate_tree(self.temp_dir, ['.git', 'c.txt'], ['__pycache__'])]
+        self.assertEqual(sorted(rel_paths), ['a', 'a/c.txt', 'b.txt', 'link'])
+
+    def test_directories_are_yielded_before_their_content(self):
+        rel_paths = [rel_path for rel_path, object_type, entry in filetreeutils.iterate_tree(self.temp_dir)]
+        self.assertLess(rel_paths.index('a'), rel_paths.index('a/c.txt'))
+        self.assertLess(rel_paths.index('a/__pycache__'), rel_paths.index('a/__pycache__/c.pyc'))
+
+
+class DirectoryIndexCase(TempDirFixture):
+    """
+    Tests the DirectoryIndex class.
+    """
+
+    def setUp(self):
+        super(DirectoryIndexCase, self).setUp()
+        self.write_file('lib/libMyLib.so.1.0.0', 'so')
+        os.symlink('libMyLib.so.1.0.0', self.get_path('lib', 'libMyLib.so'))
+        os.symlink('missing.so', self.get_path('lib', 'broken.so'))
+
+    def test_get_type(self):
+        index = filetreeutils.DirectoryIndex()
+        self.assertEqual(index.get_type(self.get_path('lib')), filetreeutils.DIRECTORY)
+        self.assertEqual(index.get_type(self.get_path('lib', 'libMyLib.so.1.0.0')), filetreeutils.FILE)
+        self.assertEqual(index.get_type(self.get_path('lib', 'libMyLib.so')), filetreeutils.SYMLINK)
+        self.assertEqual(index.get_type(self.get_path('lib', 'broken.so')), filetreeutils.SYMLINK)
+        self.assertIsNone(index.get_type(self.get_path('lib', 'libMyLib.a')))
+        self.assertIsNone(index.get_type(self.get_path('bin', 'MyLib.dll')))
+
+    def test_exists_follows_symlinks(self):
+        index = filetreeutils.DirectoryIndex()
+        for path in ['lib', 'lib/libMyLib.so.1.0.0', 'lib/libMyLib.so', 'lib/broken.so', 'lib/libMyLib.a', 'bin/MyLib.dll', 'lib/../lib/libMyLib.so']:
+            full_path = self.get_path(path)
+            self.assertEqual(index.exists(full_path), os.path.exists(full_path), path)
+
+    def test_directories_are_listed_once(self):
+        index = filetreeutils.DirectoryIndex()
+        index.exists(self.get_path('lib', 'libMyLib.so.1.0.0'))
+        self.write_file('lib/libMyLib.a', 'a')
+        self.assertFalse(index.exists(self.get_path('lib', 'libMyLib.a')))
+        self.assertTrue(filetreeutils.DirectoryIndex().exists(self.get_path('lib', 'libMyLib.a')))
+
+
+class CopyTreeCopyOnWriteCase(TempDirFixture):
+    """
+    Tests the copy_tree_copy_on_write() function.
+    """
+
+    def setUp(self):
+        super(CopyTreeCopyOnWriteCase, self).setUp()
+        self.source_dir = self.get_path('source')
+        self.target_dir = self.get_path('target')
+
+        self.write_file('source/CMakeLists.txt', 'project(MyLib)')
+        self.write_file('source/.git/objects/ab/cdef', 'blob')
+        self.write_file('source/.git/objects/info/packs', 'P')
+        os.symlink('CMakeLists.txt', self.get_path('source', 'link.txt'))
+
+    def test_copy_has_the_same_content(self):
+        filetreeutils.copy_tree_copy_on_write(self.source_dir, self.target_dir)
+        self.assertEqual(filetreeutils.get_tree_content_hash(self.source_dir), filetreeutils.get_tree_content_hash(self.target_dir))
+
+    def test_changing_the_copy_does_not_change_the_source(self):
+        filetreeutils.copy_tree_copy_on_write(self.source_dir, self.target_dir)
+        self.write_file('target/CMakeLists.txt', 'project(Other)')
+        self.write_file('target/.git/objects/info/packs', 'Q')
+
+        with open(self.get_path('source', 'CMakeLists.txt')) as f:
+            self.assertEqual(f.read(), 'project(MyLib)')
+        with open(self.get_path('source', '.git', 'objects', 'info', 'packs')) as f:
+            self.assertEqual(f.read(), 'P')
+
+    def test_git_objects_are_hardlinked_without_reflink_support(self):
+        if filetreeutils._supports_reflinks(self.source_dir, self.temp_dir):
+            self.skipTest('The filesystem supports copy-on-write clones.')
+
+        filetreeutils.copy_tree_copy_on_write(self.source_dir, self.target_dir)
+        self.assertTrue(os.path.samefile(self.get_path('source', '.git', 'objects', 'ab', 'cdef'), self.get_path('target', '.git', 'objects', 'ab', 'cdef')))
+        self.assertFalse(os.path.samefile(self.get_path('source', '.git', 'objects', 'info', 'packs'), self.get_path('target', '.git', 'objects', 'info', 'packs')))
+        self.assertFalse(os.path.samefile(self.get_path('source', 'CMakeLists.txt'), self.get_path('target', 'CMakeLists.txt')))
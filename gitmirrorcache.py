@@ -0,0 +1,178 @@
+"""
+This module contains a cache of bare mirror repositories for the test projects.
+
+Cloning the test projects and their submodules from the network takes a lot of time
+and is done once per test module. With the cache, each repository is only mirrored
+once into a cache directory. Workspaces are then cloned from these local mirrors,
+which means that git hardlinks the objects instead of downloading them.
+The mirrors are only updated from their remotes when this is explicitly requested.
+"""
+
+import os
+import hashlib
+from pathlib import PurePosixPath
+
+from Sources.CPFBuildscripts.python import miscosaccess
+from Sources.CPFBuildscripts.python import filesystemaccess
+from . import filelock
+
+
+# Repositories that have already been refreshed by this process.
+_refreshed_mirrors = set()
+
+
+def clone_recursive(repository, target_dir, cache_dir, refresh=False):
+    """
+    Does the same as "git clone --recursive <repository> <target_dir>", but clones
+    the repository and its submodules from the mirrors in the cache_dir.
+    Missing mirrors are created. Existing mirrors are only fetched
+    from their remote if refresh is set to True.
+
+    The remote urls of the cloned repositories still point to the original remotes.
+    """
+    fsa = filesystemaccess.FileSystemAccess()
+    osa = miscosaccess.MiscOsAccess()
+    target_dir = PurePosixPath(target_dir)
+
+    mirror_dir = get_mirror(repository, cache_dir, refresh)
+    fsa.mkdirs(target_dir.parent)
+    osa.execute_command_output(
+        'git clone "{0}" "{1}"'.format(mirror_dir, target_dir.name),
+        cwd=target_dir.parent,
+        print_output=miscosaccess.OutputMode.ON_ERROR
+    )
+    osa.execute_command_output(
+        'git remote set-url origin "{0}"'.format(repository),
+        cwd=target_dir,
+        print_output=miscosaccess.OutputMode.ON_ERROR
+    )
+    _update_submodules_from_mirrors(target_dir, cache_dir, refresh)
+
+
+def get_mirror(repository, cache_dir, refresh=False):
+    """
+    Returns the path to the bare mirror of the given repository.
+    The mirror is created if it does not exist yet.
+    """
+    fsa = filesystemaccess.FileSystemAccess()
+    osa = miscosaccess.MiscOsAccess()
+
+    mirror_dir = PurePosixPath(cache_dir).joinpath(get_mirror_name(repository))
+    with filelock.FileLock(str(mirror_dir) + '.lock'):
+        if not fsa.exists(mirror_dir):
+            # We clone into a temporary directory first, so an aborted clone
+            # does not leave a broken mirror behind.
+            temp_mirror_dir = PurePosixPath(str(mirror_dir) + '.tmp')
+            if fsa.exists(temp_mirror_dir):
+                fsa.rmtree(temp_mirror_dir)
+            fsa.mkdirs(cache_dir)
+            osa.execute_command_output(
+                'git clone --mirror "{0}" "{1}"'.format(repository, temp_mirror_dir.name),
+                cwd=cache_dir,
+                print_output=miscosaccess.OutputMode.ON_ERROR
+            )
+            os.rename(str(temp_mirror_dir), str(mirror_dir))
+            _refreshed_mirrors.add(repository)
+
+        elif refresh and repository not in _refreshed_mirrors:
+            osa.execute_command_output(
+                'git remote update --prune',
+                cwd=mirror_dir,
+                print_output=miscosaccess.OutputMode.ON_ERROR
+            )
+            _refreshed_mirrors.add(repository)
+
+    return mirror_dir
+
+
+def get_mirror_name(repository):
+    """
+    Returns the directory name of the mirror for the given repository url.
+    The hash of the url is added to keep repositories with the same name apart.
+    """
+    name = repository.rstrip('/').split('/')[-1].split(':')[-1]
+    if name.endswith('.git'):
+        name = name[:-len('.git')]
+    url_hash = hashlib.md5(repository.encode('utf-8')).hexdigest()[0:8]
+    return '{0}-{1}.git'.format(name, url_hash)
+
+
+def _update_submodules_from_mirrors(repository_dir, cache_dir, refresh):
+    """
+    Checks out the submodules of the given repository from their mirrors.
+    This is done by temporarily setting the submodule urls to the mirrors.
+    """
+    osa = miscosaccess.MiscOsAccess()
+
+    # This writes the submodule urls into the local config.
+    # Relative urls are resolved against the url of the origin remote.
+    osa.execute_command_output(
+        'git submodule init',
+        cwd=repository_dir,
+        print_output=miscosaccess.OutputMode.ON_ERROR
+    )
+    submodule_urls = _get_submodule_urls(repository_dir)
+    if not submodule_urls:
+        return
+
+    for name, url in submodule_urls.items():
+        mirror_dir = get_mirror(url, cache_dir, refresh)
+        _set_config_value(repository_dir, 'submodule.{0}.url'.format(name), str(mirror_dir))
+
+    # Newer versions of git forbid cloning submodules from the local filesystem by default.
+    osa.execute_command_output(
+        'git -c protocol.file.allow=always submodule update',
+        cwd=repository_dir,
+        print_output=miscosaccess.OutputMode.ON_ERROR
+    )
+
+    for name, url in submodule_urls.items():
+        _set_config_value(repository_dir, 'submodule.{0}.url'.format(name), url)
+        submodule_dir = repository_dir.joinpath(_get_submodule_path(repository_dir, name))
+        osa.execute_command_output(
+            'git remote set-url origin "{0}"'.format(url),
+            cwd=submodule_dir,
+            print_output=miscosaccess.OutputMode.ON_ERROR
+        )
+        _update_submodules_from_mirrors(submodule_dir, cache_dir, refresh)
+
+
+def _get_submodule_urls(repository_dir):
+    """
+    Returns a dictionary with the names and urls of the initialized submodules.
+    """
+    osa = miscosaccess.MiscOsAccess()
+    config_lines = osa.execute_command_output(
+        'git config --local --list',
+        cwd=repository_dir,
+        print_output=miscosaccess.OutputMode.ON_ERROR,
+        print_command=False
+    )
+
+    urls = {}
+    for line in config_lines:
+        key, separator, value = line.partition('=')
+        if separator and key.startswith('submodule.') and key.endswith('.url'):
+            urls[key[len('submodule.'):-len('.url')]] = value
+    return urls
+
+
+def _get_submodule_path(repository_dir, name):
+    osa = miscosaccess.MiscOsAccess()
+    output = osa.execute_command_output(
+        'git config -f .gitmodules --get "submodule.{0}.path"'.format(name),
+        cwd=repository_dir,
+        print_output=miscosaccess.OutputMode.ON_ERROR,
+        print_command=False
+    )
+    return output[0].strip()
+
+
+def _set_config_value(repository_dir, key, value):
+    osa = miscosaccess.MiscOsAccess()
+    osa.execute_command_output(
+        'git config "{0}" "{1}"'.format(key, value),
+        cwd=repository_dir,
+        print_output=miscosaccess.OutputMode.ON_ERROR,
+        print_command=False
+    )
@@ -0,0 +1,30 @@
+"""
+This module contains the tests of the gitmirrorcache module.
+"""
+
+import unittest
+
+from . import gitmirrorcache
+
+
+class GitMirrorNameCase(unittest.TestCase):
+    """
+    Tests the names of the mirror directories.
+    """
+
+    def test_name_is_taken_from_the_url(self):
+        for repository in [
+            'https://github.com/Knitschi/CPFTestProject.git',
+            'https://github.com/Knitschi/CPFTestProject/',
+            'git@github.com:Knitschi/CPFTestProject.git',
+            'C:/repositories/CPFTestProject',
+            ]:
+            self.assertRegex(gitmirrorcache.get_mirror_name(repository), r'^CPFTestProject-[0-9a-f]{8}\.git$', repository)
+
+    def test_repositories_with_equal_names_get_different_mirrors(self):
+        self.assertNotEqual(
+            gitmirrorcache.get_mirror_name('https://github.com/Knitschi/CPFTestProject.git'),
+            gitmirrorcache.get_mirror_name('https://example.com/Fork/CPFTestProject.git'))
+        self.assertEqual(
+            gitmirrorcache.get_mirror_name('https://github.com/Knitschi/CPFTestProject.git'),
+            gitmirrorcache.get_mirror_name('https://github.com/Knitschi/CPFTestProject.git'))
@@ -0,0 +1,126 @@
+"""
+This module contains functions that create git commits with plumbing commands.
+
+Porcelain commands like "git add ." or "git commit ." scan the whole working tree.
+The functions in this module only look at the paths that are known to have changed,
+which makes them much cheaper for large repositories with few changes.
+"""
+
+import os
+import subprocess
+
+
+def commit_paths(repository_dir, rel_paths, message):
+    """
+    Stages the given paths and commits the index on top of HEAD. The paths must be relative
+    to the repository_dir. Deleted paths are removed from the index. The paths are added
+    even if they are ignored by git, so the caller must not pass ignored paths.
+    An empty commit is created if no paths are given. Returns the hash of the new commit.
+    """
+    if rel_paths:
+        # This hashes the files, writes them into the object database and updates the index entries
+        # including the stat information, so the files do not look modified to later git calls.
+        _run_git(['update-index', '--add', '--remove', '--replace', '-z', '--stdin'], repository_dir, '\0'.join(rel_paths) + '\0')
+    return _commit_index(repository_dir, message)
+
+
+def commit_gitlinks(repository_dir, gitlinks, message):
+    """
+    Sets the commits of the submodules in the given gitlinks dictionary and commits
+    them on top of HEAD. The keys of the dictionary are the paths of the submodules
+    relative to the repository_dir and the values are the hashes of the commits.
+    Returns the hash of the new commit.
+    """
+    index_info = ''
+    for path, commit in gitlinks.items():
+        index_info += '160000 {0}\t{1}\n'.format(commit, path)
+    _run_git(['update-index', '--index-info'], repository_dir, index_info)
+    return _commit_index(repository_dir, message)
+
+
+def get_repository_state(repository_dir):
+    """
+    Returns a tuple that changes when HEAD, the commit that HEAD points to or the index of the
+    repository change. The state is read from the files in the git directory without running git.
+    Returns None if the directory is not the root of a work tree.
+    """
+    git_dir = _get_git_dir(repository_dir)
+    if not git_dir:
+        return None
+
+    head = _read_file_or_empty(os.path.join(git_dir, 'HEAD')).strip()
+    commit = head
+    if head.startswith('ref: '):
+        commit = _read_ref(git_dir, head[len('ref: '):])
+
+    index_stat = None
+    index_file = os.path.join(git_dir, 'index')
+    if os.path.isfile(index_file):
+        stat = os.stat(index_file)
+        index_stat = (stat.st_mtime_ns, stat.st_size)
+
+    return (head, commit, index_stat)
+
+
+def _get_git_dir(repository_dir):
+    dot_git = os.path.join(str(repository_dir), '.git')
+    if os.path.isdir(dot_git):
+        return dot_git
+    if os.path.isfile(dot_git):
+        # Submodules and worktrees have a file that points to their git directory.
+        content = _read_file_or_empty(dot_git).strip()
+        if content.startswith('gitdir: '):
+            return os.path.normpath(os.path.join(str(repository_dir), content[len('gitdir: '):]))
+    return None
+
+
+def _read_ref(git_dir, ref):
+    # Worktrees share the refs with the main repository.
+    common_dir = _read_file_or_empty(os.path.join(git_dir, 'commondir')).strip()
+    ref_dirs = [git_dir]
+    if common_dir:
+        ref_dirs.append(os.path.normpath(os.path.join(git_dir, common_dir)))
+
+    for ref_dir in ref_dirs:
+        commit = _read_file_or_empty(os.path.join(ref_dir, ref)).strip()
+        if commit:
+            return commit
+        for line in _read_file_or_empty(os.path.join(ref_dir, 'packed-refs')).splitlines():
+            if line.endswith(' ' + ref):
+                return line.split(' ')[0]
+    return ''
+
+
+def _read_file_or_empty(file):
+    if not os.path.isfile(file):
+        return ''
+    with open(file) as f:
+        return f.read()
+
+
+def _commit_index(repository_dir, message):
+    tree = _run_git(['write-tree'], repository_dir).strip()
+    commit = _run_git(['commit-tree', tree, '-p', 'HEAD', '-m', message], repository_dir).strip()
+    _run_git(['update-ref', 'HEAD', commit], repository_dir)
+    return commit
+
+
+def _run_git(arguments, cwd, input=None):
+    """
+    Runs git with the given arguments and returns its standard output.
+    In contrast to miscosaccess.execute_command_output() this allows feeding
+    data to the standard input of the process. The error output is kept apart,
+    so warnings like the line ending notices do not end up in the parsed output.
+    """
+    command = ['git'] + arguments
+    result = subprocess.run(
+        command,
+        cwd=str(cwd),
+        input=input,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True
+    )
+    if result.returncode != 0:
+        raise Exception('Error! Command "{0}" failed in directory "{1}" with output:\n{2}{3}'.format(' '.join(command), cwd, result.stdout, result.stderr))
+    return result.stdout
@@ -0,0 +1,107 @@
+"""
+This module contains the tests of the gitplumbing module.
+"""
+
+import os
+import subprocess
+
+from . import gitplumbing
+from .tempdirfixture import TempDirFixture
+
+
+class GitPlumbingCase(TempDirFixture):
+    """
+    Tests the functions of the gitplumbing module with a temporary repository.
+    """
+
+    def setUp(self):
+        super(GitPlumbingCase, self).setUp()
+        self.repository_dir = self.temp_dir
+
+        self.run_git(['init', '-q'])
+        self.run_git(['config', 'user.name', 'Tester'])
+        self.run_git(['config', 'user.email', 'tester@example.com'])
+        self.write_file('old.txt', 'old')
+        self.write_file('changed.txt', 'before')
+        self.run_git(['add', '.'])
+        self.run_git(['commit', '-q', '-m', 'Initial commit'])
+
+    def run_git(self, arguments):
+        return subprocess.check_output(['git'] + arguments, cwd=self.repository_dir, universal_newlines=True, stderr=subprocess.DEVNULL)
+
+    def get_committed_files(self):
+        return self.run_git(['ls-tree', '-r', '--name-only', 'HEAD']).split()
+
+    def test_commit_paths(self):
+        os.remove(self.get_path('old.txt'))
+        self.write_file('changed.txt', 'after')
+        self.write_file('src/new.txt', 'new')
+
+        commit = gitplumbing.commit_paths(self.repository_dir, ['old.txt', 'changed.txt', 'src/new.txt'], 'Replace files')
+
+        self.assertEqual(self.run_git(['rev-parse', 'HEAD']).strip(), commit)
+        self.assertEqual(self.run_git(['log', '-1', '--format=%s']).strip(), 'Replace files')
+        self.assertEqual(self.get_committed_files(), ['changed.txt', 'src/new.txt'])
+        self.assertEqual(self.run_git(['show', 'HEAD:changed.txt']), 'after')
+        # The index has the stat information of the files, so nothing looks modified.
+        self.assertEqual(self.run_git(['status', '--porcelain']), '')
+
+    def test_git_warnings_are_not_part_of_the_output(self):
+        # Git warns about the line endings that it will change when autocrlf is set.
+        self.run_git(['config', 'core.autocrlf', 'true'])
+        self.write_file('changed.txt', 'after\n')
+
+        output = gitplumbing._run_git(['hash-object', 'changed.txt'], self.repository_dir)
+        self.assertRegex(output, r'^[0-9a-f]{40}\n$')
+
+        commit = gitplumbing.commit_paths(self.repository_dir, ['changed.txt'], 'Change line endings')
+        self.assertEqual(self.run_git(['rev-parse', 'HEAD']).strip(), commit)
+
+    def test_commit_paths_without_paths_creates_an_empty_commit(self):
+        old_commit = self.run_git(['rev-parse', 'HEAD']).strip()
+        commit = gitplumbing.commit_paths(self.repository_dir, [], 'Empty commit')
+        self.assertEqual(self.run_git(['rev-parse', 'HEAD^']).strip(), old_commit)
+        self.assertEqual(self.run_git(['rev-parse', 'HEAD^{tree}']), self.run_git(['rev-parse', old_commit + '^{tree}']))
+        self.assertNotEqual(commit, old_commit)
+
+    def test_commit_gitlinks(self):
+        submodule_commit = 'a' * 40
+        gitplumbing.commit_gitlinks(self.repository_dir, { 'Sources/MyPackage' : submodule_commit }, 'Set submodule')
+        self.assertEqual(
+            self.run_git(['ls-tree', 'HEAD', 'Sources/MyPackage']).strip(),
+            '160000 commit {0}\tSources/MyPackage'.format(submodule_commit))
+
+    def test_failing_git_command_raises(self):
+        with self.assertRaises(Exception):
+            gitplumbing.commit_gitlinks(self.repository_dir, { 'Sources/MyPackage' : 'invalid' }, 'Set submodule')
+
+    def test_repository_state_changes_with_head_and_index(self):
+        state = gitplumbing.get_repository_state(self.repository_dir)
+        head, commit, index_stat = state
+        self.assertTrue(head.startswith('ref: refs/heads/'))
+        self.assertEqual(commit, self.run_git(['rev-parse', 'HEAD']).strip())
+
+        # Packed refs are read as well as loose refs.
+        self.run_git(['pack-refs', '--all'])
+        self.assertEqual(gitplumbing.get_repository_state(self.repository_dir)[1], commit)
+
+        gitplumbing.commit_paths(self.repository_dir, [], 'Empty commit')
+        new_state = gitplumbing.get_repository_state(self.repository_dir)
+        self.assertEqual(new_state[1], self.run_git(['rev-parse', 'HEAD']).strip())
+        self.assertNotEqual(new_state, state)
+
+        self.run_git(['checkout', '-q', '--detach'])
+        self.assertEqual(gitplumbing.get_repository_state(self.repository_dir)[:2], (new_state[1], new_state[1]))
+
+    def test_repository_state_of_a_worktree(self):
+        worktree_dir = self.get_path('worktree')
+        self.run_git(['worktree', 'add', '-q', '-b', 'other', worktree_dir])
+        self.run_git(['pack-refs', '--all'])
+
+        head, commit, index_stat = gitplumbing.get_repository_state(worktree_dir)
+        self.assertEqual(head, 'ref: refs/heads/other')
+        self.assertEqual(commit, self.run_git(['rev-parse', 'other']).strip())
+        self.assertIsNotNone(index_stat)
+
+    def test_repository_state_of_a_plain_directory(self):
+        self.assertIsNone(gitplumbing.get_repository_state(self.get_path('src')))
@@ -0,0 +1,119 @@
+"""
+This module contains a GNU make compatible jobserver that is shared by the test modules.
+
+The test modules run in parallel processes and each of them builds test projects.
+Without coordination each build uses as many jobs as the machine has cores, which
+oversubscribes the machine. The jobserver is a named pipe that contains one token
+for each job that may run in addition to the one job that each build may always run.
+Make 4.4 and Ninja 1.13 take their tokens from the pipe when they find it in the
+MAKEFLAGS environment variable.
+
+The pipe stays valid as long as one of the processes that use it is alive. Processes that
+start later join the existing pipe instead of adding more tokens. Named pipes are not available
+on Windows, older versions of make only accept inherited file descriptors, which do not reach
+the builds through the scripts of the test projects, and older versions of ninja have no jobserver
+support. No jobserver is used in these cases.
+"""
+
+import os
+import re
+import shutil
+import subprocess
+
+from . import filelock
+
+
+# The build tools that can take their tokens from a named pipe, with the first version that can do it.
+_pipe_clients = [
+    ('make', re.compile(r'GNU Make (\d+)\.(\d+)'), (4, 4)),
+    ('ninja', re.compile(r'^(\d+)\.(\d+)'), (1, 13)),
+]
+
+
+def is_supported():
+    """
+    Returns True if named pipes are available and all installed build tools are new enough to take their
+    tokens from a named pipe. Older versions of make stop with an error when they find a named pipe in the
+    MAKEFLAGS and older versions of ninja ignore it. Returns False if neither make nor ninja is installed.
+    """
+    if not hasattr(os, 'mkfifo'):
+        return False
+
+    found_client = False
+    for tool, version_regex, minimum_version in _pipe_clients:
+        executable = shutil.which(tool)
+        if not executable:
+            continue
+        found_client = True
+        output = subprocess.run([executable, '--version'], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, universal_newlines=True).stdout
+        match = version_regex.search(output)
+        if not match or (int(match.group(1)), int(match.group(2))) < minimum_version:
+            return False
+
+    return found_client
+
+
+def get_outer_jobserver_flags():
+    """
+    Returns the MAKEFLAGS if the process was started by a build tool that already provides a jobserver.
+    """
+    makeflags = os.environ.get('MAKEFLAGS', '')
+    if '--jobserver-auth=' in makeflags or '--jobserver-fds=' in makeflags:
+        return makeflags
+    return None
+
+
+class JobServer:
+    """
+    A jobserver with the given number of jobs whose pipe is created in the given directory.
+    """
+    def __init__(self, directory, jobs):
+        self.directory = str(directory)
+        self.jobs = jobs
+        self.fifo = os.path.join(self.directory, 'jobserver.fifo')
+        self.participants_file = os.path.join(self.directory, 'participants.txt')
+        self.fd = None
+
+    def start(self):
+        """
+        Creates the pipe and its tokens or joins the pipe of another running process.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        with filelock.FileLock(os.path.join(self.directory, 'jobserver.lock')):
+            participants = [pid for pid in self._read_participants() if _is_running(pid)]
+            if not participants or not os.path.exists(self.fifo):
+                if os.path.lexists(self.fifo):
+                    os.remove(self.fifo)
+                os.mkfifo(self.fifo)
+                # Keeping the pipe open for reading and writing keeps the tokens in the pipe
+                # while no build is running.
+                self.fd = os.open(self.fifo, os.O_RDWR | os.O_NONBLOCK)
+                os.write(self.fd, b'+' * (self.jobs - 1))
+            else:
+                self.fd = os.open(self.fifo, os.O_RDWR | os.O_NONBLOCK)
+
+            participants.append(os.getpid())
+            with open(self.participants_file, 'w') as f:
+                f.write('\n'.join(str(pid) for pid in participants))
+
+    def get_makeflags(self):
+        """
+        Returns the MAKEFLAGS that make the build tools use this jobserver.
+        """
+        return ' -j{0} --jobserver-auth=fifo:{1}'.format(self.jobs, self.fifo)
+
+    def _read_participants(self):
+        if not os.path.isfile(self.participants_file):
+            return []
+        with open(self.participants_file) as f:
+            return [int(line) for line in f.read().split() if line.isdigit()]
+
+
+def _is_running(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
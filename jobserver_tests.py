@@ -0,0 +1,56 @@
+"""
+This module contains the tests of the jobserver module.
+"""
+
+import os
+import unittest
+
+from . import jobserver
+from .tempdirfixture import TempDirFixture
+
+
+class JobServerCase(TempDirFixture):
+    """
+    Tests the jobserver that is shared by the builds of the test modules.
+    """
+
+    def setUp(self):
+        super(JobServerCase, self).setUp()
+        makeflags = os.environ.get('MAKEFLAGS')
+        self.addCleanup(self.restore_makeflags, makeflags)
+
+    def restore_makeflags(self, makeflags):
+        os.environ.pop('MAKEFLAGS', None)
+        if makeflags is not None:
+            os.environ['MAKEFLAGS'] = makeflags
+
+    def start_jobserver(self, jobs):
+        server = jobserver.JobServer(self.temp_dir, jobs)
+        server.start()
+        self.addCleanup(os.close, server.fd)
+        return server
+
+    def read_tokens(self, fd):
+        try:
+            return os.read(fd, 100)
+        except BlockingIOError:
+            return b''
+
+    def test_outer_jobserver_flags(self):
+        os.environ['MAKEFLAGS'] = ' -j4 --jobserver-auth=3,4'
+        self.assertEqual(jobserver.get_outer_jobserver_flags(), ' -j4 --jobserver-auth=3,4')
+        os.environ['MAKEFLAGS'] = 'k'
+        self.assertIsNone(jobserver.get_outer_jobserver_flags())
+        os.environ.pop('MAKEFLAGS')
+        self.assertIsNone(jobserver.get_outer_jobserver_flags())
+
+    @unittest.skipUnless(hasattr(os, 'mkfifo'), 'The jobserver needs named pipes.')
+    def test_later_sessions_share_the_tokens(self):
+        server = self.start_jobserver(3)
+        self.assertEqual(server.get_makeflags(), ' -j3 --jobserver-auth=fifo:' + server.fifo)
+
+        # The pipe holds one token less than jobs, because each build tool has an implicit token.
+        # The second session joins the pipe of the first one instead of adding more tokens.
+        second_server = self.start_jobserver(3)
+        self.assertEqual(self.read_tokens(second_server.fd), b'++')
+        self.assertEqual(self.read_tokens(server.fd), b'')
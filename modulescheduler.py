@@ -0,0 +1,102 @@
+"""
+This module contains a scheduler that runs the test modules in parallel worker processes.
+
+The modules are started in the order of their durations in earlier sessions, longest first,
+so the long modules do not end up running alone at the end of a session. Modules without a
+stored duration are started first. The output of each worker is written into a log file and
+printed as one block when the module is finished.
+"""
+
+import os
+import sys
+import time
+import json
+import subprocess
+import concurrent.futures
+
+from . import filelock
+
+
+class ModuleResult:
+    """
+    The outcome of running the tests of one module in a worker process.
+    """
+    def __init__(self, module, returncode, duration, log_file):
+        self.module = module
+        self.returncode = returncode
+        self.duration = duration
+        self.log_file = log_file
+
+    def was_successful(self):
+        return self.returncode == 0
+
+
+def get_schedule(modules, durations):
+    """
+    Returns the modules in the order in which they should be started.
+    """
+    return sorted(modules, key=lambda module: -durations.get(module, float('inf')))
+
+
+def run_modules(modules, get_command, jobs, work_dir, print_function=print):
+    """
+    Runs the commands of the modules with at most jobs workers at the same time.
+    get_command is a function that returns the command line list of a module.
+    The durations and the log files are stored in the work_dir.
+    Returns a list of ModuleResult objects in the order in which the modules finished.
+    """
+    log_dir = os.path.join(str(work_dir), 'module_logs')
+    os.makedirs(log_dir, exist_ok=True)
+    durations_file = os.path.join(str(work_dir), 'module_durations.json')
+    schedule = get_schedule(modules, read_durations(durations_file))
+
+    results = []
+    # The executor starts the submitted modules in their order.
+    with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = [executor.submit(_run_module, module, get_command(module), os.path.join(log_dir, module + '.log')) for module in schedule]
+        for future in concurrent.futures.as_completed(futures):
+            result = future.result()
+            results.append(result)
+            _print_result(result, print_function)
+
+    # Failed modules stop early, so only the durations of successful modules are kept.
+    update_durations(durations_file, { result.module : round(result.duration, 1) for result in results if result.was_successful() })
+    return results
+
+
+def read_durations(durations_file):
+    """
+    Returns a dictionary with the stored durations of the modules in seconds.
+    """
+    if not os.path.isfile(durations_file):
+        return {}
+    with open(durations_file) as f:
+        try:
+            return json.load(f)
+        except ValueError:
+            return {}
+
+
+def update_durations(durations_file, durations):
+    # Sessions with different module selections can finish at the same time.
+    with filelock.FileLock(durations_file + '.lock'):
+        stored_durations = read_durations(durations_file)
+        stored_durations.update(durations)
+        with open(durations_file, 'w') as f:
+            json.dump(stored_durations, f, indent=2, sort_keys=True)
+
+
+def _run_module(module, command, log_file):
+    start_time = time.monotonic()
+    with open(log_file, 'w') as f:
+        returncode = subprocess.run(command, stdout=f, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL).returncode
+    return ModuleResult(module, returncode, time.monotonic() - start_time, log_file)
+
+
+def _print_result(result, print_function):
+    with open(result.log_file, errors='replace') as f:
+        output = f.read()
+    status = 'OK' if result.was_successful() else 'FAILED'
+    print_function('======== {0} ({1}, {2:.0f} s) ========'.format(result.module, status, result.duration))
+    print_function(output)
+    sys.stdout.flush()
@@ -0,0 +1,46 @@
+"""
+This module contains the tests of the modulescheduler module.
+"""
+
+import sys
+
+from . import modulescheduler
+from .tempdirfixture import TempDirFixture
+
+
+class ModuleSchedulerCase(TempDirFixture):
+    """
+    Tests the ordering and the stored durations of the module scheduler.
+    """
+
+    def setUp(self):
+        super(ModuleSchedulerCase, self).setUp()
+        self.durations_file = self.get_path('module_durations.json')
+
+    def test_long_and_unknown_modules_are_started_first(self):
+        schedule = modulescheduler.get_schedule(['short', 'new', 'long', 'medium'], { 'short' : 1.0, 'medium' : 10.0, 'long' : 100.0 })
+        self.assertEqual(schedule, ['new', 'long', 'medium', 'short'])
+
+    def test_durations_are_merged_into_the_stored_durations(self):
+        self.assertEqual(modulescheduler.read_durations(self.durations_file), {})
+        modulescheduler.update_durations(self.durations_file, { 'tests1' : 10.0, 'tests2' : 20.0 })
+        modulescheduler.update_durations(self.durations_file, { 'tests2' : 25.0 })
+        self.assertEqual(modulescheduler.read_durations(self.durations_file), { 'tests1' : 10.0, 'tests2' : 25.0 })
+
+    def test_corrupt_durations_file_is_ignored(self):
+        self.write_file('module_durations.json', '{ "tests1" : ')
+        self.assertEqual(modulescheduler.read_durations(self.durations_file), {})
+
+    def test_run_modules(self):
+        commands = {
+            'good' : [sys.executable, '-c', 'print("good output")'],
+            'bad' : [sys.executable, '-c', 'import sys; sys.exit(1)'],
+        }
+        printed = []
+
+        results = modulescheduler.run_modules(['good', 'bad'], lambda module: commands[module], 2, self.temp_dir, printed.append)
+
+        self.assertEqual(sorted((result.module, result.was_successful()) for result in results), [('bad', False), ('good', True)])
+        self.assertIn('good output\n', printed)
+        # Only the durations of successful modules are stored.
+        self.assertEqual(list(modulescheduler.read_durations(self.durations_file)), ['good'])
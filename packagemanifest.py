@@ -0,0 +1,121 @@
+"""
+This module contains a declarative description of the expected content of packages.
+
+A manifest maps content types to lists of (path template, object type, condition) tuples.
+The templates contain placeholders like {package} or {version} in the syntax of str.format().
+The condition is a string of space separated flags that must all be set for the entry to be
+expected. Flags with a leading '!' must not be set.
+
+A manifest is compiled once for each configuration. Compiling evaluates the configuration flags
+and replaces the placeholders of the configuration, so looking up the content of a package only
+filters the remaining entries by the package flags and fills in the package values.
+"""
+
+from pathlib import PurePosixPath
+
+from . import filetreeutils
+
+
+def add_condition(entries, condition):
+    """
+    Returns a copy of the manifest entries that are only expected when the additional condition is true.
+    """
+    return [(template, object_type, (condition + ' ' + entry_condition).strip()) for template, object_type, entry_condition in entries]
+
+
+class PackageManifest:
+    """
+    A manifest that keeps its compiled tables for all configurations that were used in this process.
+    """
+    def __init__(self, content_types):
+        self.content_types = content_types
+        self.compiled_manifests = {}
+
+    def compile(self, config_flags, config_values):
+        """
+        Returns the CompiledPackageManifest for the configuration.
+        config_flags is a dictionary that maps the names of the configuration flags to True or False.
+        config_values is a dictionary with the values of the configuration placeholders. The values
+        can contain package placeholders.
+        """
+        key = (tuple(sorted(config_flags.items())), tuple(sorted(config_values.items())))
+        if not key in self.compiled_manifests:
+            self.compiled_manifests[key] = CompiledPackageManifest(self.content_types, config_flags, config_values)
+        return self.compiled_manifests[key]
+
+
+class CompiledPackageManifest:
+    """
+    The entries of a manifest for one configuration.
+    """
+    def __init__(self, content_types, config_flags, config_values):
+        self.entries = {}
+        self.lookup_table = {}
+        for content_type, entries in content_types.items():
+            self.entries[content_type] = [
+                (_replace_config_values(template, config_values), object_type, package_condition)
+                for template, object_type, condition in entries
+                for is_expected, package_condition in [_evaluate_config_flags(condition, config_flags)]
+                if is_expected
+            ]
+
+    def get_content(self, content_type, package_flags, package_values):
+        """
+        Returns the lists of the expected files and symlinks.
+        package_flags are the flags of the package that are not configuration flags.
+        package_values are the values of the package placeholders.
+        """
+        package_flags = frozenset(package_flags)
+        key = (content_type, package_flags)
+        if not key in self.lookup_table:
+            if not content_type in self.entries:
+                raise Exception('Error! The package manifest has no content type "{0}".'.format(content_type))
+            self.lookup_table[key] = [
+                (template, object_type) for template, object_type, condition in self.entries[content_type]
+                if _flags_are_satisfied(condition, package_flags)
+            ]
+
+        files = []
+        symlinks = []
+        for template, object_type in self.lookup_table[key]:
+            path = PurePosixPath(template.format(**package_values))
+            if object_type == filetreeutils.SYMLINK:
+                symlinks.append(path)
+            else:
+                files.append(path)
+        return [files, symlinks]
+
+
+def _evaluate_config_flags(condition, config_flags):
+    """
+    Returns if the condition can be true in the configuration and the part of the condition that depends on the package.
+    """
+    package_condition = []
+    for flag in condition.split():
+        name = flag.lstrip('!')
+        if name in config_flags:
+            if config_flags[name] == flag.startswith('!'):
+                return False, ()
+        else:
+            package_condition.append(flag)
+    return True, tuple(package_condition)
+
+
+def _flags_are_satisfied(condition, flags):
+    for flag in condition:
+        if flag.startswith('!'):
+            if flag[1:] in flags:
+                return False
+        elif not flag in flags:
+            return False
+    return True
+
+
+class _KeepMissingPlaceholders(dict):
+    def __missing__(self, key):
+        return '{' + key + '}'
+
+
+def _replace_config_values(template, config_values):
+    # The package placeholders stay in the template for the lookup.
+    return template.format_map(_KeepMissingPlaceholders(config_values))
@@ -0,0 +1,70 @@
+"""
+This module contains the tests of the packagemanifest module.
+"""
+
+import unittest
+
+from . import packagemanifest
+from . import filetreeutils
+
+
+class PackageManifestCase(unittest.TestCase):
+    """
+    Tests the evaluation of the manifest conditions.
+    """
+
+    def setUp(self):
+        self.manifest = packagemanifest.PackageManifest({
+            'lib' : [
+                ('lib/{package}{postfix}.so.{version}', filetreeutils.FILE, 'linux shared'),
+                ('lib/{package}{postfix}.so', filetreeutils.SYMLINK, 'linux shared'),
+                ('lib/{package}{postfix}.a', filetreeutils.FILE, 'linux !shared'),
+                ('bin/{package}{postfix}.dll', filetreeutils.FILE, '!linux shared'),
+                ('lib/{package}{postfix}.lib', filetreeutils.FILE, '!linux'),
+            ],
+            'doc' : [
+                ('doc/{package}.html', filetreeutils.FILE, ''),
+            ],
+        })
+        self.package_values = { 'package' : 'MyLib', 'version' : '1.0.0' }
+
+    def get_lib_content(self, config_flags, package_flags):
+        compiled = self.manifest.compile(config_flags, { 'postfix' : '-d' })
+        files, symlinks = compiled.get_content('lib', package_flags, self.package_values)
+        return [str(path) for path in files], [str(path) for path in symlinks]
+
+    def test_config_and_package_flags_select_the_entries(self):
+        self.assertEqual(
+            self.get_lib_content({ 'linux' : True }, ['shared']),
+            (['lib/MyLib-d.so.1.0.0'], ['lib/MyLib-d.so']))
+        self.assertEqual(
+            self.get_lib_content({ 'linux' : True }, []),
+            (['lib/MyLib-d.a'], []))
+        self.assertEqual(
+            self.get_lib_content({ 'linux' : False }, ['shared']),
+            (['bin/MyLib-d.dll', 'lib/MyLib-d.lib'], []))
+        self.assertEqual(
+            self.get_lib_content({ 'linux' : False }, []),
+            (['lib/MyLib-d.lib'], []))
+
+    def test_config_values_can_contain_package_placeholders(self):
+        compiled = self.manifest.compile({ 'linux' : True }, { 'postfix' : '-{version}' })
+        files, _ = compiled.get_content('lib', [], self.package_values)
+        self.assertEqual([str(path) for path in files], ['lib/MyLib-1.0.0.a'])
+
+    def test_compiled_manifests_are_reused(self):
+        self.assertIs(
+            self.manifest.compile({ 'linux' : True, 'msvc' : False }, { 'postfix' : '' }),
+            self.manifest.compile({ 'msvc' : False, 'linux' : True }, { 'postfix' : '' }))
+        self.assertIsNot(
+            self.manifest.compile({ 'linux' : True }, { 'postfix' : '' }),
+            self.manifest.compile({ 'linux' : False }, { 'postfix' : '' }))
+
+    def test_add_condition(self):
+        entries = packagemanifest.add_condition([('a', filetreeutils.FILE, ''), ('b', filetreeutils.FILE, '!shared')], 'linux')
+        self.assertEqual(entries, [('a', filetreeutils.FILE, 'linux'), ('b', filetreeutils.FILE, 'linux !shared')])
+
+    def test_unknown_content_type_raises(self):
+        compiled = self.manifest.compile({ 'linux' : True }, { 'postfix' : '' })
+        with self.assertRaises(Exception):
+            compiled.get_content('runtime', [], self.package_values)
@@ -9,24 +9,54 @@ test_dir="C:/mytests" -> A base directory in which the script can put temporary
 parent_config=VS      -> The configuration from which the current config derives. Testprojects will be build in this configuration.
 compiler_config=Debug -> For multi-configuration generators, the compiler config that is used to build Testprojects.
 module                -> The module (python '*_tests.py' file) from which we want to run the tests. e.g. acpftestproject_tests
+                         With jobs > 0 this can be a comma separated list of modules or empty to run the tests of all modules.
 test_filter           -> Only run test cases with names that contain the filter string. e.g. test_distributionPackages_content
+
+Optional arguments:
+
+mirror_cache=ON       -> Clone the test projects from local mirror repositories in the test_dir. Set to OFF to clone from the network.
+refresh_mirrors=OFF   -> Set to ON to fetch the mirror repositories from their remotes before they are used.
+workspace_templates=OFF -> Set to ON to copy the test-project workspaces of all modules from one prepared template workspace per project.
+reuse_workspaces=ON   -> Keep the test-project workspaces of earlier runs if they and their inputs did not change. Set to OFF to always clone fresh workspaces.
+generate_cache=OFF    -> Set to ON to restore the generated files of identical generate steps from a cache in the test_dir.
+script_server=OFF     -> Set to ON to run the python scripts of the test projects in a warm server process instead of new interpreters. Linux only.
+compiler_cache=OFF    -> Set to ON to use ccache with a cache in the test_dir when building the test projects with Makefile or Ninja generators.
+build_graph_queries=OFF -> Set to ON to check that source files out-date targets by reading the CMake file API codemodel instead of rebuilding the targets. Ninja builds always use the ninja build graph.
+build_jobs=0          -> The maximum number of parallel build jobs of all test modules that run at the same time. 0 lets each build choose its own number of jobs.
+prepare_jobs=4        -> The number of test-projects that are prepared concurrently before the tests are run. 0 prepares them when the test classes are set up.
+jobs=0                -> Set to a number > 0 to run the tests of all selected modules in this session with up to this number of worker processes.
+                         The modules that took longest in earlier sessions are started first. The output of each module is printed when the module is finished
+                         and kept in the test_dir/module_logs directory.
 """
 
 import unittest
 import sys
 
 from .testprojectfixture import BASE_TEST_DIR, PARENT_CONFIG
+from . import modulescheduler
 
 # tests
 from .acpftestproject_tests import *
+from .archivelisting_tests import *
 from .bcpftestproject_tests import *
+from .buildgraph_tests import *
 from .ccpftestproject_tests import *
+from .cmakecache_tests import *
+from .filetreeutils_tests import *
+from .gitmirrorcache_tests import *
+from .gitplumbing_tests import *
+from .jobserver_tests import *
 from .misc_tests import *
+from .modulescheduler_tests import *
+from .packagemanifest_tests import *
+from .signatureindex_tests import *
 from .simpleonelibcpftestproject_tests1 import *
 from .simpleonelibcpftestproject_tests2 import *
 from .simpleonelibcpftestproject_tests3 import *
 from .simpleonelibcpftestproject_tests4 import *
 from .simpleonelibcpftestproject_tests5 import *
+from .trashbin_tests import *
+from .treediff_tests import *
 
 
 def parseKeyWordArgs( arglist ):
@@ -64,6 +94,17 @@ def getKeywordArgument(keyword, keywordargs):
         raise Exception('Test script requires {0} argument.'.format(keyword))
     return keywordargs[keyword]
 
+def getOptionalKeywordArgument(keyword, keywordargs, default):
+    if not keyword in keywordargs:
+        return default
+    return keywordargs[keyword]
+
+def isTrueValue(value):
+    """
+    Returns True for the values that CMake treats as true for boolean options.
+    """
+    return str(value).upper() in ['ON', 'TRUE', 'YES', 'Y', '1']
+
 
 def getTestNames():
     """
@@ -113,6 +154,67 @@ def filterTests(module, testFilter, testNames):
     return filteredNames
 
 
+def getTestProjects(testNames):
+    """
+    Returns a list with the argument tuples for testprojectfixture.prepareTestProject()
+    of all the fixture classes that are used by the given tests.
+    """
+    test_loader = unittest.TestLoader()
+    suite = test_loader.loadTestsFromNames(testNames)
+
+    testProjects = []
+    for test in iterateTestCases(suite):
+        fixture = type(test)
+        if getattr(fixture, 'repository', ''):
+            # The fixture classes use the name of their module as instantiating_test_module.
+            module = fixture.__module__.split('.')[-1]
+            testProject = (fixture.repository, fixture.project, fixture.cpf_cmake_dir, fixture.cpf_buildscripts_dir, module)
+            if not testProject in testProjects:
+                testProjects.append(testProject)
+
+    return testProjects
+
+
+def getTestModules(testNames):
+    """
+    Returns the names of the modules that contain the given tests in the order of their first test.
+    """
+    # The test names have the form package.module.class.function.
+    return list(dict.fromkeys(testName.split('.')[-3] for testName in testNames))
+
+
+def getWorkerArguments(arglist, module):
+    """
+    Returns the arguments of this script for a worker process that runs the tests of one module.
+    """
+    workerArgs = [arg for arg in arglist[1:] if not arg.startswith('module=') and not arg.startswith('jobs=')]
+    workerArgs.append('module={0}'.format(module))
+    return workerArgs
+
+
+def runModulesInWorkers(modules, jobs):
+    """
+    Runs the tests of the modules in worker processes that execute this script.
+    """
+    def getCommand(module):
+        return [sys.executable, '-m', __spec__.name] + getWorkerArguments(sys.argv, module)
+
+    results = modulescheduler.run_modules(modules, getCommand, jobs, testprojectfixture.BASE_TEST_DIR)
+
+    print('Module results:')
+    for result in sorted(results, key=lambda result: result.module):
+        print('{0}: {1} ({2:.0f} s)'.format(result.module, 'OK' if result.was_successful() else 'FAILED', result.duration))
+    return not all(result.was_successful() for result in results)
+
+
+def iterateTestCases(suite):
+    for test in suite:
+        if isinstance(test, unittest.TestSuite):
+            yield from iterateTestCases(test)
+        else:
+            yield test
+
+
 def runTests(testNames):
 
     test_loader = unittest.TestLoader()
@@ -131,21 +233,62 @@ if __name__ == '__main__':
     testprojectfixture.BASE_TEST_DIR = getKeywordArgument('test_dir', keywordargs)
     testprojectfixture.PARENT_CONFIG = getKeywordArgument('parent_config', keywordargs)
     testprojectfixture.COMPILER_CONFIG = getKeywordArgument('compiler_config', keywordargs)
+    testprojectfixture.USE_MIRROR_CACHE = isTrueValue(getOptionalKeywordArgument('mirror_cache', keywordargs, 'ON'))
+    testprojectfixture.REFRESH_MIRROR_CACHE = isTrueValue(getOptionalKeywordArgument('refresh_mirrors', keywordargs, 'OFF'))
+    testprojectfixture.USE_WORKSPACE_TEMPLATES = isTrueValue(getOptionalKeywordArgument('workspace_templates', keywordargs, 'OFF'))
+    testprojectfixture.REUSE_WORKSPACES = isTrueValue(getOptionalKeywordArgument('reuse_workspaces', keywordargs, 'ON'))
+    testprojectfixture.USE_GENERATE_CACHE = isTrueValue(getOptionalKeywordArgument('generate_cache', keywordargs, 'OFF'))
+    testprojectfixture.USE_SCRIPT_SERVER = isTrueValue(getOptionalKeywordArgument('script_server', keywordargs, 'OFF'))
+    testprojectfixture.USE_COMPILER_CACHE = isTrueValue(getOptionalKeywordArgument('compiler_cache', keywordargs, 'OFF'))
+    testprojectfixture.USE_BUILD_GRAPH_QUERIES = isTrueValue(getOptionalKeywordArgument('build_graph_queries', keywordargs, 'OFF'))
+    buildJobs = int(getOptionalKeywordArgument('build_jobs', keywordargs, '0'))
+    prepareJobs = int(getOptionalKeywordArgument('prepare_jobs', keywordargs, '4'))
+    jobs = int(getOptionalKeywordArgument('jobs', keywordargs, '0'))
     testFilter = getKeywordArgument('test_filter', keywordargs)
-    module = getKeywordArgument('module', keywordargs)
+    if jobs > 0:
+        module = getOptionalKeywordArgument('module', keywordargs, '')
+    else:
+        module = getKeywordArgument('module', keywordargs)
     
     # Get all tests in the suite
     allTests = getTestNames()
     # Remove test names that do not contain the filter and module string.
-    filteredTests = filterTests(module, testFilter, allTests)
+    modules = module.split(',') if module else getTestModules(allTests)
+    filteredTests = []
+    for testModule in modules:
+        filteredTests.extend(filterTests(testModule, testFilter, allTests))
 
     #pprint.pprint(filteredTests)
 
     # Run the selected Tests
     result = 0
-    if filteredTests:
+    if filteredTests and jobs > 0:
+        # The workers join the jobserver of this process.
+        if buildJobs > 0:
+            testprojectfixture.start_jobserver(buildJobs)
+
+        result = runModulesInWorkers(getTestModules(filteredTests), jobs)
+
+    elif filteredTests:
+        # Prepare all test-projects up-front, so the preparations can run concurrently.
+        if prepareJobs > 0:
+            testprojectfixture.prepareTestProjects(getTestProjects(filteredTests), prepareJobs)
+
+        if testprojectfixture.USE_COMPILER_CACHE:
+            testprojectfixture.enable_compiler_cache()
+        if buildJobs > 0:
+            testprojectfixture.start_jobserver(buildJobs)
+
         result = runTests(filteredTests)
 
+        # Wait for the background deletion of the test files.
+        testprojectfixture.wait_for_discarded_trees()
+
+        if testprojectfixture.USE_GENERATE_CACHE:
+            print('Generate cache statistics: {0}'.format(testprojectfixture.TestProjectFixture.get_generate_cache_statistics()))
+        if testprojectfixture.USE_COMPILER_CACHE:
+            print('Compiler cache statistics: {0}'.format(testprojectfixture.get_compiler_cache_session_statistics()))
+
     sys.exit(result)
 
 
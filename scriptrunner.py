@@ -0,0 +1,119 @@
+"""
+This module contains a runner that executes the python scripts of a test project
+in a warm server process instead of starting a new interpreter for each script.
+
+The server forks a child for each script, so the scripts still run in their own
+process with their own working directory and environment. The modules that were
+imported by earlier scripts are inherited from the server, which saves the start-up
+and import time of the interpreter. The server is implemented in scriptrunnerserver.py.
+Forking is not available on Windows, so the runner can only be used on Linux.
+"""
+
+import os
+import sys
+import json
+import atexit
+import tempfile
+import threading
+import subprocess
+
+from Sources.CPFBuildscripts.python import miscosaccess
+
+
+def is_supported():
+    return hasattr(os, 'fork')
+
+
+class ScriptRunner:
+    """
+    Runs python scripts in the given root directory of a test project.
+    The server process is started with the first call of run().
+    """
+    def __init__(self, root_dir):
+        self.root_dir = str(root_dir)
+        self.server = None
+        self.lock = threading.Lock()
+
+    def run(self, argument, env, print_output=miscosaccess.OutputMode.ON_ERROR, print_command=False):
+        """
+        Does the same as
+        miscosaccess.MiscOsAccess().execute_command_output('python3 -u ' + argument, cwd=root_dir, env=env ...)
+        but runs the script in a child of the server process.
+        """
+        command = 'python3 -u {0}'.format(argument)
+        if print_command:
+            print(command)
+
+        output_file_handle, output_file = tempfile.mkstemp(prefix='scriptrunner-', suffix='.txt')
+        os.close(output_file_handle)
+        try:
+            with self.lock:
+                returncode = self._run_in_server(argument, env, output_file)
+            with open(output_file, errors='replace') as f:
+                output = f.read()
+        finally:
+            os.remove(output_file)
+
+        if print_output == miscosaccess.OutputMode.ALWAYS or (returncode != 0 and print_output == miscosaccess.OutputMode.ON_ERROR):
+            print(output)
+        if returncode != 0:
+            raise miscosaccess.CalledProcessError(returncode, command, output)
+        return output.splitlines()
+
+    def close(self):
+        with self.lock:
+            if self.server:
+                self.server.stdin.close()
+                self.server.wait()
+                self.server = None
+
+    def _run_in_server(self, argument, env, output_file):
+        if not self.server:
+            self._start_server()
+
+        request = { 'command' : argument, 'env' : dict(env), 'output_file' : output_file }
+        try:
+            self.server.stdin.write(json.dumps(request) + '\n')
+            self.server.stdin.flush()
+            response = self.server.stdout.readline()
+        except OSError:
+            response = ''
+        if not response:
+            self.server = None
+            raise Exception('Error! The script server for directory "{0}" stopped unexpectedly.'.format(self.root_dir))
+        return json.loads(response)['returncode']
+
+    def _start_server(self):
+        server_script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scriptrunnerserver.py')
+        self.server = subprocess.Popen(
+            [sys.executable, '-u', server_script, self.root_dir],
+            cwd=self.root_dir,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            universal_newlines=True
+        )
+
+
+# The runners of this process by root directory.
+_runners = {}
+_runners_lock = threading.Lock()
+
+
+def get_runner(root_dir):
+    """
+    Returns the runner for the given root directory. The runners are closed when the process exits.
+    """
+    with _runners_lock:
+        runner = _runners.get(str(root_dir))
+        if not runner:
+            runner = ScriptRunner(root_dir)
+            _runners[str(root_dir)] = runner
+        return runner
+
+
+def _close_runners():
+    for runner in _runners.values():
+        runner.close()
+
+
+atexit.register(_close_runners)
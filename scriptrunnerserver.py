@@ -0,0 +1,167 @@
+"""
+This module contains the server process that is used by the scriptrunner module.
+
+The server is started with the root directory of a test project as argument.
+It reads one json request per line from its standard input, runs the requested
+python script in a forked child process and writes the return code of the script
+as json line to its standard output. The output of the script is written into
+the output file that is given in the request.
+
+The modules that were imported by the scripts are also imported by the server,
+so the forked children of later requests find them already loaded.
+This module only depends on the standard library, because it is executed as a script.
+"""
+
+import os
+import sys
+import json
+import runpy
+import shlex
+import importlib
+import traceback
+
+
+class ScriptServer:
+
+    def __init__(self, root_dir):
+        self.root_dir = os.path.abspath(root_dir)
+        # Maps the names of the modules that were loaded from the root_dir to the modification times of their files.
+        self.project_module_mtimes = {}
+
+    def serve(self, requests, responses):
+        for line in requests:
+            request = json.loads(line)
+            returncode = self.run_request(request)
+            responses.write(json.dumps({ 'returncode' : returncode }) + '\n')
+            responses.flush()
+
+    def run_request(self, request):
+        self.unload_changed_project_modules()
+
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            _run_child(request, write_fd)
+
+        os.close(write_fd)
+        with os.fdopen(read_fd, 'r') as module_pipe:
+            module_names = module_pipe.read().split()
+        pid, status = os.waitpid(pid, 0)
+
+        self.import_modules(module_names)
+
+        if os.WIFSIGNALED(status):
+            return -os.WTERMSIG(status)
+        return os.WEXITSTATUS(status)
+
+    def import_modules(self, module_names):
+        """
+        Imports the given modules into the server process so they are inherited by the later children.
+        """
+        for name in module_names:
+            if name in sys.modules:
+                continue
+            try:
+                module = importlib.import_module(name)
+            except Exception:
+                continue
+            file = self.get_project_module_file(module)
+            if file:
+                self.project_module_mtimes[name] = os.stat(file).st_mtime_ns
+
+    def unload_changed_project_modules(self):
+        """
+        Removes all modules of the project from the server when one of their files has changed.
+        """
+        for name, mtime in self.project_module_mtimes.items():
+            file = self.get_project_module_file(sys.modules.get(name))
+            if not file or not os.path.isfile(file) or os.stat(file).st_mtime_ns != mtime:
+                break
+        else:
+            return
+
+        for name in list(sys.modules):
+            if self.get_project_module_file(sys.modules[name]):
+                del sys.modules[name]
+        self.project_module_mtimes = {}
+
+    def get_project_module_file(self, module):
+        """
+        Returns the file of the module if it was loaded from the root_dir.
+        """
+        file = getattr(module, '__file__', None)
+        if file and os.path.abspath(file).startswith(self.root_dir + os.sep):
+            return file
+        return None
+
+
+def _run_child(request, module_pipe_fd):
+    """
+    This runs in the forked child and never returns.
+    """
+    returncode = 1
+    try:
+        output_fd = os.open(request['output_file'], os.O_WRONLY | os.O_CREAT | os.O_TRUNC)
+        os.dup2(output_fd, 1)
+        os.dup2(output_fd, 2)
+        os.close(output_fd)
+
+        # The standard input of the server is the request pipe, which the script must not read.
+        # The python object is replaced too, because it may hold buffered requests.
+        input_fd = os.open(os.devnull, os.O_RDONLY)
+        os.dup2(input_fd, 0)
+        os.close(input_fd)
+        sys.stdin = open(os.devnull)
+
+        os.environ.clear()
+        os.environ.update(request['env'])
+        returncode = _run_script(shlex.split(request['command']))
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            with os.fdopen(module_pipe_fd, 'w') as module_pipe:
+                module_pipe.write('\n'.join(name for name in sys.modules if name != '__main__'))
+        finally:
+            os._exit(returncode)
+
+
+def _run_script(argv):
+    """
+    Runs the script like "python -u <argv>" would do and returns its exit code.
+    """
+    sys.argv = argv
+    sys.path[0] = os.path.dirname(os.path.abspath(argv[0]))
+    try:
+        runpy.run_path(argv[0], run_name='__main__')
+        return 0
+    except SystemExit as error:
+        if error.code is None:
+            return 0
+        if isinstance(error.code, int):
+            return error.code
+        print(error.code, file=sys.stderr)
+        return 1
+    except BaseException:
+        traceback.print_exc()
+        return 1
+
+
+def main():
+    root_dir = sys.argv[1]
+
+    # The standard output of the server is reserved for the responses.
+    # Everything else that is printed by the server is discarded.
+    responses = os.fdopen(os.dup(1), 'w')
+    null_fd = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(null_fd, 1)
+    os.close(null_fd)
+
+    os.chdir(root_dir)
+    sys.path[0] = os.path.abspath(root_dir)
+    ScriptServer(root_dir).serve(sys.stdin, responses)
+
+
+if __name__ == '__main__':
+    main()
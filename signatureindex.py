@@ -0,0 +1,82 @@
+"""
+This module contains an index that finds signature strings in build outputs.
+
+The tests check the same build output for the signatures of multiple targets.
+The index compiles the signature strings of all targets into one regular expression
+and scans each output once with it. The strings that were found are kept in a hit
+table that all later queries for the same output use.
+"""
+
+import re
+import collections
+
+
+class SignatureIndex:
+    """
+    Finds the given signature strings in build outputs with one scan per output.
+    Only the hit table of the last scanned output is kept. Outputs are identified
+    by their identity. Strings that were not given to the index are searched directly.
+    """
+    def __init__(self, strings):
+        self.strings = list(collections.OrderedDict.fromkeys(string for string in strings if string))
+        self.regex = None
+        if self.strings:
+            # At each position the alternatives are tried in their order, so the longest string wins.
+            alternatives = sorted(self.strings, key=len, reverse=True)
+            self.regex = re.compile('|'.join(re.escape(string) for string in alternatives))
+
+        # The scan finds no matches that overlap an earlier match. Strings that are contained in a
+        # match are found with it. Strings that can overlap a match are searched again if the match
+        # was found and the string was not.
+        self.contained_strings = {}
+        self.overlapping_strings = {}
+        for string in self.strings:
+            self.contained_strings[string] = [other for other in self.strings if other != string and other in string]
+            self.overlapping_strings[string] = [other for other in self.strings if other != string and _can_overlap(string, other)]
+
+        self.output = None
+        self.hits = set()
+
+    def contains(self, output, string):
+        """
+        Returns True if the string is contained in the output.
+        """
+        if not string in self.contained_strings:
+            return string in output
+        return string in self.get_hits(output)
+
+    def get_hits(self, output):
+        """
+        Returns the set of the strings of the index that are contained in the output.
+        """
+        if output is not self.output:
+            self.output = output
+            self.hits = self._scan(output)
+        return self.hits
+
+    def _scan(self, output):
+        if self.regex is None:
+            return set()
+
+        matches = set(match.group(0) for match in self.regex.finditer(output))
+        hits = set(matches)
+        for string in matches:
+            hits.update(self.contained_strings[string])
+        for string in self.strings:
+            if not string in hits and any(other in matches for other in self.overlapping_strings[string]):
+                if string in output:
+                    hits.add(string)
+        return hits
+
+
+def _can_overlap(string, other):
+    """
+    Returns True if an occurrence of other can share characters with an occurrence of string
+    without being contained in it.
+    """
+    if string in other:
+        return True
+    for length in range(1, min(len(string), len(other))):
+        if string.endswith(other[:length]) or other.endswith(string[:length]):
+            return True
+    return False
@@ -0,0 +1,60 @@
+"""
+This module contains the tests of the signatureindex module.
+"""
+
+import unittest
+
+from . import signatureindex
+
+
+class SignatureIndexCase(unittest.TestCase):
+    """
+    Tests the one-pass search of signature strings in build outputs.
+    """
+
+    def test_strings_are_found_with_one_scan_per_output(self):
+        index = signatureindex.SignatureIndex(['Building CXX object', 'Linking CXX', 'Generating'])
+        output = CountingString('Building CXX object foo.cpp.o\nLinking CXX executable foo')
+
+        self.assertTrue(index.contains(output, 'Linking CXX'))
+        self.assertFalse(index.contains(output, 'Generating'))
+        self.assertTrue(index.contains(output, 'Building CXX object'))
+        self.assertEqual(output.searches, 0)
+        self.assertIs(index.get_hits(output), index.get_hits(output))
+
+    def test_contained_and_overlapping_strings_are_found(self):
+        index = signatureindex.SignatureIndex(['clang-tidy', 'clang', 'tidy -checks', '-checks=', 'valgrind'])
+        output = CountingString('/usr/bin/clang-tidy -checks=* main.cpp')
+
+        self.assertEqual(index.get_hits(output), set(['clang-tidy', 'clang', 'tidy -checks', '-checks=']))
+        # Only strings that overlap a match are searched again.
+        self.assertLessEqual(output.searches, 2)
+
+    def test_strings_that_are_not_indexed_are_searched_directly(self):
+        index = signatureindex.SignatureIndex(['Linking CXX'])
+        output = CountingString('ninja: no work to do.')
+
+        self.assertTrue(index.contains(output, 'no work to do'))
+        self.assertFalse(index.contains(output, 'Linking CXX'))
+        self.assertEqual(output.searches, 1)
+
+    def test_results_of_other_outputs_are_not_reused(self):
+        index = signatureindex.SignatureIndex(['Linking CXX'])
+        self.assertTrue(index.contains('Linking CXX executable foo', 'Linking CXX'))
+        self.assertFalse(index.contains('ninja: no work to do.', 'Linking CXX'))
+
+    def test_empty_index(self):
+        index = signatureindex.SignatureIndex(['', ''])
+        self.assertEqual(index.get_hits('output'), set())
+        self.assertTrue(index.contains('output', 'out'))
+
+
+class CountingString(str):
+    """
+    A string that counts how often it is searched for substrings.
+    """
+    searches = 0
+
+    def __contains__(self, string):
+        self.searches += 1
+        return super(CountingString, self).__contains__(string)
@@ -26,8 +26,7 @@ class SimpleOneLibCPFTestProjectFixture1(simpleonelibcpftestprojectfixture.Simpl
     @classmethod
     def setUpClass(cls, instantiating_test_module=__name__.split('.')[-1]):
         cls.instantiating_module = instantiating_test_module
-        cls.project = 'SimpleOneLibCPFTestProject'
-        cls.cpf_root_dir = testprojectfixture.prepareTestProject('https://github.com/Knitschi/SimpleOneLibCPFTestProject.git', cls.project, cls.cpf_cmake_dir, cls.cpf_buildscripts_dir, cls.instantiating_module)
+        cls.cpf_root_dir = testprojectfixture.prepareTestProject(cls.repository, cls.project, cls.cpf_cmake_dir, cls.cpf_buildscripts_dir, cls.instantiating_module)
 
     def setUp(self):
         super(SimpleOneLibCPFTestProjectFixture1, self).setUp(self.instantiating_module)
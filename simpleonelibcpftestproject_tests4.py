@@ -26,13 +26,11 @@ class SimpleOneLibCPFTestProjectFixture4(simpleonelibcpftestprojectfixture.Simpl
     cpf_root_dir = ''
     cpf_cmake_dir = 'Sources/external/CPFCMake'
     ci_buildconfigurations_dir = 'Sources/external/CIBuildConfigurations'
-    project = ''
 
     @classmethod
     def setUpClass(cls, instantiating_test_module=__name__.split('.')[-1]):
         cls.instantiating_module = instantiating_test_module
-        cls.project = 'SimpleOneLibCPFTestProject'
-        cls.cpf_root_dir = testprojectfixture.prepareTestProject('https://github.com/Knitschi/SimpleOneLibCPFTestProject.git', cls.project, cls.cpf_cmake_dir, cls.cpf_buildscripts_dir, cls.instantiating_module)
+        cls.cpf_root_dir = testprojectfixture.prepareTestProject(cls.repository, cls.project, cls.cpf_cmake_dir, cls.cpf_buildscripts_dir, cls.instantiating_module)
 
     def setUp(self):
         super(SimpleOneLibCPFTestProjectFixture4, self).setUp(self.instantiating_module)
@@ -26,13 +26,11 @@ class SimpleOneLibCPFTestProjectFixture5(simpleonelibcpftestprojectfixture.Simpl
     cpf_root_dir = ''
     cpf_cmake_dir = 'Sources/external/CPFCMake'
     ci_buildconfigurations_dir = 'Sources/external/CIBuildConfigurations'
-    project = ''
 
     @classmethod
     def setUpClass(cls, instantiating_test_module=__name__.split('.')[-1]):
         cls.instantiating_module = instantiating_test_module
-        cls.project = 'SimpleOneLibCPFTestProject'
-        cls.cpf_root_dir = testprojectfixture.prepareTestProject('https://github.com/Knitschi/SimpleOneLibCPFTestProject.git', cls.project, cls.cpf_cmake_dir, cls.cpf_buildscripts_dir, cls.instantiating_module)
+        cls.cpf_root_dir = testprojectfixture.prepareTestProject(cls.repository, cls.project, cls.cpf_cmake_dir, cls.cpf_buildscripts_dir, cls.instantiating_module)
 
     def setUp(self):
         super(SimpleOneLibCPFTestProjectFixture5, self).setUp(self.instantiating_module)
@@ -83,23 +81,14 @@ class SimpleOneLibCPFTestProjectFixture5(simpleonelibcpftestprojectfixture.Simpl
         with open(str(sourceFile), "a") as f:
             f.write("\n")
         # Commit the change
-        self.osa.execute_command_output(
-            'git commit . -m "Dummy change"',
-            cwd=self.cpf_root_dir,
-            print_output=miscosaccess.OutputMode.ON_ERROR
-        )
+        self.commit_all_changes('Dummy change')
         # Do the incremental generate
         self.run_python_command('2_Generate.py')
         # Build the package archive target
         self.build_target(simpleonelibcpftestprojectfixture.PACKAGE_ARCHIVES_MYLIB_TARGET)
 
         # Verify
-        packageVersionFromGit = self.get_package_version("MyLib") # The version from git
-        packageVersionVar = 'PACKAGE_VERSION'
-        packageVersionConfigFile = self.locations.get_full_path_config_makefile_folder(testprojectfixture.PARENT_CONFIG) / "MyLib/_pckg/dev/MyLib/lib/cmake/MyLib/MyLibConfigVersion.cmake"
-        packageVersionFromConfigFile = self.get_cmake_variables_in_file([packageVersionVar], packageVersionConfigFile)[packageVersionVar]
-
-        self.assertEqual(packageVersionFromConfigFile, packageVersionFromGit)
+        self.assert_config_version_files_contain_package_versions(['MyLib'])
 
 
     def test_version_is_written_into_file_info_file(self):
@@ -120,7 +120,8 @@ class SimpleOneLibCPFTestProjectFixture(testprojectfixture.TestProjectFixture):
     cpf_cmake_dir = 'Sources/external/CPFCMake'
     cpf_buildscripts_dir = 'Sources/external/CPFBuildScripts'
     ci_buildconfigurations_dir = 'Sources/external/CIBuildConfigurations'
-    project = ''
+    project = 'SimpleOneLibCPFTestProject'
+    repository = 'https://github.com/Knitschi/SimpleOneLibCPFTestProject.git'
 
     def setUp(self, instantiating_module):
         super(SimpleOneLibCPFTestProjectFixture, self).setUp(self.project, self.cpf_root_dir, self.cpf_cmake_dir, self.cpf_buildscripts_dir, self.ci_buildconfigurations_dir, instantiating_module)
@@ -136,6 +137,14 @@ class SimpleOneLibCPFTestProjectFixture(testprojectfixture.TestProjectFixture):
             signature = element
         return signature
 
+    def get_all_signature_strings(self):
+        strings = []
+        for target in target_signatures:
+            signature = self.get_signature(target)
+            if signature:
+                strings.extend(signature)
+        return strings
+
     def assert_output_has_not_signature(self, output, target, signature_target):
         super(SimpleOneLibCPFTestProjectFixture, self).assert_output_has_not_signature(output, target, self.get_signature(signature_target))
 
@@ -156,6 +165,8 @@ class SimpleOneLibCPFTestProjectFixture(testprojectfixture.TestProjectFixture):
         5. Check the target is rebuild after touching any of the given source_files. Note that
             one build is done for each file, so adding a lot of files will drive test times in the sky.
             The pathes of the source_files must be relative to the cpf_root_directory.
+            Files that are inputs of the target in the build graph are not touched (see find_source_files_that_are_no_target_inputs()).
+            For Ninja builds no files are touched. The test fails if any of the files is not an input of the target in the build graph.
         6. Check that the specified output files are produced. Paths must be relative to CMAKE_BINARY_DIR.
         """
 
@@ -170,14 +181,20 @@ class SimpleOneLibCPFTestProjectFixture(testprojectfixture.TestProjectFixture):
 
                 # Check the target is not build again when it is up-to-date.
                 if do_uptodate_test:
-                    output = self.build_target(built_target)
-                    self.assert_output_has_not_signature(output, built_target, signature_target)
-
-                # Check that changes to source files out-date the target
-                if not self.is_ninja_config():  # This test fails for ninja. Strangly the behavior is correct when the file changes
-                                                # and rebuilds are done manually. I tried to add wait times, use cmake to touch the
-                                                # files and make changes to the content of the file which all did not work.
-                    for source_file in source_files:
+                    self.assert_target_is_up_to_date(built_target, self.get_signature(signature_target))
+
+                # Check that changes to source files out-date the target.
+                # Files that are found as inputs of the target in the build graph need no rebuild.
+                unverified_source_files = self.find_source_files_that_are_no_target_inputs(built_target, source_files)
+                if self.is_ninja_config():
+                    # The touch test fails for ninja. Strangly the behavior is correct when the file changes
+                    # and rebuilds are done manually. I tried to add wait times, use cmake to touch the
+                    # files and make changes to the content of the file which all did not work.
+                    # The target was built above, so the deps log of ninja contains its dependencies.
+                    if unverified_source_files:
+                        raise Exception('Test Error! The files {0} are no inputs of target {1} in the ninja build graph.'.format(unverified_source_files, built_target))
+                else:
+                    for source_file in unverified_source_files:
                         full_source_file = self.cpf_root_dir.joinpath(source_file)
                         self.fsa.touch_file(full_source_file)
                         output = self.build_target(built_target)
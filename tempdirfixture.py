@@ -0,0 +1,35 @@
+"""
+This module contains a fixture for unit tests that work with files in a temporary directory.
+"""
+
+import os
+import tempfile
+import unittest
+
+
+class TempDirFixture(unittest.TestCase):
+    """
+    Creates an empty temporary directory before each test and removes it after the test.
+    """
+
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.temp_dir = temp_dir.name
+
+    def get_path(self, *rel_path_parts):
+        """
+        Returns the absolute path of a path in the temporary directory.
+        """
+        return os.path.join(self.temp_dir, *rel_path_parts)
+
+    def write_file(self, rel_path, content=''):
+        """
+        Writes a text file in the temporary directory and creates its parent directories.
+        Returns the absolute path of the file.
+        """
+        file = self.get_path(rel_path)
+        os.makedirs(os.path.dirname(file), exist_ok=True)
+        with open(file, 'w') as f:
+            f.write(content)
+        return file
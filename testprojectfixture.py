@@ -5,11 +5,15 @@ on a cpf test project.
 """
 
 import os
+import re
+import shutil
 import unittest
 from pathlib import PurePosixPath
-import shutil
 import pprint
 import hashlib
+import json
+import concurrent.futures
+import threading
 try:
     # installed with: pip install pypiwin32 on windows
     import win32api
@@ -20,10 +24,184 @@ from Sources.CPFBuildscripts.python import miscosaccess
 from Sources.CPFBuildscripts.python import filesystemaccess
 from Sources.CPFBuildscripts.python import filelocations
 from Sources.CPFBuildscripts.python import projectutils
+from . import gitmirrorcache
+from . import filetreeutils
+from . import filelock
+from . import gitplumbing
+from . import trashbin
+from . import scriptrunner
+from . import cmakecache
+from . import signatureindex
+from . import buildgraph
+from . import jobserver
+from . import treediff
+from . import archivelisting
 
 BASE_TEST_DIR = ''
 PARENT_CONFIG = ''
 COMPILER_CONFIG = ''
+USE_MIRROR_CACHE = True         # Clone the test projects from local mirrors in the BASE_TEST_DIR.
+REFRESH_MIRROR_CACHE = False    # Fetch the mirrors from their remotes before they are used for the first time in a session.
+USE_WORKSPACE_TEMPLATES = False # Copy the workspaces of the test modules from a prepared template workspace.
+REUSE_WORKSPACES = True         # Keep workspaces from earlier sessions when their fingerprint did not change.
+USE_GENERATE_CACHE = False      # Restore the Configuration and Generated directories of generate_project() from a cache.
+USE_SCRIPT_SERVER = False       # Run the python scripts of the test projects in a warm server process on Linux.
+USE_COMPILER_CACHE = False      # Use ccache as compiler launcher for the Makefile and Ninja builds of the test projects.
+USE_BUILD_GRAPH_QUERIES = False # Check that source files are target inputs with the CMake file API instead of rebuilds for Makefile and Visual Studio builds.
+
+# The content hashes of the local packages, which do not change while the tests run.
+_local_package_hashes = {}
+
+# The trash bin of the test session. It is created when it is used for the first time.
+_trash_bin = None
+_trash_bin_lock = threading.Lock()
+
+
+def discard_tree(path):
+    """
+    Removes the given directory tree if it exists.
+    The tree is moved into the trash bin of the session and deleted in the background.
+    """
+    global _trash_bin
+    with _trash_bin_lock:
+        if _trash_bin is None:
+            _trash_bin = trashbin.TrashBin(PurePosixPath(BASE_TEST_DIR).joinpath('_trash'))
+    _trash_bin.discard(path)
+
+
+def wait_for_discarded_trees():
+    """
+    Blocks until the trash bin has deleted all trees that were discarded in this session.
+    """
+    if _trash_bin is not None:
+        _trash_bin.join()
+
+# The statistics of the compiler cache when it was enabled.
+_compiler_cache_statistics_at_start = {}
+
+
+def enable_compiler_cache():
+    """
+    Makes CMake use ccache as compiler launcher by setting the CMAKE_<LANG>_COMPILER_LAUNCHER
+    environment variables, which requires CMake 3.17. The launcher is ignored by the Visual Studio generators.
+    The cache is shared by all test modules. The paths below the BASE_TEST_DIR are hashed relative
+    to the build directory, so the workspaces of the different modules share their cache hits.
+    """
+    global _compiler_cache_statistics_at_start
+
+    launcher = shutil.which('ccache')
+    if not launcher:
+        raise Exception('Error! The compiler cache requires ccache to be installed.')
+
+    for language in ['C', 'CXX']:
+        os.environ['CMAKE_{0}_COMPILER_LAUNCHER'.format(language)] = launcher
+    os.environ['CCACHE_DIR'] = str(get_compiler_cache_dir())
+    os.environ['CCACHE_BASEDIR'] = str(BASE_TEST_DIR)
+    # Do not hash the working directory, which is part of the debug information.
+    os.environ['CCACHE_NOHASHDIR'] = '1'
+
+    _compiler_cache_statistics_at_start = get_compiler_cache_statistics()
+
+
+def get_compiler_cache_dir():
+    return PurePosixPath(BASE_TEST_DIR).joinpath('_ccache')
+
+
+def get_compiler_cache_statistics():
+    """
+    Returns a dictionary with the hits and misses of the compiler cache.
+    The counters are only available for ccache 4 and higher. For older versions
+    an empty dictionary is returned.
+    """
+    osa = miscosaccess.MiscOsAccess()
+    try:
+        lines = osa.execute_command_output('ccache --print-stats', print_output=miscosaccess.OutputMode.NEVER, print_command=False)
+    except miscosaccess.CalledProcessError:
+        return {}
+
+    counters = {}
+    for line in lines:
+        name, separator, value = line.partition('\t')
+        if separator and value.strip().isdigit():
+            counters[name] = int(value)
+    if not 'cache_miss' in counters:
+        return {}
+    return {
+        'hits' : counters.get('direct_cache_hit', 0) + counters.get('preprocessed_cache_hit', 0),
+        'misses' : counters['cache_miss']
+    }
+
+
+def get_compiler_cache_session_statistics():
+    """
+    Returns the hits and misses of the compiler cache since it was enabled.
+    Test modules that run at the same time use the same cache, so their builds are included.
+    """
+    statistics = get_compiler_cache_statistics()
+    if not statistics or not _compiler_cache_statistics_at_start:
+        return {}
+    statistics = { key : value - _compiler_cache_statistics_at_start[key] for key, value in statistics.items() }
+    total = statistics['hits'] + statistics['misses']
+    statistics['hit_rate'] = '{0:.0f}%'.format(100.0 * statistics['hits'] / total) if total else 'n/a'
+    return statistics
+
+
+# The jobserver of this process if it was started.
+_jobserver = None
+
+
+def start_jobserver(jobs):
+    """
+    Limits the number of parallel build jobs of all test modules to the given number by
+    passing a jobserver to the builds with the MAKEFLAGS environment variable.
+    A jobserver of a build tool that started the tests is used instead if there is one.
+    When the build tools can not use a jobserver, like on Windows or with ninja older than 1.13,
+    only the builds of each module are limited by setting CMAKE_BUILD_PARALLEL_LEVEL, which
+    cmake --build passes to the build tool.
+    """
+    global _jobserver
+
+    if not jobserver.is_supported():
+        # The build tools would not see the tokens, so only the number of jobs of each build is limited.
+        os.environ['CMAKE_BUILD_PARALLEL_LEVEL'] = str(jobs)
+        return
+
+    if jobserver.get_outer_jobserver_flags():
+        return
+
+    _jobserver = jobserver.JobServer(PurePosixPath(BASE_TEST_DIR).joinpath('_jobserver'), jobs)
+    _jobserver.start()
+    os.environ['MAKEFLAGS'] = _jobserver.get_makeflags()
+
+
+# The workspaces that were prepared by prepareTestProjects(), keyed by the arguments of prepareTestProject().
+_prepared_test_projects = {}
+
+# The memoized results of get_cmake_variables_in_files() by file path and file hash.
+_cmake_file_variables = {}
+_CMAKE_OUTPUT_MARKER = '@CPFTESTS@'
+
+# The memoized results of get_package_versions() by workspace and repository directory.
+# The values are tuples of the repository state and the version.
+_package_versions = {}
+_ninja_progress_regex = re.compile(r'^\[\d+/\d+\]')
+
+
+
+def prepareTestProjects(test_projects, max_workers):
+    """
+    Prepares the given test projects concurrently with a pool of max_workers threads.
+    test_projects is a list of argument tuples for prepareTestProject().
+    Later calls to prepareTestProject() with the same arguments return the
+    prepared workspace without doing the preparation again.
+    """
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {}
+        for test_project in test_projects:
+            futures[test_project] = executor.submit(_prepareTestProject, *test_project)
+        # Calling result() re-raises the exceptions of failed preparations.
+        for test_project, future in futures.items():
+            _prepared_test_projects[test_project] = future.result()
 
 
 def prepareTestProject(repository, project, cpf_cmake_dir, cpf_buildscripts_dir, instantiating_test_module):
@@ -41,77 +219,246 @@ def prepareTestProject(repository, project, cpf_cmake_dir, cpf_buildscripts_dir,
 
     The instantiating_test_module string is used to keep test-file directories for
     fixtures instances that run in parallel apart.
+
+    When USE_MIRROR_CACHE is set, the project and its submodules are cloned from
+    local mirrors in the BASE_TEST_DIR instead of the network.
+    When USE_WORKSPACE_TEMPLATES is set, the workspace is copied from a prepared
+    template workspace that is shared by all modules.
+    When REUSE_WORKSPACES is set, a workspace from an earlier session is kept if it is
+    unchanged and its fingerprint matches the current inputs. Only the Configuration and
+    Generated directories are reset in this case.
     """
+    test_project = (repository, project, cpf_cmake_dir, cpf_buildscripts_dir, instantiating_test_module)
+    if test_project in _prepared_test_projects:
+        # The project was already prepared in the preparation phase of the test session.
+        return _prepared_test_projects[test_project]
+
+    return _prepareTestProject(*test_project)
+
+
+def _prepareTestProject(repository, project, cpf_cmake_dir, cpf_buildscripts_dir, instantiating_test_module):
 
     print('[{0}] Prepare test-project: {1}'.format(instantiating_test_module, project))
 
     fsa = filesystemaccess.FileSystemAccess()
-    osa = miscosaccess.MiscOsAccess()
 
-    # clone fresh project
     root_parent_dir = PurePosixPath(BASE_TEST_DIR).joinpath(instantiating_test_module)
     cpf_root_dir = root_parent_dir.joinpath(project)
+    _package_versions.pop(str(cpf_root_dir), None)
+
+    fingerprint_file = PurePosixPath(str(cpf_root_dir) + '.fingerprint')
+    if REUSE_WORKSPACES:
+        fingerprint = get_workspace_fingerprint(repository, project, cpf_cmake_dir, cpf_buildscripts_dir)
+        if workspace_matches_fingerprint(cpf_root_dir, fingerprint_file, fingerprint):
+            print('[{0}] Reuse unchanged test-project: {1}'.format(instantiating_test_module, project))
+            discard_tree(cpf_root_dir.joinpath('Configuration'))
+            discard_tree(cpf_root_dir.joinpath('Generated'))
+            return cpf_root_dir
 
-    if fsa.exists(cpf_root_dir):
-        # we remove remaining testfiles at the beginning of a test, so we
-        # have the project still available for debugging if the test fails.
-        fsa.rmtree(cpf_root_dir)
+    # clone fresh project
+    if fsa.exists(fingerprint_file):
+        fsa.remove(fingerprint_file)
+    # we remove remaining testfiles at the beginning of a test, so we
+    # have the project still available for debugging if the test fails.
+    discard_tree(cpf_root_dir)
     fsa.mkdirs(root_parent_dir)
-    osa.execute_command_output('git clone --recursive {0}'.format(repository), cwd=root_parent_dir, print_output=miscosaccess.OutputMode.ON_ERROR)
+
+    if USE_WORKSPACE_TEMPLATES:
+        copy_workspace_from_template(repository, project, cpf_cmake_dir, cpf_buildscripts_dir, cpf_root_dir)
+    else:
+        create_workspace(repository, project, cpf_cmake_dir, cpf_buildscripts_dir, cpf_root_dir)
+
+    if REUSE_WORKSPACES:
+        write_workspace_fingerprint(cpf_root_dir, fingerprint_file, fingerprint)
+
+    return cpf_root_dir
+
+
+def get_workspace_fingerprint(repository, project, cpf_cmake_dir, cpf_buildscripts_dir):
+    """
+    Returns a hash that changes when one of the inputs of a prepared workspace changes.
+    These are the HEAD commit of the remote repository, the contents of the local
+    CPFCMake and CPFBuildscripts packages and the directory layout of the fixture.
+    """
+    fingerprint_parts = [repository, project, cpf_cmake_dir, cpf_buildscripts_dir]
+    fingerprint_parts.append(get_remote_head_commit(repository))
+    for package in ['CPFCMake', 'CPFBuildscripts']:
+        if not package in _local_package_hashes:
+            _local_package_hashes[package] = filetreeutils.get_tree_content_hash(get_local_package_dir(package), excluded_top_level_names=['.git'])
+        fingerprint_parts.append(_local_package_hashes[package])
+
+    return hashlib.sha1('\n'.join(fingerprint_parts).encode('utf-8')).hexdigest()
+
+
+def get_remote_head_commit(repository):
+    """
+    Returns the commit that is checked out when cloning the repository.
+    With the mirror cache, this is the HEAD of the mirror.
+    """
+    osa = miscosaccess.MiscOsAccess()
+    if USE_MIRROR_CACHE:
+        mirror_dir = gitmirrorcache.get_mirror(repository, get_mirror_cache_dir(), REFRESH_MIRROR_CACHE)
+        output = osa.execute_command_output('git rev-parse HEAD', cwd=mirror_dir, print_output=miscosaccess.OutputMode.ON_ERROR, print_command=False)
+    else:
+        output = osa.execute_command_output('git ls-remote {0} HEAD'.format(repository), print_output=miscosaccess.OutputMode.ON_ERROR, print_command=False)
+    return output[0].split()[0]
+
+
+def workspace_matches_fingerprint(cpf_root_dir, fingerprint_file, fingerprint):
+    """
+    Returns True if the workspace was prepared with the given fingerprint and no
+    test has committed or changed tracked files in it since then.
+    """
+    fsa = filesystemaccess.FileSystemAccess()
+    osa = miscosaccess.MiscOsAccess()
+
+    fingerprint_lines = read_file_or_empty(fingerprint_file).splitlines()
+    if len(fingerprint_lines) != 2 or fingerprint_lines[0] != fingerprint or not fsa.exists(cpf_root_dir):
+        return False
+
+    try:
+        head = osa.execute_command_output('git rev-parse HEAD', cwd=cpf_root_dir, print_output=miscosaccess.OutputMode.NEVER, print_command=False)
+        changes = osa.execute_command_output('git status --porcelain --untracked-files=no', cwd=cpf_root_dir, print_output=miscosaccess.OutputMode.NEVER, print_command=False)
+    except miscosaccess.CalledProcessError:
+        return False
+
+    return head[0].strip() == fingerprint_lines[1] and not changes
+
+
+def write_workspace_fingerprint(cpf_root_dir, fingerprint_file, fingerprint):
+    """
+    Stores the fingerprint together with the HEAD commit of the prepared workspace.
+    """
+    osa = miscosaccess.MiscOsAccess()
+    head = osa.execute_command_output('git rev-parse HEAD', cwd=cpf_root_dir, print_output=miscosaccess.OutputMode.ON_ERROR, print_command=False)
+    with open(str(fingerprint_file), 'w') as f:
+        f.write(fingerprint + '\n' + head[0].strip() + '\n')
+
+
+def create_workspace(repository, project, cpf_cmake_dir, cpf_buildscripts_dir, cpf_root_dir):
+    """
+    Clones the test project into the cpf_root_dir and replaces its
+    CPFCMake and CPFBuildscripts packages with the local ones.
+    """
+    osa = miscosaccess.MiscOsAccess()
+
+    if USE_MIRROR_CACHE:
+        gitmirrorcache.clone_recursive(repository, cpf_root_dir, get_mirror_cache_dir(), REFRESH_MIRROR_CACHE)
+    else:
+        osa.execute_command_output('git clone --recursive {0}'.format(repository), cwd=cpf_root_dir.parent, print_output=miscosaccess.OutputMode.ON_ERROR)
     
     # Replace the CPFCMake and CPFBuildscripts packages in the test project with the ones
     # that are used by this repository. This makes sure that we test the versions that
     # are used here and not the ones that are set in the test project.
-    replace_package_in_test_project_with_local('CPFCMake', cpf_cmake_dir, cpf_root_dir)
-    replace_package_in_test_project_with_local('CPFBuildscripts', cpf_buildscripts_dir, cpf_root_dir)
-    return cpf_root_dir
+    gitlinks = {}
+    gitlinks[cpf_cmake_dir] = replace_package_in_test_project_with_local('CPFCMake', cpf_cmake_dir, cpf_root_dir)
+    gitlinks[cpf_buildscripts_dir] = replace_package_in_test_project_with_local('CPFBuildscripts', cpf_buildscripts_dir, cpf_root_dir)
 
+    # We also commit the new package versions in the test project to make sure the repository
+    # is not dirty which is expected after a "fresh" checkout.
+    gitplumbing.commit_gitlinks(cpf_root_dir, gitlinks, 'Update CPFCMake and CPFBuildscripts')
 
-def replace_package_in_test_project_with_local(package, rel_package_path, cpf_root_dir):
+
+def copy_workspace_from_template(repository, project, cpf_cmake_dir, cpf_buildscripts_dir, cpf_root_dir):
     """
-    This function replaces a package in the cpf project situated at test_project_root_dir
-    with the package of same name in this repository.
+    Creates the workspace in cpf_root_dir as a copy-on-write copy of a template workspace.
+    The template is prepared once and shared by all test modules that use the same project
+    and directory layout. It is re-created when its stamp does not match the fingerprint
+    of the current inputs.
     """
     fsa = filesystemaccess.FileSystemAccess()
-    osa = miscosaccess.MiscOsAccess()
 
+    template_root_dir = get_workspace_template_dir(project, cpf_cmake_dir, cpf_buildscripts_dir).joinpath(project)
+    stamp_file = PurePosixPath(str(template_root_dir) + '.stamp')
+    # The template must be re-created whenever a fresh workspace would differ from it.
+    stamp = get_workspace_fingerprint(repository, project, cpf_cmake_dir, cpf_buildscripts_dir)
+
+    with filelock.FileLock(str(template_root_dir) + '.lock'):
+        if not fsa.exists(template_root_dir) or read_file_or_empty(stamp_file) != stamp:
+            print('Prepare template workspace: {0}'.format(template_root_dir))
+            if fsa.exists(stamp_file):
+                fsa.remove(stamp_file)
+            discard_tree(template_root_dir)
+            fsa.mkdirs(template_root_dir.parent)
+            create_workspace(repository, project, cpf_cmake_dir, cpf_buildscripts_dir, template_root_dir)
+            with open(str(stamp_file), 'w') as f:
+                f.write(stamp)
+
+        filetreeutils.copy_tree_copy_on_write(template_root_dir, cpf_root_dir)
+
+
+def get_workspace_template_dir(project, cpf_cmake_dir, cpf_buildscripts_dir):
+    layout_hash = hashlib.md5(';'.join([project, cpf_cmake_dir, cpf_buildscripts_dir]).encode('utf-8')).hexdigest()[0:8]
+    return PurePosixPath(BASE_TEST_DIR).joinpath('_templates', '{0}-{1}'.format(project, layout_hash))
+
+
+def read_file_or_empty(file):
+    if not os.path.isfile(str(file)):
+        return ''
+    with open(str(file), 'r') as f:
+        return f.read()
+
+
+def read_json_file_or_none(file):
+    """
+    Returns the content of the given json file or None if the file does not exist or can not be parsed.
+    """
+    if not os.path.isfile(str(file)):
+        return None
+    try:
+        with open(str(file)) as f:
+            return json.load(f)
+    except ValueError:
+        return None
+
+
+def get_json_file_stats(file_stats):
+    """
+    Converts the (size, modification time in ns) tuples of filetreeutils.get_file_stats()
+    to lists, so they compare equal to the values that are read back from a json file.
+    """
+    return { path : list(file_stat) for path, file_stat in file_stats.items() }
+
+
+def get_local_package_dir(package):
+    """
+    Returns the directory of the package in the repository that contains these tests.
+    """
     this_root_dir = PurePosixPath(os.path.dirname(os.path.realpath(__file__)) + "/../..")
-    this_package_dir = this_root_dir.joinpath('Sources/{0}'.format(package))
-    test_project_package_dir = cpf_root_dir.joinpath(rel_package_path)
+    return this_root_dir.joinpath('Sources/{0}'.format(package))
 
-    # move the .git file to a save place while the package content is replaces.
-    gitFilePath = test_project_package_dir / ".git"
-    tempGitFilePath = test_project_package_dir / "../.git"
-    fsa.move(gitFilePath, tempGitFilePath)
-
-    # We delete the package in the the copy the content of this package over
-    fsa.rmtree(test_project_package_dir)
-    shutil.copytree(str(this_package_dir), str(test_project_package_dir))
-
-    # Move the .git file back in place.
-    fsa.remove(gitFilePath)
-    fsa.move(tempGitFilePath, gitFilePath)
-
-    # We also commit and add the changes to make sure the repository is not dirty
-    # which is expected after a "fresh" checkout. We have to call git add for the
-    # case that we added files to the cpf projects, which are not picket up by
-    # git commit only.
-    osa.execute_command_output(
-        'git add .',
-        cwd=test_project_package_dir,
-        print_output=miscosaccess.OutputMode.ON_ERROR
-    )
-    
-    osa.execute_command_output(
-        'git commit --allow-empty . -m "Set package content to local developer files."',
-        cwd=test_project_package_dir,
-        print_output=miscosaccess.OutputMode.ON_ERROR
-    )
 
-    osa.execute_command_output(
-        'git commit --allow-empty . -m "Update {0}"'.format(package),
-        cwd=cpf_root_dir,
-        print_output=miscosaccess.OutputMode.ON_ERROR
+def get_mirror_cache_dir():
+    """
+    Returns the directory that holds the mirrors of the test project repositories.
+    The leading underscore keeps the directory apart from the test module directories.
+    """
+    return PurePosixPath(BASE_TEST_DIR).joinpath('_mirrors')
+
+
+def replace_package_in_test_project_with_local(package, rel_package_path, cpf_root_dir):
+    """
+    This function replaces a package in the cpf project situated at test_project_root_dir
+    with the package of same name in this repository.
+    The changes are committed in the repository of the package, but not in the
+    repository of the test project. Returns the hash of the new package commit.
+    """
+    this_package_dir = get_local_package_dir(package)
+    test_project_package_dir = cpf_root_dir.joinpath(rel_package_path)
+
+    # We only write the files that differ from the package in this repository. The .git file
+    # that links the package to the test project repository is kept. The python caches are
+    # ignored by git, so they are not copied and no ignored paths are committed.
+    statistics = filetreeutils.sync_tree(this_package_dir, test_project_package_dir, excluded_top_level_names=['.git'], excluded_names=['__pycache__'])
+    print('-- Synced package {0}: {1}'.format(package, statistics))
+
+    # We also commit the changes to make sure the repository is not dirty
+    # which is expected after a "fresh" checkout. Only the paths that were changed by
+    # the sync are staged, which includes files that were added to the cpf packages.
+    return gitplumbing.commit_paths(
+        test_project_package_dir,
+        statistics.get_changed_paths(),
+        'Set package content to local developer files.'
     )
 
 
@@ -120,6 +467,11 @@ class TestProjectFixture(unittest.TestCase):
     """
     This fixture offers utilities for tests that work on checked out test projects.
     """
+
+    # Statistics of the generate cache that are shared by all fixtures.
+    generate_cache_hits = 0
+    generate_cache_misses = 0
+
     def setUp(self, project, cpf_root_dir, cpf_cmake_dir, cpf_buildscripts_dir, ci_buildconfigurations_dir, instantiating_module):
 
         self.fsa = filesystemaccess.FileSystemAccess()
@@ -141,7 +493,69 @@ class TestProjectFixture(unittest.TestCase):
         return print('[' + self.instantiating_module + '] ' + text)
 
     def copyScripts(self):
-        self.run_python_command(self.cpf_buildscripts_dir + "/0_CopyScripts.py --CPFCMake_DIR \"{0}\" --CIBuildConfigurations_DIR \"{1}\" ".format(self.cpf_cmake_dir, self.ci_buildconfigurations_dir))
+        """
+        Runs 0_CopyScripts.py.
+        The run is skipped when the arguments and the buildscripts did not change since the last
+        run and the files that were written by the last run are still unchanged. Like in
+        filetreeutils.sync_tree(), files with equal size and modification time are considered equal.
+        """
+        arguments = "--CPFCMake_DIR \"{0}\" --CIBuildConfigurations_DIR \"{1}\"".format(self.cpf_cmake_dir, self.ci_buildconfigurations_dir)
+        buildscripts_stats = get_json_file_stats(filetreeutils.get_file_stats(
+            self.cpf_root_dir.joinpath(self.cpf_buildscripts_dir),
+            excluded_top_level_names=['.git'],
+            excluded_names=['__pycache__']
+        ))
+
+        manifest_file = self.get_copy_scripts_manifest_file()
+        manifest = read_json_file_or_none(manifest_file)
+        if manifest and manifest['arguments'] == arguments and manifest.get('buildscripts_stats') == buildscripts_stats:
+            if self.files_have_stats(manifest['written_files']):
+                self.printPrefixed('-- Skip 0_CopyScripts.py because the copied scripts are up-to-date.')
+                return
+            previously_written_files = manifest['written_files']
+        else:
+            previously_written_files = {}
+
+        # We remove the manifest first so an aborted run can not leave an outdated manifest behind.
+        if self.fsa.exists(manifest_file):
+            self.fsa.remove(manifest_file)
+
+        excluded_top_level_names = ['.git', 'Generated']
+        file_stats_before = filetreeutils.get_file_stats(self.cpf_root_dir, excluded_top_level_names, ['__pycache__'])
+        self.run_python_command(self.cpf_buildscripts_dir + "/0_CopyScripts.py " + arguments)
+        file_stats_after = filetreeutils.get_file_stats(self.cpf_root_dir, excluded_top_level_names, ['__pycache__'])
+
+        # Files that were written by earlier runs may not be touched again when their content is already correct.
+        written_files = [path for path in previously_written_files if path in file_stats_after]
+        written_files.extend([path for path, file_stat in file_stats_after.items() if file_stats_before.get(path) != file_stat and not path in written_files])
+        manifest = {
+            'arguments' : arguments,
+            'buildscripts_stats' : buildscripts_stats,
+            'written_files' : get_json_file_stats({ path : file_stats_after[path] for path in written_files })
+        }
+        with open(str(manifest_file), 'w') as f:
+            json.dump(manifest, f, indent=4)
+
+    def get_copy_scripts_manifest_file(self):
+        """
+        The manifest is stored next to the workspace so it does not show up in the git status.
+        """
+        return PurePosixPath(str(self.cpf_root_dir) + '.copyscripts')
+
+    def files_have_stats(self, file_stats):
+        """
+        Returns True if the files in the file_stats dictionary exist and have the given
+        [size, modification time in ns] stats. The paths are relative to the cpf_root_dir.
+        Symlinks are not followed.
+        """
+        for path, file_stat in file_stats.items():
+            try:
+                current_stat = os.lstat(str(self.cpf_root_dir.joinpath(path)))
+            except OSError:
+                return False
+            if [current_stat.st_size, current_stat.st_mtime_ns] != file_stat:
+                return False
+        return True
 
     def generate_project(self, d_options=[]):
         """
@@ -150,23 +564,96 @@ class TestProjectFixture(unittest.TestCase):
 
         d_options can be a list of BLA=blub strings.
 
+        When USE_GENERATE_CACHE is set, the generated files are restored from
+        the cache if the project was already generated with the same inputs.
         """
         self.cleanup_generated_files()
 
         self.copyScripts()
 
+        if USE_GENERATE_CACHE:
+            cache_dir = self.get_generate_cache_dir(d_options)
+            if self.restore_generated_files(cache_dir):
+                TestProjectFixture.generate_cache_hits += 1
+                self.printPrefixed('-- Restored generated files from cache {0}'.format(cache_dir.name))
+                return
+            TestProjectFixture.generate_cache_misses += 1
+
         d_option_string = ''
         for option in d_options:
             d_option_string += '-D ' + option + ' '
 
         self.run_python_command('1_Configure.py {0} {1}'.format(PARENT_CONFIG, d_option_string))
+        if USE_BUILD_GRAPH_QUERIES and not self.is_ninja_config():
+            buildgraph.write_codemodel_query(self.locations.get_full_path_config_makefile_folder(PARENT_CONFIG))
         command = '2_Generate.py {0}'.format(PARENT_CONFIG)
         self.printPrefixed(command)
         self.run_python_command(command)
 
-    def build_targets(self, targets):
-        for target in targets:
-            self.build_target(target)
+        if USE_GENERATE_CACHE:
+            self.store_generated_files(cache_dir)
+
+    def get_generate_cache_dir(self, d_options):
+        """
+        Returns the cache directory for the generated files of the given d_options.
+        The name of the directory is a hash of all inputs of the generate step.
+        The HEAD commit is included because the package versions are derived from git.
+        """
+        head = self.osa.execute_command_output('git rev-parse HEAD', cwd=self.cpf_root_dir, print_output=miscosaccess.OutputMode.ON_ERROR, print_command=False)
+        key_parts = [PARENT_CONFIG, COMPILER_CONFIG, str(USE_COMPILER_CACHE), str(USE_BUILD_GRAPH_QUERIES), head[0].strip()]
+        key_parts.extend(sorted(d_options))
+        key_parts.append(filetreeutils.get_tree_content_hash(self.cpf_root_dir.joinpath('Sources'), excluded_names=['__pycache__']))
+        key = hashlib.sha1('\n'.join(key_parts).encode('utf-8')).hexdigest()
+        return PurePosixPath(BASE_TEST_DIR).joinpath('_generatecache', key)
+
+    def store_generated_files(self, cache_dir):
+        """
+        Copies the Configuration and Generated directories into the cache_dir.
+        """
+        with filelock.FileLock(str(cache_dir) + '.lock'):
+            if self.fsa.exists(cache_dir):
+                return
+
+            # We fill a temporary directory first, so other processes never see an incomplete cache entry.
+            temp_cache_dir = PurePosixPath(str(cache_dir) + '.tmp')
+            discard_tree(temp_cache_dir)
+            self.fsa.mkdirs(temp_cache_dir)
+            for generated_dir in ['Configuration', 'Generated']:
+                filetreeutils.copy_tree_copy_on_write(self.cpf_root_dir.joinpath(generated_dir), temp_cache_dir.joinpath(generated_dir))
+            with open(str(temp_cache_dir.joinpath('root_dir.txt')), 'w') as f:
+                f.write(str(self.cpf_root_dir))
+            os.rename(str(temp_cache_dir), str(cache_dir))
+
+    def restore_generated_files(self, cache_dir):
+        """
+        Copies the Configuration and Generated directories from the cache_dir into the project.
+        Absolute paths in the generated files are adjusted when the files were generated in
+        another directory. Returns False if the cache_dir does not exist.
+        """
+        with filelock.FileLock(str(cache_dir) + '.lock'):
+            if not self.fsa.exists(cache_dir):
+                return False
+
+            for generated_dir in ['Configuration', 'Generated']:
+                filetreeutils.copy_tree_copy_on_write(cache_dir.joinpath(generated_dir), self.cpf_root_dir.joinpath(generated_dir))
+
+            cached_root_dir = read_file_or_empty(cache_dir.joinpath('root_dir.txt'))
+            if cached_root_dir != str(self.cpf_root_dir):
+                replacements = [(cached_root_dir, str(self.cpf_root_dir))]
+                if '/' in cached_root_dir:
+                    # Some generators also write native windows paths.
+                    replacements.append((cached_root_dir.replace('/', '\\'), str(self.cpf_root_dir).replace('/', '\\')))
+                for generated_dir in ['Configuration', 'Generated']:
+                    filetreeutils.replace_in_text_files(self.cpf_root_dir.joinpath(generated_dir), replacements)
+
+        return True
+
+    @classmethod
+    def get_generate_cache_statistics(cls):
+        """
+        Returns a dictionary with the number of hits and misses of the generate cache.
+        """
+        return { 'hits' : cls.generate_cache_hits, 'misses' : cls.generate_cache_misses }
 
     def build_target(self, target=None, config=None ):
         command = '3_Make.py'
@@ -185,17 +672,14 @@ class TestProjectFixture(unittest.TestCase):
 
     def cleanup_generated_files(self):
         # We delete all generated files to make sure they do not interfere with the test case.
-        config_dir = self.cpf_root_dir.joinpath('Configuration')
-        if self.fsa.exists(config_dir):
-            self.fsa.rmtree(config_dir)
-
-        generated_dir = self.cpf_root_dir.joinpath('Generated')
-        if self.fsa.exists(generated_dir):
-            self.fsa.rmtree(generated_dir)
+        # The deletion itself is done in the background.
+        discard_tree(self.cpf_root_dir.joinpath('Configuration'))
+        discard_tree(self.cpf_root_dir.joinpath('Generated'))
 
     def run_python_command(self, argument, print_output=miscosaccess.OutputMode.ON_ERROR, print_command=False):
         """
         The function runs python3 on Linux and python on Windows.
+        When USE_SCRIPT_SERVER is set, the script is run by the script server of the project on Linux.
         """
         system = self.osa.system()
         if system == 'Windows':
@@ -210,6 +694,13 @@ class TestProjectFixture(unittest.TestCase):
             # so we can parse the output reliably.
             environment = os.environ
             environment['LANG'] = "en_US.UTF-8" 
+            if USE_SCRIPT_SERVER and scriptrunner.is_supported():
+                return scriptrunner.get_runner(self.cpf_root_dir).run(
+                    argument,
+                    environment,
+                    print_output=print_output,
+                    print_command=print_command
+                    )
             return self.osa.execute_command_output(
                 'python3 -u {0}'.format(argument),
                 cwd=self.cpf_root_dir,
@@ -281,51 +772,182 @@ class TestProjectFixture(unittest.TestCase):
             return variableValues[configurationTypeKey].split(";")
 
     def get_cache_variable_values(self, variables):
+        """
+        Returns a map with the values of the given variables in the CMakeCache.txt file of the current configuration.
+        """
         build_dir = self.locations.get_full_path_config_makefile_folder(PARENT_CONFIG)
-        variablesOutputList = self.osa.execute_command_output(
-            'cmake -LA -N -B.',
-            cwd=build_dir,
-            print_output=miscosaccess.OutputMode.ON_ERROR,
-            print_command=False
-        )
-        
-        return self.get_selected_variables_from_output_string(variablesOutputList, variables)
-
-
-    def get_selected_variables_from_output_string(self, outputList, selectedVariables ):
-        
-        variableValueMap = {} 
-        for line in outputList:
-            splitLine = line.split('=')
-            if len(splitLine) > 0:
-                # in case of cache variables we have to remove the type
-                variableFromLine = splitLine[0].split(':')[0]
-                for variable in selectedVariables:
-                    if variable == variableFromLine:
-                        if len(splitLine) > 1:
-                            variableValueMap[variable] = splitLine[1]
-                        else:
-                            variableValueMap[variable] = ""
-
-        return variableValueMap
+        return cmakecache.get_cache_variable_values(build_dir, variables)
 
 
     def get_cmake_variables_in_file(self, variables, file):
         """
         Returns a map with the values of the given variables in the given cmake script file.
         """
-        printVariablesScript = self.cpf_root_dir /  self.cpf_cmake_dir / "Scripts/printScriptFileVariables.cmake"
-        variablesOutputList = self.osa.execute_command_output(
-            'cmake -DSCRIPT_PATH="{0}" -P "{1}"'.format(str(file), printVariablesScript),
-            cwd=self.cpf_root_dir,
-            print_output=miscosaccess.OutputMode.ON_ERROR,
-            print_command=False
-        )
+        return self.get_cmake_variables_in_files([(file, variables)])[file]
+
+    def get_cmake_variables_in_files(self, file_variables):
+        """
+        Returns a map that contains a map with the values of the variables for each file.
+        file_variables is a list of (file, variables) pairs.
+        Only variables that are defined in the files are contained in the returned maps.
+
+        All files that were not evaluated before are evaluated with a single cmake call.
+        The results are memoized by the content of the files.
+        """
+        file_keys = {}
+        unknown_variables = {}
+        for file, variables in file_variables:
+            file_key = (str(file), filetreeutils.get_file_hash(str(file)))
+            file_keys[file] = file_key
+            known_variables = _cmake_file_variables.setdefault(file_key, {})
+            missing_variables = [variable for variable in variables if not variable in known_variables]
+            if missing_variables:
+                unknown_variables.setdefault(file_key, set()).update(missing_variables)
+
+        if unknown_variables:
+            evaluated_variables = self.evaluate_cmake_variables_in_files([(file_key[0], sorted(variables)) for file_key, variables in unknown_variables.items()])
+            for file_key, variables in unknown_variables.items():
+                values = evaluated_variables[file_key[0]]
+                for variable in variables:
+                    # Undefined variables are stored as None.
+                    _cmake_file_variables[file_key][variable] = values.get(variable)
+
+        file_values = {}
+        for file, variables in file_variables:
+            known_variables = _cmake_file_variables[file_keys[file]]
+            file_values[file] = { variable : known_variables[variable] for variable in variables if known_variables[variable] is not None }
+        return file_values
+
+    def evaluate_cmake_variables_in_files(self, file_variables):
+        """
+        Includes all files of the (file, variables) pairs in a generated cmake script and prints the values of the variables.
+        Each file is included in its own function so the variables of the files do not interfere.
+        Returns a map with the files as keys and maps with the values of the defined variables as values.
+        """
+        script = ''
+        for index, (file, variables) in enumerate(file_variables):
+            script += 'function(printVariablesOfFile{0})\n'.format(index)
+            script += '    include("{0}")\n'.format(str(file).replace('\\', '/'))
+            for variable in variables:
+                script += '    if(DEFINED {0})\n'.format(variable)
+                script += '        message(STATUS "{0}VAR@{1}@{2}=${{{2}}}")\n'.format(_CMAKE_OUTPUT_MARKER, index, variable)
+                script += '    endif()\n'
+            script += '    message(STATUS "{0}END")\n'.format(_CMAKE_OUTPUT_MARKER)
+            script += 'endfunction()\n'
+            script += 'printVariablesOfFile{0}()\n'.format(index)
+
+        script_file = PurePosixPath(BASE_TEST_DIR).joinpath('_cmakescripts', 'printVariables-{0}-{1}.cmake'.format(os.getpid(), threading.get_ident()))
+        self.fsa.mkdirs(script_file.parent)
+        with open(str(script_file), 'w') as f:
+            f.write(script)
+        try:
+            output = self.osa.execute_command_output(
+                'cmake -P "{0}"'.format(script_file),
+                cwd=self.cpf_root_dir,
+                print_output=miscosaccess.OutputMode.ON_ERROR,
+                print_command=False
+            )
+        finally:
+            self.fsa.remove(script_file)
+
+        values = [{} for file_and_variables in file_variables]
+        current_value = None
+        for line in output:
+            marker_index = line.find(_CMAKE_OUTPUT_MARKER)
+            if marker_index == -1:
+                # This belongs to a multi-line value.
+                if current_value:
+                    current_value[0][current_value[1]] += '\n' + line
+                continue
+
+            current_value = None
+            marker_line = line[marker_index + len(_CMAKE_OUTPUT_MARKER):]
+            if marker_line.startswith('VAR@'):
+                index, separator, assignment = marker_line[len('VAR@'):].partition('@')
+                variable, separator, value = assignment.partition('=')
+                values[int(index)][variable] = value
+                current_value = (values[int(index)], variable)
+
+        return { str(file) : values[index] for index, (file, variables) in enumerate(file_variables) }
+
+    def assert_config_version_files_contain_package_versions(self, packages):
+        """
+        Raises an exception if the PACKAGE_VERSION in the <package>ConfigVersion.cmake file of the
+        developer package content of one of the packages is not the version from the repository.
+        The files of all packages are evaluated with one cmake call.
+        """
+        binaryDir = self.locations.get_full_path_config_makefile_folder(PARENT_CONFIG)
+        versionFiles = { package : binaryDir / '{0}/_pckg/dev/{0}/lib/cmake/{0}/{0}ConfigVersion.cmake'.format(package) for package in packages }
+        fileVersions = self.get_cmake_variables_in_files([(file, ['PACKAGE_VERSION']) for file in versionFiles.values()])
+        versions = self.get_package_versions(packages)
 
-        return self.get_selected_variables_from_output_string(variablesOutputList, variables)
+        errorString = ''
+        for package in packages:
+            fileVersion = fileVersions[versionFiles[package]].get('PACKAGE_VERSION')
+            if fileVersion != versions[package]:
+                errorString += 'File "{0}" contains version {1} instead of {2}.\n'.format(versionFiles[package], fileVersion, versions[package])
+
+        if errorString:
+            raise Exception('Test error! ' + errorString)
 
     def get_package_version(self, package):
-        return projectutils.get_version_from_repository(self.cpf_root_dir, self.cpf_cmake_dir, package)
+        return self.get_package_versions([package])[package]
+
+    def get_package_versions(self, packages):
+        """
+        Returns a dictionary with the versions of the given packages.
+        The version of a package is the version of the repository that contains it, so the
+        version is determined once for each repository. The versions are cached until HEAD,
+        the commit of HEAD or the index of the repository change. Methods that change the
+        repository in other ways must call invalidate_package_versions().
+        """
+        cachedVersions = _package_versions.setdefault(str(self.cpf_root_dir), {})
+        repositoryPackages = {}
+        for package in packages:
+            repositoryPackages.setdefault(self.get_package_repository_dir(package), []).append(package)
+
+        versions = {}
+        for repositoryDir, repositoryPackages in repositoryPackages.items():
+            state = gitplumbing.get_repository_state(repositoryDir)
+            cachedState, version = cachedVersions.get(repositoryDir, (None, None))
+            if state is None or cachedState != state:
+                version = projectutils.get_version_from_repository(self.cpf_root_dir, self.cpf_cmake_dir, repositoryPackages[0])
+                # Reading the version can refresh the index, so the state is read again afterwards.
+                cachedVersions[repositoryDir] = (gitplumbing.get_repository_state(repositoryDir), version)
+            for package in repositoryPackages:
+                versions[package] = version
+
+        return versions
+
+    def invalidate_package_versions(self):
+        """
+        Removes the cached package versions of the test project.
+        """
+        _package_versions.pop(str(self.cpf_root_dir), None)
+
+    def get_package_repository_dir(self, package):
+        """
+        Returns the root directory of the repository that contains the sources of the package.
+        """
+        rootDir = os.path.normpath(str(self.cpf_root_dir))
+        directory = os.path.normpath(str(self.locations.get_full_path_source_folder() / package))
+        while directory.startswith(rootDir) and directory != rootDir:
+            if os.path.exists(os.path.join(directory, '.git')):
+                return directory
+            directory = os.path.dirname(directory)
+        return rootDir
+
+    def commit_all_changes(self, message):
+        """
+        Commits the changes of all tracked files in the test project repository.
+        """
+        self.osa.execute_command_output(
+            'git commit . -m "{0}"'.format(message),
+            cwd=self.cpf_root_dir,
+            print_output=miscosaccess.OutputMode.ON_ERROR
+        )
+        # The versions are derived from the repository.
+        self.invalidate_package_versions()
 
     def get_package_runtime_path_in_build_tree(self, config, compilerConfig):
         buildTreePath = self.locations.get_full_path_binary_output_folder(config, compilerConfig)
@@ -462,6 +1084,50 @@ class TestProjectFixture(unittest.TestCase):
     def is_not_interface_lib(self, packageType):
         return not (packageType == 'INTERFACE_LIB')
 
+    def get_compiled_package_manifest(self, manifest):
+        """
+        Returns the packagemanifest.CompiledPackageManifest of the manifest for the active configuration.
+        The version dependent parts of the names are left as {version} placeholders.
+        """
+        config_flags = {
+            'linux' : self.is_linux(),
+            'windows' : self.is_windows(),
+            'vs' : self.is_visual_studio_config(),
+            'shared' : self.is_shared_libraries_config(),
+            'debug' : self.is_debug_compiler_config(),
+        }
+        config_values = {
+            'runtime_dir' : self.get_dir_prefix(self.get_runtime_dir()),
+            'shared_lib_dir' : self.get_dir_prefix(self.get_shared_lib_dir()),
+            'static_lib_dir' : self.get_dir_prefix(self.get_static_lib_dir()),
+            'config' : COMPILER_CONFIG.lower(),
+            'config_postfix' : self.get_target_binary_base_name('', COMPILER_CONFIG),
+            'exe_ext' : self.get_exe_extension(),
+            'shared_ext' : self.get_shared_lib_extension(),
+            'static_ext' : self.get_static_lib_extension(),
+            'exe_version' : self.get_exe_version_postfix('{version}'),
+            'version_ext' : self.get_version_extension('{version}'),
+        }
+        return manifest.compile(config_flags, config_values)
+
+    def get_package_type_flags(self, packageType):
+        """
+        Returns the flags of the package type that are used in the conditions of package manifests.
+        """
+        flags = [packageType]
+        if self.is_exe_package(packageType):
+            flags.append('exe')
+        if self.is_not_interface_lib(packageType):
+            flags.append('binary')
+        return flags
+
+    def get_dir_prefix(self, directory):
+        # The prefix that is put in front of file names in manifest templates.
+        directory = str(directory)
+        if directory in ['', '.']:
+            return ''
+        return directory + '/'
+
     def get_full_distribution_package_path(self, package, packageGenerator, contentType, excludedTargets=[]):
         """
         Returns the full path to a package archive in the html-LastBuild download directory.
@@ -573,20 +1239,97 @@ class TestProjectFixture(unittest.TestCase):
             raise Exception('Test Error! Signature "{0}" was found in build output of target {1}.'.format(signature, target) )
 
 
+    def assert_target_is_up_to_date(self, target, signature):
+        """
+        Raises an exception if building the target again produces the signature.
+        For Ninja builds only a dry run is done, which only takes a fraction of the build time.
+        The test fails if the dry run finds out-of-date build steps. Make and MSBuild
+        do not offer a reliable dry run for CMake projects, so the target is built for them.
+        """
+        if self.is_ninja_config():
+            out_of_date_steps = self.get_out_of_date_build_steps(target)
+            if out_of_date_steps:
+                raise Exception('Test Error! Target {0} is not up-to-date. The build tool gave these reasons for a rebuild:\n'.format(target) + '\n'.join(out_of_date_steps))
+            return
+
+        output = self.build_target(target)
+        missing_strings = self.find_missing_signature_strings(output, signature)
+        if not missing_strings:
+            self.print_build_output(output)
+            raise Exception('Test Error! Signature "{0}" was found in build output of target {1}.'.format(signature, target))
+
+    def find_source_files_that_are_no_target_inputs(self, target, source_files):
+        """
+        Returns the source_files that could not be found as inputs of the target in the build graph.
+        For ninja the inputs are read from the build graph and the deps log, which only contains the
+        dependencies of outputs that were already built. For the other generators the sources of the
+        targets are read from the CMake file API if USE_BUILD_GRAPH_QUERIES is set. This does not include
+        the inputs of custom commands. If the graph can not be queried, all source_files are returned.
+        The paths of the source_files must be relative to the cpf_root_dir.
+        """
+        if not source_files:
+            return []
+
+        build_dir = self.locations.get_full_path_config_makefile_folder(PARENT_CONFIG)
+        inputs = None
+        if self.is_ninja_config():
+            ninja = cmakecache.get_cache_variable_values(build_dir, ['CMAKE_MAKE_PROGRAM'])['CMAKE_MAKE_PROGRAM']
+            inputs = buildgraph.get_ninja_target_inputs(build_dir, ninja, target)
+            # The inputs of the manifest do not contain the dependencies from depfiles, like headers.
+            inputs |= buildgraph.get_ninja_deps_log_inputs(build_dir, ninja, inputs)
+        elif USE_BUILD_GRAPH_QUERIES:
+            inputs = buildgraph.get_codemodel_target_sources(build_dir, target, COMPILER_CONFIG)
+
+        if inputs is None:
+            return list(source_files)
+        return [source_file for source_file in source_files if not buildgraph.normalize_path(self.cpf_root_dir.joinpath(source_file)) in inputs]
+
+    def get_out_of_date_build_steps(self, target):
+        """
+        Returns the build steps of the target that are out-of-date and the reasons for that.
+        This runs ninja with the -n option, so the steps are not executed.
+        """
+        command = 'cmake --build . --target {0} -- -n -d explain'.format(target)
+        output = self.osa.execute_command_output(
+            command,
+            cwd=self.locations.get_full_path_config_makefile_folder(PARENT_CONFIG),
+            print_output=miscosaccess.OutputMode.ON_ERROR,
+            print_command=False
+            )
+        if any(line.startswith('ninja: no work to do') for line in output):
+            return []
+        return [line for line in output if line.startswith('ninja explain:') or _ninja_progress_regex.match(line)]
+
     def find_missing_signature_strings(self, output, signature):
+        index = self.get_signature_index()
         missing_strings = []
         for string in signature:
-            if not string in output:
+            if not index.contains(output, string):
                 missing_strings.append(string)
         return missing_strings
 
+    def get_signature_index(self):
+        """
+        Returns the index that searches the signature strings of get_all_signature_strings() in the build outputs.
+        """
+        if not hasattr(self, 'signature_index'):
+            self.signature_index = signatureindex.SignatureIndex(self.get_all_signature_strings())
+        return self.signature_index
+
+    def get_all_signature_strings(self):
+        """
+        Derived fixtures can return the signature strings of all their targets here,
+        so each build output is only scanned once for all of them.
+        """
+        return []
+
 
     def assert_files_exist(self, files):
         """
         Throws an exception if not all files exist.
         File pathes must be relative to CMAKE_BINARY_DIR or absolute paths.
         """
-        self.assert_filesystem_objects_exist(files, self.fsa.exists, 'files')
+        self.assert_filesystem_objects(files=files)
 
 
     def assert_symlinks_exist(self, symlinks):
@@ -595,21 +1338,7 @@ class TestProjectFixture(unittest.TestCase):
         This function only works on Linux.
         Paths must be relative to CMAKE_BINARY_DIR or absolute paths.
         """
-        self.assert_filesystem_objects_exist(symlinks, os.path.islink, 'symlinks')
-
-
-    def assert_filesystem_objects_exist(self, paths, object_checker, objects_name):
-        missing_objects = []
-        for path in paths:
-            abs_path = path
-            if not os.path.isabs(str(abs_path)):
-                abs_path = self.locations.get_full_path_config_makefile_folder(PARENT_CONFIG) / abs_path
-
-            if not object_checker(str(abs_path)):
-                missing_objects.append(str(abs_path))
-
-        if missing_objects:
-            raise Exception('Test error! The following {0} were not produced as expected:\n{1}'.format(objects_name, '\n'.join(missing_objects)))
+        self.assert_filesystem_objects(symlinks=symlinks)
 
 
     def assert_files_do_not_exist(self, files):
@@ -617,17 +1346,37 @@ class TestProjectFixture(unittest.TestCase):
         Throws an exception if one of the given files exist. 
         File pathes must be relative to CMAKE_BINARY_DIR or absolute paths.
         """
-        existing_files = []
-        for file in files:
-            full_file = file
-            if not os.path.isabs(str(full_file)):
-                full_file = self.locations.get_full_path_config_makefile_folder(PARENT_CONFIG) / file
+        self.assert_filesystem_objects(absent_files=files)
+
+
+    def assert_filesystem_objects(self, files=[], symlinks=[], absent_files=[]):
+        """
+        Throws an exception that lists all files and symlinks that do not exist and all
+        absent_files that exist. Files can also be symlinks to files.
+        Each parent directory of the paths is only listed once.
+        Paths must be relative to CMAKE_BINARY_DIR or absolute paths.
+        """
+        index = filetreeutils.DirectoryIndex()
+        missingFiles = [path for path in self.get_abs_paths_in_binary_dir(files) if not index.exists(path)]
+        missingSymlinks = [path for path in self.get_abs_paths_in_binary_dir(symlinks) if index.get_type(path) != filetreeutils.SYMLINK]
+        existingFiles = [path for path in self.get_abs_paths_in_binary_dir(absent_files) if index.exists(path)]
+
+        errorString = ''
+        if missingFiles:
+            errorString += 'The following files were not produced as expected:\n{0}\n\n'.format('\n'.join(missingFiles))
+        if missingSymlinks:
+            errorString += 'The following symlinks were not produced as expected:\n{0}\n\n'.format('\n'.join(missingSymlinks))
+        if existingFiles:
+            errorString += 'The following files were unexpectedly produced:\n{0}\n\n'.format('\n'.join(existingFiles))
+
+        if errorString:
+            raise Exception('Test error! ' + errorString)
 
-            if self.fsa.exists(full_file):
-                existing_files.append(str(full_file))
 
-        if existing_files:
-            raise Exception('Test error! The following files were unexpectedly produced:\n{1}'.format('\n'.join(existing_files)))
+    def get_abs_paths_in_binary_dir(self, paths):
+        # Returns the paths as absolute path strings. Relative paths are relative to CMAKE_BINARY_DIR.
+        binaryDir = self.locations.get_full_path_config_makefile_folder(PARENT_CONFIG)
+        return [str(path) if os.path.isabs(str(path)) else str(binaryDir / path) for path in paths]
 
 
     def assert_filetree_is_equal(self, root_directory, files, symlinks=[]):
@@ -635,19 +1384,47 @@ class TestProjectFixture(unittest.TestCase):
         This function asserts that a root_directory contains exactly the given files and symlinks.
         The paths can be either relative to root_directory or absolute.
         """
-        expectedFiles = self.get_rel_paths(root_directory, files)
-        actualFiles = self.get_files_in_tree(root_directory)
-        errorFiles = self.assert_filesystem_objects_are_equal(expectedFiles, actualFiles, 'files')
+        actualFiles, actualSymlinks = self.get_files_and_symlinks_in_tree(root_directory)
 
-        expectedSymlinks = self.get_rel_paths(root_directory, symlinks)
-        actualSymlinks = self.get_symlinks_in_tree(root_directory)
-        errorSymlinks = self.assert_filesystem_objects_are_equal(expectedSymlinks, actualSymlinks, 'symlinks')
+        expectedObjects = treediff.get_typed_paths(self.get_rel_paths(root_directory, files), self.get_rel_paths(root_directory, symlinks))
+        actualObjects = treediff.get_typed_paths(actualFiles, actualSymlinks)
+        diff = treediff.diff_trees(expectedObjects, actualObjects)
 
-        if errorFiles or errorSymlinks:
-            errorString = 'Test Error! Directory "{0}" did not contain the expected objects.\n'.format(str(root_directory)) + errorFiles + errorSymlinks
+        if not diff.is_empty():
+            errorString = 'Test Error! Directory "{0}" did not contain the expected objects.\n'.format(str(root_directory)) + diff.get_report()
             raise Exception(errorString)
         
 
+    def assert_archive_content_is_equal(self, archive, root_directory_in_archive, files, symlinks=[]):
+        """
+        Does the same as assert_filetree_is_equal() for the directory root_directory_in_archive
+        in the given archive, but without extracting the archive.
+        The paths can be either relative to the root directory or absolute paths that assume that
+        the archive was extracted into its own directory.
+        """
+        root_directory_in_archive = treediff.normalize_path(root_directory_in_archive)
+        root_directory = PurePosixPath(os.path.dirname(str(archive))) / root_directory_in_archive
+
+        actualFiles = []
+        actualSymlinks = []
+        for entry in archivelisting.list_archive(archive):
+            relPath = os.path.relpath(entry.path, root_directory_in_archive).replace(os.sep, '/')
+            if relPath.startswith('..'):
+                continue    # Objects outside of the root directory are not checked.
+            if entry.type == filetreeutils.FILE:
+                actualFiles.append(relPath)
+            elif entry.type == filetreeutils.SYMLINK:
+                actualSymlinks.append(relPath)
+
+        expectedObjects = treediff.get_typed_paths(self.get_rel_paths(root_directory, files), self.get_rel_paths(root_directory, symlinks))
+        actualObjects = treediff.get_typed_paths(actualFiles, actualSymlinks)
+        diff = treediff.diff_trees(expectedObjects, actualObjects)
+
+        if not diff.is_empty():
+            errorString = 'Test Error! Directory "{0}" in archive "{1}" did not contain the expected objects.\n'.format(root_directory_in_archive, str(archive)) + diff.get_report()
+            raise Exception(errorString)
+
+
     def get_rel_paths(self, root_directory, paths):
         # Make all paths relative.
         relPaths = []
@@ -660,74 +1437,34 @@ class TestProjectFixture(unittest.TestCase):
 
 
     def get_files_in_tree(self, directory):
-        return self.get_filsystem_objects_in_tree(directory, self.fsa.isfile )
+        return self.get_files_and_symlinks_in_tree(directory)[0]
 
 
     def get_symlinks_in_tree(self, directory):
-        return self.get_filsystem_objects_in_tree(directory, os.path.islink )
+        return self.get_files_and_symlinks_in_tree(directory)[1]
 
 
-    def get_filsystem_objects_in_tree(self, directory, object_checker):
-        paths = self.get_paths_in_tree(directory)
-        objects = []
-        for path in paths:
-            if object_checker(str( directory / path)):
-                objects.append(path)
+    def get_files_and_symlinks_in_tree(self, directory):
+        """
+        Returns the relative paths of the files and the symlinks in the directory in one walk through the tree.
+        Symlinks are not followed and are not counted as files.
+        """
+        files = []
+        symlinks = []
+        for rel_path, object_type, entry in filetreeutils.iterate_tree(directory):
+            if object_type == filetreeutils.FILE:
+                files.append(rel_path)
+            elif object_type == filetreeutils.SYMLINK:
+                symlinks.append(rel_path)
 
-        return objects
+        return files, symlinks
 
 
     def get_paths_in_tree(self, directory):
-        
-        if not os.path.isdir(str(directory)):
-            return []
-        
-        paths = os.listdir(str(directory))
-        returnedPaths = []
-        for path in paths:
-            absSubDir = directory / path
-            if os.path.isdir( str( absSubDir )):
-                subPaths = self.get_paths_in_tree(absSubDir)
-                for subPath in subPaths:
-                    returnedPaths.append( path + '/' + subPath )
-            else:
-                returnedPaths.append(path)
-
-        return returnedPaths
-
-
-    def assert_filesystem_objects_are_equal(self, expected_objects, actual_objects, object_name_plural):
         """
-        This assertion can be used to compare objects in a filesystem tree.
+        Returns the relative paths of all objects in the directory that are not directories.
         """
-        # Transform everything to strings.
-        expected_objects = [ str(obj) for obj in expected_objects]
-        actual_objects = [ str(obj) for obj in actual_objects]
-
-        # Find the missing objects
-        missing_objects = []
-        for obj in expected_objects:
-            if not obj in actual_objects:
-                missing_objects.append(obj)
-
-        errorStringMissing = ''
-        if missing_objects:
-            errorStringMissing = 'The folling expected {0} were missing:\n{1}'.format(object_name_plural, '\n'.join(missing_objects)) + '\n\n'
-
-        # Find the objects that existed while they should not.
-        unexpected_objects = []
-        for obj in actual_objects:
-            if not obj in expected_objects:
-                unexpected_objects.append(obj)
-
-        errorStringUnexpected = ''
-        if unexpected_objects:
-            errorStringUnexpected = 'The following {0} existed while they should not:\n{1}'.format(object_name_plural, '\n'.join(unexpected_objects)) + '\n\n'
-
-        if missing_objects or unexpected_objects:
-            return errorStringMissing + errorStringUnexpected
-        else:
-            return ''
+        return [rel_path for rel_path, object_type, entry in filetreeutils.iterate_tree(directory) if object_type != filetreeutils.DIRECTORY]
 
 
 
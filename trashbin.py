@@ -0,0 +1,97 @@
+"""
+This module contains a trash bin that deletes directory trees in the background.
+
+Deleting large trees like the Generated directory of a test project takes seconds.
+Moving them into a trash directory on the same filesystem is a cheap rename, so the
+tests can continue while a background thread does the actual deletion.
+"""
+
+import os
+import shutil
+import queue
+import threading
+
+from . import filelock
+
+
+class TrashBin:
+    """
+    The trees are moved into a session directory below the trash_dir and deleted by a
+    background thread. When more than max_backlog trees wait for their deletion,
+    discard() blocks until the backlog has shrunk. The backlog is limited by the number
+    of trees and not by their size, because measuring the size would require to walk
+    each tree, which costs about as much as deleting it. Call join() at the end of the
+    session to wait until all trees are deleted.
+
+    Each session holds the lock of a lock-file next to its directory as long as its
+    process lives. The directories of sessions whose lock is free are left-overs of
+    earlier processes and are deleted.
+    """
+    def __init__(self, trash_dir, max_backlog=8):
+        self.trash_dir = str(trash_dir)
+        self.session_dir = os.path.join(self.trash_dir, 'session-{0}'.format(os.getpid()))
+        self.counter = 0
+        self.counter_lock = threading.Lock()
+        self.backlog = queue.Queue(maxsize=max_backlog)
+
+        # The lock is never released, so it is held until the process ends.
+        self.session_lock = filelock.FileLock(self.session_dir + '.lock')
+        self.session_lock.acquire()
+        os.makedirs(self.session_dir, exist_ok=True)
+        self.thread = threading.Thread(target=self._delete_trees, daemon=True)
+        self.thread.start()
+
+    def discard(self, path):
+        """
+        Removes the given file or directory tree from its location.
+        """
+        path = str(path)
+        if not os.path.lexists(path):
+            return
+
+        with self.counter_lock:
+            self.counter += 1
+            trash_path = os.path.join(self.session_dir, '{0}-{1}'.format(self.counter, os.path.basename(path)))
+        try:
+            os.rename(path, trash_path)
+        except OSError:
+            # The path is on another filesystem or is still in use, which can happen
+            # on Windows. In this case we have to delete it directly.
+            _remove(path, ignore_errors=False)
+            return
+
+        self.backlog.put(trash_path)
+
+    def join(self):
+        """
+        Blocks until all discarded trees are deleted.
+        """
+        self.backlog.join()
+
+    def _delete_trees(self):
+        # Delete the left-overs of earlier sessions that did not finish their deletions.
+        for name in os.listdir(self.trash_dir):
+            path = os.path.join(self.trash_dir, name)
+            if path == self.session_dir or name.endswith('.lock'):
+                continue
+            session_lock = filelock.FileLock(path + '.lock')
+            if session_lock.try_acquire():
+                _remove(path, ignore_errors=True)
+                session_lock.release()
+                _remove(path + '.lock', ignore_errors=True)
+
+        while True:
+            trash_path = self.backlog.get()
+            _remove(trash_path, ignore_errors=True)
+            self.backlog.task_done()
+
+
+def _remove(path, ignore_errors):
+    if os.path.isdir(path) and not os.path.islink(path):
+        shutil.rmtree(path, ignore_errors=ignore_errors)
+    else:
+        try:
+            os.remove(path)
+        except OSError:
+            if not ignore_errors:
+                raise
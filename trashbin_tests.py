@@ -0,0 +1,64 @@
+"""
+This module contains the tests of the trashbin and filelock modules.
+"""
+
+import os
+
+from . import filelock
+from . import trashbin
+from .tempdirfixture import TempDirFixture
+
+
+class TrashBinCase(TempDirFixture):
+    """
+    Tests the background deletion of discarded trees.
+    """
+
+    def setUp(self):
+        super(TrashBinCase, self).setUp()
+        self.trash_dir = self.get_path('trash')
+
+    def test_discarded_trees_are_deleted(self):
+        self.write_file('workspace/src/lib.cpp', 'int f();')
+        file = self.write_file('file.txt', 'file')
+
+        trash = trashbin.TrashBin(self.trash_dir, max_backlog=1)
+        trash.discard(self.get_path('workspace'))
+        trash.discard(file)
+        trash.discard(self.get_path('missing'))
+        self.assertFalse(os.path.exists(self.get_path('workspace')))
+        self.assertFalse(os.path.exists(file))
+
+        trash.join()
+        self.assertEqual(os.listdir(trash.session_dir), [])
+
+    def test_only_sessions_without_lock_holder_are_deleted(self):
+        self.write_file('trash/session-1/1-workspace/lib.cpp', 'int f();')
+        self.write_file('trash/session-1.lock')
+        self.write_file('trash/session-2/1-workspace/lib.cpp', 'int f();')
+        running_session_lock = filelock.FileLock(self.get_path('trash', 'session-2.lock'))
+        running_session_lock.acquire()
+        self.addCleanup(running_session_lock.release)
+
+        trash = trashbin.TrashBin(self.trash_dir)
+        # The left-overs are deleted before the discarded trees, so joining after a discard waits for them.
+        trash.discard(self.write_file('marker'))
+        trash.join()
+
+        self.assertFalse(os.path.exists(self.get_path('trash', 'session-1')))
+        self.assertFalse(os.path.exists(self.get_path('trash', 'session-1.lock')))
+        self.assertTrue(os.path.exists(self.get_path('trash', 'session-2')))
+
+
+class FileLockCase(TempDirFixture):
+    """
+    Tests the FileLock class.
+    """
+
+    def test_try_acquire_does_not_wait_for_a_held_lock(self):
+        lock_file = self.get_path('test.lock')
+        with filelock.FileLock(lock_file):
+            self.assertFalse(filelock.FileLock(lock_file).try_acquire())
+        lock = filelock.FileLock(lock_file)
+        self.assertTrue(lock.try_acquire())
+        lock.release()
@@ -0,0 +1,163 @@
+"""
+This module contains functions that compare file trees.
+
+The trees are given as dictionaries that map normalized relative paths to the types
+of the objects. Each directory of a tree gets a Merkle digest that is computed from the
+names, types and digests of its objects. The comparison only looks into the
+sub-directories whose digests differ.
+"""
+
+import hashlib
+from pathlib import PurePosixPath
+
+from . import filetreeutils
+
+
+class TreeDiff:
+    """
+    The differences between an expected and an actual tree.
+    All lists are sorted by path.
+    """
+    def __init__(self, missing, unexpected, type_mismatches):
+        self.missing = sorted(missing)                      # (path, expected type) tuples
+        self.unexpected = sorted(unexpected)                # (path, actual type) tuples
+        self.type_mismatches = sorted(type_mismatches)      # (path, expected type, actual type) tuples
+
+    def is_empty(self):
+        return not self.missing and not self.unexpected and not self.type_mismatches
+
+    def get_report(self):
+        """
+        Returns a human readable description of the differences.
+        """
+        report = ''
+        if self.missing:
+            report += 'The following expected objects were missing:\n{0}\n\n'.format(
+                '\n'.join('{0} ({1})'.format(path, object_type) for path, object_type in self.missing))
+        if self.unexpected:
+            report += 'The following objects existed while they should not:\n{0}\n\n'.format(
+                '\n'.join('{0} ({1})'.format(path, object_type) for path, object_type in self.unexpected))
+        if self.type_mismatches:
+            report += 'The following objects had the wrong type:\n{0}\n\n'.format(
+                '\n'.join('{0} (expected {1} but was {2})'.format(path, expected_type, actual_type) for path, expected_type, actual_type in self.type_mismatches))
+        return report
+
+
+def normalize_path(path):
+    """
+    Returns the relative path as string with forward slashes and without redundant separators.
+    """
+    return str(PurePosixPath(str(path).replace('\\', '/')))
+
+
+def get_typed_paths(files=[], symlinks=[], directories=[]):
+    """
+    Returns a dictionary that maps the normalized paths to the types of the objects.
+    """
+    typed_paths = {}
+    for paths, object_type in [(files, filetreeutils.FILE), (symlinks, filetreeutils.SYMLINK), (directories, filetreeutils.DIRECTORY)]:
+        for path in paths:
+            typed_paths[normalize_path(path)] = object_type
+    return typed_paths
+
+
+def diff_trees(expected, actual):
+    """
+    Compares two dictionaries that were created with get_typed_paths() and returns a TreeDiff object.
+    Sub-trees with equal digests are not compared further. If a directory only exists in one tree,
+    the objects in it are reported instead of the directory.
+    """
+    missing = []
+    unexpected = []
+    type_mismatches = []
+    dir_stack = [('', _DirectoryNode.create_tree(expected), _DirectoryNode.create_tree(actual))]
+    while dir_stack:
+        rel_dir, expected_node, actual_node = dir_stack.pop()
+        if expected_node.digest == actual_node.digest:
+            continue
+
+        for name in set(expected_node.children) | set(actual_node.children):
+            path = rel_dir + '/' + name if rel_dir else name
+            expected_child = expected_node.children.get(name)
+            actual_child = actual_node.children.get(name)
+            if isinstance(expected_child, _DirectoryNode) and isinstance(actual_child, _DirectoryNode):
+                dir_stack.append((path, expected_child, actual_child))
+            elif isinstance(expected_child, str) and isinstance(actual_child, str):
+                if expected_child != actual_child:
+                    type_mismatches.append((path, expected_child, actual_child))
+            else:
+                missing.extend(_get_typed_objects(path, expected_child))
+                unexpected.extend(_get_typed_objects(path, actual_child))
+
+    return TreeDiff(missing, unexpected, type_mismatches)
+
+
+class _DirectoryNode:
+    """
+    A directory in a tree. The children map the names of the objects in the directory
+    to their directory nodes or, for all other objects, to their types.
+    """
+    def __init__(self):
+        self.children = {}
+        self.digest = None
+
+    @staticmethod
+    def create_tree(typed_paths):
+        """
+        Returns the root node of the tree with the given objects.
+        Directories that contain objects do not need to be in typed_paths.
+        """
+        root = _DirectoryNode()
+        for path, object_type in typed_paths.items():
+            if path == '.':
+                continue
+            node = root
+            parts = path.split('/')
+            for name in parts[:-1]:
+                node = node._get_sub_directory(name, path)
+            if object_type == filetreeutils.DIRECTORY:
+                node._get_sub_directory(parts[-1], path)
+            elif isinstance(node.children.get(parts[-1]), _DirectoryNode):
+                raise Exception('Error! The path "{0}" is used for a {1} and a directory.'.format(path, object_type))
+            else:
+                node.children[parts[-1]] = object_type
+
+        root._compute_digests()
+        return root
+
+    def _get_sub_directory(self, name, path):
+        child = self.children.get(name)
+        if child is None:
+            child = _DirectoryNode()
+            self.children[name] = child
+        elif not isinstance(child, _DirectoryNode):
+            raise Exception('Error! The path "{0}" is used for a {1} and a directory.'.format(path, child))
+        return child
+
+    def _compute_digests(self):
+        digest = hashlib.sha1()
+        for name, child in sorted(self.children.items(), key=lambda item: item[0]):
+            if isinstance(child, _DirectoryNode):
+                child._compute_digests()
+                digest.update('{0}\0{1}\0{2}\n'.format(name, filetreeutils.DIRECTORY, child.digest).encode('utf-8'))
+            else:
+                digest.update('{0}\0{1}\n'.format(name, child).encode('utf-8'))
+        self.digest = digest.hexdigest()
+
+
+def _get_typed_objects(path, child):
+    """
+    Returns the (path, type) tuples of the object and, for directories, of all objects below it.
+    Directories are only returned if they are empty.
+    """
+    if child is None:
+        return []
+    if not isinstance(child, _DirectoryNode):
+        return [(path, child)]
+    if not child.children:
+        return [(path, filetreeutils.DIRECTORY)]
+
+    typed_objects = []
+    for name, grand_child in child.children.items():
+        typed_objects.extend(_get_typed_objects(path + '/' + name, grand_child))
+    return typed_objects
@@ -0,0 +1,71 @@
+"""
+This module contains the tests of the treediff module.
+"""
+
+import unittest
+import random
+
+from . import treediff
+from . import filetreeutils
+
+
+class TreeDiffCase(unittest.TestCase):
+    """
+    Tests the comparison of typed path dictionaries in the treediff module.
+    """
+
+    def test_paths_are_normalized(self):
+        typed_paths = treediff.get_typed_paths(files=['lib\\a.so', './bin//b'], symlinks=['bin/c/'])
+        self.assertEqual(typed_paths, { 'lib/a.so' : filetreeutils.FILE, 'bin/b' : filetreeutils.FILE, 'bin/c' : filetreeutils.SYMLINK })
+
+    def test_equal_trees_have_no_differences(self):
+        expected = treediff.get_typed_paths(files=['a', 'b/c'], symlinks=['d'])
+        actual = treediff.get_typed_paths(files=['b/c', 'a'], symlinks=['d'])
+        diff = treediff.diff_trees(expected, actual)
+        self.assertTrue(diff.is_empty())
+        self.assertEqual(diff.get_report(), '')
+
+    def test_differences_are_reported_sorted(self):
+        expected = treediff.get_typed_paths(files=['z', 'a', 'link'])
+        actual = treediff.get_typed_paths(files=['extra2', 'extra1'], symlinks=['link'])
+        diff = treediff.diff_trees(expected, actual)
+
+        self.assertFalse(diff.is_empty())
+        self.assertEqual(diff.missing, [('a', filetreeutils.FILE), ('z', filetreeutils.FILE)])
+        self.assertEqual(diff.unexpected, [('extra1', filetreeutils.FILE), ('extra2', filetreeutils.FILE)])
+        self.assertEqual(diff.type_mismatches, [('link', filetreeutils.FILE, filetreeutils.SYMLINK)])
+        self.assertIn('link (expected file but was symlink)', diff.get_report())
+
+    def test_objects_in_a_missing_directory_are_reported(self):
+        expected = treediff.get_typed_paths(files=['bin/a', 'lib/x/b', 'lib/c'], symlinks=['lib/x/d'])
+        actual = treediff.get_typed_paths(files=['bin/a', 'lib'])
+        diff = treediff.diff_trees(expected, actual)
+
+        self.assertEqual(diff.missing, [('lib/c', filetreeutils.FILE), ('lib/x/b', filetreeutils.FILE), ('lib/x/d', filetreeutils.SYMLINK)])
+        self.assertEqual(diff.unexpected, [('lib', filetreeutils.FILE)])
+        self.assertEqual(diff.type_mismatches, [])
+
+    def test_empty_directories_are_reported(self):
+        expected = treediff.get_typed_paths(files=['a/b'], directories=['a', 'empty'])
+        actual = treediff.get_typed_paths(files=['a/b'])
+        diff = treediff.diff_trees(expected, actual)
+        self.assertEqual(diff.missing, [('empty', filetreeutils.DIRECTORY)])
+        self.assertEqual(diff.unexpected, [])
+
+    def test_path_that_is_used_for_a_file_and_a_directory_raises(self):
+        typed_paths = treediff.get_typed_paths(files=['a', 'a/b'])
+        self.assertRaises(Exception, treediff.diff_trees, typed_paths, {})
+
+    def test_diff_is_equal_to_diff_of_all_paths(self):
+        names = ['a', 'b', 'c']
+        object_types = [filetreeutils.FILE, filetreeutils.SYMLINK]
+        all_paths = [a + '/' + b + '/' + c for a in names for b in names for c in names]
+        random_generator = random.Random(0)
+        for i in range(200):
+            expected = { path : random_generator.choice(object_types) for path in random_generator.sample(all_paths, 15) }
+            actual = { path : random_generator.choice(object_types) for path in random_generator.sample(all_paths, 15) }
+            diff = treediff.diff_trees(expected, actual)
+
+            self.assertEqual(diff.missing, sorted((path, object_type) for path, object_type in expected.items() if not path in actual))
+            self.assertEqual(diff.unexpected, sorted((path, object_type) for path, object_type in actual.items() if not path in expected))
+            self.assertEqual(diff.type_mismatches, sorted((path, object_type, actual[path]) for path, object_type in expected.items() if path in actual and actual[path] != object_type))